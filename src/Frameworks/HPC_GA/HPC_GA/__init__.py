@@ -7,9 +7,7 @@ Expose les classes principales :
 - Chromosome : Classe de base pour les solutions
 """
 
-from .core.genetic_algorithm import GeneticAlgorithm
-from .parallel.parallel_ga import ParallelGeneticAlgorithm
-from .common.chromosome import Chromosome
+from ._lazy import lazy_attributes
 
 __version__ = "1.0.0"
 __all__ = [
@@ -19,4 +17,15 @@ __all__ = [
     'Population',
     'Crossover',
     'Mutator'
-]
\ No newline at end of file
+]
+
+# Sous-modules importés au premier accès aux noms : `import HPC_GA` ne charge
+# ni numpy ni multiprocessing (démarrage des processus fils en spawn)
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'GeneticAlgorithm': '.core.genetic_algorithm',
+    'ParallelGeneticAlgorithm': '.parallel.parallel_ga',
+    'Chromosome': '.common.chromosome',
+    'Population': '.common.population',
+    'Crossover': '.core.operators',
+    'Mutator': '.core.operators',
+})
@@ -0,0 +1,34 @@
+"""
+Chargement paresseux des attributs d'un paquet (PEP 562).
+
+Chaque __init__ déclare de quel sous-module vient chaque nom exporté ; le
+sous-module n'est importé qu'au premier accès au nom. `import HPC_GA` ne
+charge ainsi ni numpy ni matplotlib, et un processus fils (spawn) n'importe
+que les modules dont il a réellement besoin.
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, Tuple
+
+
+def lazy_attributes(package: str, attributes: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    (__getattr__, __dir__) du paquet `package`, dont les attributs
+    `attributes` (nom -> sous-module relatif) sont importés au premier accès.
+    """
+    namespace = sys.modules[package].__dict__
+
+    def __getattr__(name: str):
+        try:
+            module = attributes[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}") from None
+        value = getattr(importlib.import_module(module, package), name)
+        namespace[name] = value  # accès suivants sans passer par __getattr__
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(attributes))
+
+    return __getattr__, __dir__
@@ -4,10 +4,15 @@ Définitions communes :
 - Population : Gestion des ensembles de solutions
 """
 
-from .chromosome import Chromosome
-from .population import Population
+from .._lazy import lazy_attributes
 
 __all__ = [
     'Chromosome',
     'Population'
-]
\ No newline at end of file
+]
+
+# Sous-modules importés au premier accès aux noms
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'Chromosome': '.chromosome',
+    'Population': '.population',
+})
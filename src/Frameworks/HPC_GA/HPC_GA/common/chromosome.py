@@ -10,6 +10,15 @@ class Chromosome(ABC):
     def evaluate(self) -> float:
         pass
 
+    @classmethod
+    def evaluate_batch(cls, genes_matrix: np.ndarray) -> np.ndarray:
+        """
+        Fitness de plusieurs individus (une ligne de gènes par individu),
+        appelée une fois par génération par Population.evaluate. À redéfinir
+        pour un calcul vectorisé ; par défaut, evaluate() de chaque individu.
+        """
+        return np.array([cls(genes).evaluate() for genes in genes_matrix], dtype=np.float64)
+
     @property
     def fitness(self) -> float:
         if self._fitness is None:
@@ -1,17 +1,86 @@
-from typing import List
+from typing import List, Optional, Type
 import numpy as np
 from ..common.chromosome import Chromosome
 
+# Générateur des appels individuels (tournament_selection) sans générateur fourni
+_RNG = np.random.default_rng()
+
 class Population:
+    """
+    Population en tableaux (structure of arrays) : matrice des gènes
+    (taille x n_gènes) et vecteur des fitness (NaN tant que l'individu n'est
+    pas évalué). Les Chromosome ne sont construits qu'à la demande
+    (best, individuals, [i]), sur une copie de leur ligne de gènes.
+    """
+
     def __init__(self, individuals: List['Chromosome']):
-        self.individuals = individuals
+        if not individuals:
+            raise ValueError("Population vide")
+        self.chromosome_class: Type[Chromosome] = type(individuals[0])
+        self.genes = np.stack([np.asarray(ind.genes) for ind in individuals])
+        self.fitness = np.array([np.nan if ind._fitness is None else ind._fitness
+                                 for ind in individuals], dtype=np.float64)
+
+    @classmethod
+    def from_genes(cls, chromosome_class: Type[Chromosome], genes: np.ndarray,
+                   fitness: Optional[np.ndarray] = None) -> 'Population':
+        """Population sur des tableaux existants (sans copie) ; fitness None : à évaluer"""
+        pop = cls.__new__(cls)
+        pop.chromosome_class = chromosome_class
+        pop.genes = genes
+        pop.fitness = np.full(len(genes), np.nan) if fitness is None else fitness
+        return pop
+
+    @property
+    def size(self) -> int:
+        return len(self.genes)
+
+    def __len__(self) -> int:
+        return len(self.genes)
+
+    def __getitem__(self, i: int) -> 'Chromosome':
+        chrom = self.chromosome_class(self.genes[i].copy())
+        if not np.isnan(self.fitness[i]):
+            chrom._fitness = float(self.fitness[i])
+        return chrom
+
+    def __setitem__(self, i: int, chrom: 'Chromosome'):
+        self.genes[i] = chrom.genes
+        self.fitness[i] = np.nan if chrom._fitness is None else chrom._fitness
+
+    @property
+    def individuals(self) -> List['Chromosome']:
+        """Individus matérialisés (copies : les modifier ne change pas la population)"""
+        return [self[i] for i in range(self.size)]
+
+    def take(self, indices: np.ndarray) -> 'Population':
+        """Sous-population des lignes `indices` (copie)"""
+        return Population.from_genes(self.chromosome_class, self.genes[indices], self.fitness[indices])
+
+    def evaluate(self) -> np.ndarray:
+        """
+        Évalue en un appel de chromosome_class.evaluate_batch les individus dont
+        la fitness est inconnue ; renvoie le vecteur des fitness.
+        """
+        pending = np.isnan(self.fitness)
+        if pending.all():
+            self.fitness[:] = self.chromosome_class.evaluate_batch(self.genes)
+        elif pending.any():
+            self.fitness[pending] = self.chromosome_class.evaluate_batch(self.genes[pending])
+        return self.fitness
 
     def best(self) -> 'Chromosome':
-        return max(self.individuals)
+        return self[int(np.argmax(self.evaluate()))]
 
     def average_fitness(self) -> float:
-        return np.mean([ind.fitness for ind in self.individuals])
+        return float(np.mean(self.evaluate()))
+
+    def tournament(self, n: int, k: int = 3, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Indices des vainqueurs de n tournois de k individus tirés avec remise (vectorisé)"""
+        rng = _RNG if rng is None else rng
+        fitness = self.evaluate()
+        contestants = rng.integers(0, self.size, size=(n, k))
+        return contestants[np.arange(n), np.argmax(fitness[contestants], axis=1)]
 
-    def tournament_selection(self, k: int = 3) -> 'Chromosome':
-        candidates = np.random.choice(self.individuals, size=k)
-        return max(candidates)
\ No newline at end of file
+    def tournament_selection(self, k: int = 3, rng: Optional[np.random.Generator] = None) -> 'Chromosome':
+        return self[int(self.tournament(1, k, rng)[0])]
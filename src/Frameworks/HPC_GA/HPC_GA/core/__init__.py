@@ -4,11 +4,17 @@ Contient les composants centraux de l'algorithme génétique :
 - Operateurs (Crossover, Mutator) : Opérateurs génétiques
 """
 
-from .genetic_algorithm import GeneticAlgorithm
-from .operators import Crossover, Mutator
+from .._lazy import lazy_attributes
 
 __all__ = [
     'GeneticAlgorithm',
     'Crossover',
     'Mutator'
-]
\ No newline at end of file
+]
+
+# Sous-modules importés au premier accès aux noms
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'GeneticAlgorithm': '.genetic_algorithm',
+    'Crossover': '.operators',
+    'Mutator': '.operators',
+})
@@ -1,6 +1,7 @@
-from typing import List, Callable
+from typing import List, Callable, Optional
+import numpy as np
 from ..common.population import Population
-from .operators import Crossover, Mutator
+from .operators import Crossover, Mutator, Scratch
 from ..common.chromosome import Chromosome
 
 class GeneticAlgorithm:
@@ -9,31 +10,79 @@ class GeneticAlgorithm:
         population: Population,
         crossover: Crossover,
         mutator: Mutator,
-        selection: Callable = Population.tournament_selection,
-        max_generations: int = 100
+        selection: Optional[Callable] = None,
+        max_generations: int = 100,
+        tournament_size: int = 3,
+        rng: Optional[np.random.Generator] = None
     ):
+        """
+        selection : None pour le tournoi vectorisé (Population.tournament, de
+        taille tournament_size) ; sinon fonction population -> Chromosome
+        appelée pour chaque parent.
+        rng : générateur de tous les tirages (np.random.default_rng() par défaut).
+        """
         self.population = population
         self.crossover = crossover
         self.mutator = mutator
         self.selection = selection
         self.max_generations = max_generations
+        self.tournament_size = tournament_size
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.history = {"best": [], "avg": []}
+        self._buffers = None
 
     def run(self) -> 'Chromosome':
+        self._allocate_buffers()
         for gen in range(self.max_generations):
             self.population = self._evolve()
             self._update_history()
         return self.population.best()
 
+    def _allocate_buffers(self):
+        """
+        Double tampon : la génération courante et la suivante alternent entre
+        deux matrices de gènes (et deux vecteurs de fitness) allouées une fois,
+        avec les matrices des parents et les tableaux de travail des opérateurs.
+        La population initiale est copiée : l'appelant garde la sienne intacte.
+        Les tampons prennent le type des gènes après mutation (entiers promus
+        en flottants par GaussianMutator).
+        """
+        fitness = self.population.fitness
+        genes = self.population.genes.astype(self.mutator.result_dtype(self.population.genes.dtype))
+        self._genes = [genes, np.empty_like(genes)]
+        self._fitness = [fitness.copy(), np.empty_like(fitness)]
+        self._parents = (np.empty_like(genes), np.empty_like(genes))
+        self._scratch = Scratch(genes.shape)
+        self._current = 0
+        self.population = Population.from_genes(self.population.chromosome_class,
+                                                self._genes[0], self._fitness[0])
+
+    def _select_parents(self):
+        pop = self.population
+        first, second = self._parents
+        if self.selection is None:
+            np.take(pop.genes, pop.tournament(pop.size, self.tournament_size, self.rng), axis=0, out=first)
+            np.take(pop.genes, pop.tournament(pop.size, self.tournament_size, self.rng), axis=0, out=second)
+        else:
+            for i in range(pop.size):
+                first[i] = self.selection(pop).genes
+                second[i] = self.selection(pop).genes
+        return first, second
+
     def _evolve(self) -> Population:
-        offspring = [
-            self.mutator(self.crossover(
-                self.selection(self.population),
-                self.selection(self.population)
-            )) for _ in range(self.population.size)
-        ]
-        return Population(offspring)
+        pop = self.population
+        first, second = self._select_parents()
+        following = 1 - self._current
+        offspring, fitness = self._genes[following], self._fitness[following]
+        self.crossover.cross(first, second, out=offspring, rng=self.rng,
+                             chromosome_class=pop.chromosome_class, scratch=self._scratch)
+        self.mutator.mutate(offspring, rng=self.rng, chromosome_class=pop.chromosome_class,
+                            scratch=self._scratch)
+        fitness.fill(np.nan)
+        self._current = following
+        return Population.from_genes(pop.chromosome_class, offspring, fitness)
 
     def _update_history(self):
-        self.history["best"].append(self.population.best().fitness)
-        self.history["avg"].append(self.population.average_fitness())
\ No newline at end of file
+        fitness = self.population.evaluate()
+        self.history["best"].append(float(fitness.max()))
+        self.history["avg"].append(float(fitness.mean()))
@@ -1,17 +1,50 @@
 from abc import ABC, abstractmethod
+from typing import Optional, Tuple, Type
 import numpy as np
 from ..common.chromosome import Chromosome
 
+# Générateur des appels individuels (__call__)
+_RNG = np.random.default_rng()
+
+class Scratch:
+    """Tableaux de travail des opérateurs vectorisés, alloués une fois par forme (taille x n_gènes)"""
+    def __init__(self, shape: Tuple[int, ...]):
+        self.shape = shape
+        self.uniform = np.empty(shape)               # tirages U[0, 1)
+        self.normal = np.empty(shape)                # tirages N(0, 1)
+        self.mask = np.empty(shape, dtype=bool)
+
 class Crossover(ABC):
     @abstractmethod
     def __call__(self, p1: 'Chromosome', p2: 'Chromosome') -> 'Chromosome':
         pass
 
+    def cross(self, parents1: np.ndarray, parents2: np.ndarray, out: np.ndarray,
+              rng: np.random.Generator, chromosome_class: Type[Chromosome],
+              scratch: Optional[Scratch] = None) -> np.ndarray:
+        """
+        Croisement d'une génération : ligne i de `out` <- enfant de
+        parents1[i] et parents2[i]. Par défaut, appel de __call__ ligne par
+        ligne ; les opérateurs vectorisés la redéfinissent.
+        """
+        for i in range(len(out)):
+            out[i] = self(chromosome_class(parents1[i]), chromosome_class(parents2[i])).genes
+        return out
+
 class UniformCrossover(Crossover):
     def __call__(self, p1, p2):
-        mask = np.random.randint(0, 2, size=len(p1.genes))
-        new_genes = np.where(mask, p1.genes, p2.genes)
-        return p1.__class__(new_genes)
+        genes = np.empty_like(p1.genes)
+        self.cross(p1.genes[None], p2.genes[None], genes[None], _RNG, type(p1))
+        return p1.__class__(genes)
+
+    def cross(self, parents1, parents2, out, rng, chromosome_class=None, scratch=None):
+        # Chaque gène vient de l'un ou l'autre parent avec probabilité 1/2
+        scratch = scratch or Scratch(out.shape)
+        rng.random(out=scratch.uniform)
+        np.less(scratch.uniform, 0.5, out=scratch.mask)
+        np.copyto(out, parents2)
+        np.copyto(out, parents1, where=scratch.mask)
+        return out
 
 class Mutator(ABC):
     def __init__(self, rate: float = 0.01):
@@ -21,9 +54,41 @@ class Mutator(ABC):
     def __call__(self, chrom: 'Chromosome') -> 'Chromosome':
         pass
 
+    def result_dtype(self, dtype: np.dtype) -> np.dtype:
+        """Type des gènes après mutation de gènes de type `dtype` (tampons de GeneticAlgorithm)"""
+        return np.dtype(dtype)
+
+    def mutate(self, genes: np.ndarray, rng: np.random.Generator,
+               chromosome_class: Type[Chromosome], scratch: Optional[Scratch] = None) -> np.ndarray:
+        """
+        Mutation en place d'une génération (matrice des gènes). Par défaut,
+        appel de __call__ ligne par ligne ; les opérateurs vectorisés la
+        redéfinissent.
+        """
+        for i in range(len(genes)):
+            genes[i] = self(chromosome_class(genes[i].copy())).genes
+        return genes
+
 class GaussianMutator(Mutator):
+    def __init__(self, rate: float = 0.01, sigma: float = 0.1):
+        super().__init__(rate)
+        self.sigma = sigma
+
+    def result_dtype(self, dtype):
+        # Bruit flottant : des gènes entiers deviennent flottants (comme genes + noise)
+        return np.result_type(dtype, np.float64)
+
     def __call__(self, chrom):
-        noise = np.random.normal(0, 0.1, size=len(chrom.genes))
-        mask = np.random.random(size=len(chrom.genes)) < self.rate
-        new_genes = np.where(mask, chrom.genes + noise, chrom.genes)
-        return chrom.__class__(new_genes)
\ No newline at end of file
+        genes = np.array(chrom.genes, dtype=self.result_dtype(np.asarray(chrom.genes).dtype))
+        self.mutate(genes[None], _RNG, type(chrom))
+        return chrom.__class__(genes)
+
+    def mutate(self, genes, rng, chromosome_class=None, scratch=None):
+        # Bruit N(0, sigma) sur chaque gène avec probabilité `rate`
+        scratch = scratch or Scratch(genes.shape)
+        rng.random(out=scratch.uniform)
+        np.less(scratch.uniform, self.rate, out=scratch.mask)
+        rng.standard_normal(out=scratch.normal)
+        scratch.normal *= self.sigma
+        np.add(genes, scratch.normal, out=genes, where=scratch.mask)
+        return genes
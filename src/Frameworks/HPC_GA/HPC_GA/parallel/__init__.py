@@ -1,13 +1,22 @@
 """
 Implémentations parallèles :
 - ParallelGeneticAlgorithm : Modèle d'îlots parallèles
-- Utilitaires pour MPI/multiprocessing
+- Utilitaires pour MPI/multiprocessing (ressources partagées entre processus : shared)
 """
 
-from .parallel_ga import ParallelGeneticAlgorithm
-from .utils import split_population
+from .._lazy import lazy_attributes
 
 __all__ = [
     'ParallelGeneticAlgorithm',
-    'split_population'
-]
\ No newline at end of file
+    'split_population',
+    'attach_shared',
+    'shared'
+]
+
+# Sous-modules importés au premier accès aux noms
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'ParallelGeneticAlgorithm': '.parallel_ga',
+    'split_population': '.utils',
+    'attach_shared': '.utils',
+    'shared': '.utils',
+})
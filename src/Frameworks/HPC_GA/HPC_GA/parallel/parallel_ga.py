@@ -1,8 +1,22 @@
 from ..common.chromosome import Chromosome
 from multiprocessing import Pool
-from typing import List
+from typing import Any, Dict, List, Optional
 from ..core.genetic_algorithm import GeneticAlgorithm
 from ..common.population import Population
+from .utils import attach_shared
+
+# Paramètres du GA des îlots, transmis une fois par processus du pool
+_ISLAND_KWARGS: Dict[str, Any] = {}
+
+def _init_island_worker(ga_kwargs: Dict[str, Any], shared: Optional[Dict[str, Any]]):
+    _ISLAND_KWARGS.clear()
+    _ISLAND_KWARGS.update(ga_kwargs)
+    attach_shared(shared)
+
+def _run_island(pop: Population) -> Population:
+    ga = GeneticAlgorithm(population=pop, **_ISLAND_KWARGS)
+    ga.run()
+    return ga.population
 
 class ParallelGeneticAlgorithm:
     def __init__(
@@ -12,30 +26,35 @@ class ParallelGeneticAlgorithm:
         mutator,
         migration_interval: int = 5,
         n_processes: int = 4,
+        shared: Optional[Dict[str, Any]] = None,
         **kwargs
     ):
+        """
+        shared : ressources communes aux îlots (nom -> valeur ou handle exposant
+        attach(), comme un graphe en mémoire partagée), transmises une fois par
+        processus et lues par les chromosomes via HPC_GA.parallel.shared(nom).
+        Les tâches ne transportent que les populations.
+        """
         self.populations = populations
         self.migration_interval = migration_interval
         self.n_processes = n_processes
+        self.shared = shared or {}
         self.ga_kwargs = {
             "crossover": crossover,
             "mutator": mutator,
             **kwargs
         }
 
-    def _run_island(self, pop: Population) -> Population:
-        ga = GeneticAlgorithm(population=pop, **self.ga_kwargs)
-        ga.run()
-        return ga.population
-
     def run(self) -> 'Chromosome':
-        with Pool(self.n_processes) as pool:
+        attach_shared(self.shared)
+        with Pool(self.n_processes, initializer=_init_island_worker,
+                  initargs=(self.ga_kwargs, self.shared)) as pool:
             for _ in range(self.ga_kwargs.get("max_generations", 100) // self.migration_interval):
-                self.populations = pool.map(self._run_island, self.populations)
+                self.populations = pool.map(_run_island, self.populations)
                 self._migrate()
         return max([pop.best() for pop in self.populations])
 
     def _migrate(self):
         migrants = [pop.best() for pop in self.populations]
         for i, pop in enumerate(self.populations):
-            pop.individuals[-1] = migrants[(i + 1) % len(self.populations)]
\ No newline at end of file
+            pop[-1] = migrants[(i + 1) % len(self.populations)]
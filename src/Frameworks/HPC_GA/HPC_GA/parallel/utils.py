@@ -1,10 +1,28 @@
 import numpy as np
-from typing import List
+from typing import Any, Dict, List, Optional
 from ..common.population import Population
 
+# Ressources partagées du run, attachées par le processus courant (attach_shared)
+_SHARED: Dict[str, Any] = {}
+
 def split_population(pop: 'Population', n_islands: int) -> List['Population']:
-    indices = np.array_split(np.arange(len(pop.individuals)), n_islands)
-    return [
-        Population([pop.individuals[i] for i in idx])
-        for idx in indices
-    ]
\ No newline at end of file
+    indices = np.array_split(np.arange(pop.size), n_islands)
+    return [pop.take(idx) for idx in indices]
+
+def attach_shared(handles: Optional[Dict[str, Any]]):
+    """
+    Attache les ressources partagées d'un run : chaque handle exposant attach()
+    (par exemple un graphe en mémoire partagée) est attaché une fois par
+    processus, les autres valeurs sont gardées telles quelles. Initialiseur
+    des processus du pool, appelé aussi dans le processus principal.
+    """
+    for name, handle in (handles or {}).items():
+        _SHARED[name] = handle.attach() if hasattr(handle, 'attach') else handle
+
+def shared(name: str) -> Any:
+    """Ressource partagée `name` du processus courant (pour Chromosome.evaluate)"""
+    try:
+        return _SHARED[name]
+    except KeyError:
+        raise KeyError(f"Ressource partagée {name!r} non attachée "
+                       f"(paramètre shared de ParallelGeneticAlgorithm)") from None
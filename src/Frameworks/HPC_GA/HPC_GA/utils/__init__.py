@@ -4,11 +4,15 @@ Fonctions utilitaires :
 - visualization.py : Outils de visualisation
 """
 
-from .fitness import normalize, penalty
-from .visualization import plot_evolution
+from .._lazy import lazy_attributes
 
 __all__ = [
     'normalize',
-    'penalty',
     'plot_evolution'
-]
\ No newline at end of file
+]
+
+# Sous-modules importés au premier accès aux noms
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'normalize': '.fitness',
+    'plot_evolution': '.visualization',
+})
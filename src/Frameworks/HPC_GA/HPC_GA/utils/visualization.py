@@ -1,8 +1,13 @@
-import matplotlib.pyplot as plt
-from ..common import GeneticAlgorithm
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..core.genetic_algorithm import GeneticAlgorithm
 
 def plot_evolution(ga: 'GeneticAlgorithm'):
+    # matplotlib n'est importé qu'au premier tracé (plusieurs centaines de ms)
+    import matplotlib.pyplot as plt
+
     plt.plot(ga.history["best"], label="Best Fitness")
     plt.plot(ga.history["avg"], label="Average Fitness")
     plt.legend()
-    plt.show()
\ No newline at end of file
+    plt.show()
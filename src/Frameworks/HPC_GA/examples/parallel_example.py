@@ -1,12 +1,17 @@
 from HPC_GA import Chromosome, Population, ParallelGeneticAlgorithm
 from HPC_GA.core.operators import UniformCrossover, GaussianMutator
-from HPC_GA.utils import split_population  # Import split_population if it exists in fastGA
+from HPC_GA.parallel import split_population
 import numpy as np
 
 class SphereChromosome(Chromosome):
     def evaluate(self):
         return -np.sum(self.genes**2)
 
+    @classmethod
+    def evaluate_batch(cls, genes_matrix):
+        # Toute la génération en un seul calcul numpy
+        return -np.sum(genes_matrix**2, axis=1)
+
 # Création d'une population divisée en îlots
 pop = Population([SphereChromosome(np.random.rand(3)) for _ in range(100)])
 islands = split_population(pop, n_islands=4)
@@ -2,8 +2,14 @@
 fastTabou - Framework for Tabu Search algorithms with sequential and parallel implementations
 """
 
-from .sequential import TabouSearch
-from .parallel import ParallelTabouSearch
+from ._lazy import lazy_attributes
 
 __version__ = "0.1.0"
-__all__ = ['TabouSearch', 'ParallelTabouSearch']
\ No newline at end of file
+__all__ = ['TabouSearch', 'ParallelTabouSearch']
+
+# Sous-modules importés au premier accès aux noms : `import HPC_Tabu` ne charge
+# pas multiprocessing (démarrage des processus fils en spawn)
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'TabouSearch': '.sequential.tabou_search',
+    'ParallelTabouSearch': '.parallel.parallel_tabou',
+})
@@ -1,4 +1,9 @@
-from .solution import Solution
-from .neighborhood import NeighborhoodGenerator
+from .._lazy import lazy_attributes
 
-__all__ = ['Solution', 'NeighborhoodGenerator']
\ No newline at end of file
+__all__ = ['Solution', 'NeighborhoodGenerator']
+
+# Sous-modules importés au premier accès aux noms
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'Solution': '.solution',
+    'NeighborhoodGenerator': '.neighborhood',
+})
@@ -1,3 +1,10 @@
-from .parallel_tabou import ParallelTabouSearch
+from .._lazy import lazy_attributes
 
-__all__ = ['ParallelTabouSearch']
\ No newline at end of file
+__all__ = ['ParallelTabouSearch', 'attach_shared', 'shared']
+
+# Sous-modules importés au premier accès aux noms
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'ParallelTabouSearch': '.parallel_tabou',
+    'attach_shared': '.utils',
+    'shared': '.utils',
+})
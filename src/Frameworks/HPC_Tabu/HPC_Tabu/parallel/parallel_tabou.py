@@ -1,7 +1,20 @@
 from multiprocessing import Pool
-from typing import List
+from typing import Any, Dict, List, Optional
 from ..sequential.tabou_search import TabouSearch
 from ..common import Solution, NeighborhoodGenerator
+from .utils import attach_shared
+
+# Paramètres des recherches, transmis une fois par processus du pool
+_SEARCH_KWARGS: Dict[str, Any] = {}
+
+def _init_search_worker(search_kwargs: Dict[str, Any], shared: Optional[Dict[str, Any]]):
+    _SEARCH_KWARGS.clear()
+    _SEARCH_KWARGS.update(search_kwargs)
+    attach_shared(shared)
+
+def _search(initial_solution: Solution) -> Solution:
+    ts = TabouSearch(initial_solution=initial_solution, **_SEARCH_KWARGS)
+    return ts.run()
 
 class ParallelTabouSearch:
     def __init__(
@@ -10,24 +23,28 @@ class ParallelTabouSearch:
         neighborhood_generator: NeighborhoodGenerator,
         tabu_tenure: int = 10,
         n_processes: int = 4,
+        shared: Optional[Dict[str, Any]] = None,  # Ressources communes (handles exposant attach())
         **kwargs  # Accepte intensification/diversification
     ):
         self.initial_solutions = initial_solutions
         self.neighborhood = neighborhood_generator
         self.tabu_tenure = tabu_tenure
         self.n_processes = n_processes
+        self.shared = shared or {}
         self.kwargs = kwargs  # Passage des paramètres avancés
 
-    def _worker(self, initial_solution: Solution) -> Solution:
-        ts = TabouSearch(
-            initial_solution=initial_solution,
-            neighborhood_generator=self.neighborhood,
-            tabu_tenure=self.tabu_tenure,
+    def _search_kwargs(self) -> Dict[str, Any]:
+        return {
+            "neighborhood_generator": self.neighborhood,
+            "tabu_tenure": self.tabu_tenure,
             **self.kwargs
-        )
-        return ts.run()
+        }
 
     def run(self) -> Solution:
-        with Pool(self.n_processes) as pool:
-            results = pool.map(self._worker, self.initial_solutions)
-        return max(results, key=lambda x: x.evaluate())
\ No newline at end of file
+        # Paramètres et ressources partagées envoyés une fois par processus :
+        # les tâches ne transportent que les solutions initiales
+        attach_shared(self.shared)
+        with Pool(self.n_processes, initializer=_init_search_worker,
+                  initargs=(self._search_kwargs(), self.shared)) as pool:
+            results = pool.map(_search, self.initial_solutions)
+        return max(results, key=lambda x: x.evaluate())
@@ -1,9 +1,12 @@
 def default_stopping_condition(ts):
     """Condition d'arrêt par défaut : 50 itérations pour le parallèle"""
     return ts.iterations >= 50
-from typing import Callable, List
+from typing import Any, Callable, Dict, List, Optional
 from ..common.solution import Solution
 
+# Ressources partagées de la recherche, attachées par le processus courant (attach_shared)
+_SHARED: Dict[str, Any] = {}
+
 # --- Aspiration Criteria ---
 def basic_aspiration(candidate: Solution, best: Solution) -> bool:
     return candidate.evaluate() > best.evaluate()
@@ -20,4 +23,23 @@ def frequency_based_intensification(neighbors: List[Solution], freq_map: dict, t
 def restart_based_diversification(current_solution: Solution, freq_map: dict):
     """Réinitialise la recherche depuis une solution peu explorée."""
     least_visited = min(freq_map.items(), key=lambda x: x[1])[0]
-    return least_visited
\ No newline at end of file
+    return least_visited
+
+# --- Ressources partagées entre processus ---
+def attach_shared(handles: Optional[Dict[str, Any]]):
+    """
+    Attache les ressources partagées d'une recherche : chaque handle exposant
+    attach() (par exemple un graphe en mémoire partagée) est attaché une fois
+    par processus, les autres valeurs sont gardées telles quelles.
+    Initialiseur des processus du pool, appelé aussi dans le processus principal.
+    """
+    for name, handle in (handles or {}).items():
+        _SHARED[name] = handle.attach() if hasattr(handle, 'attach') else handle
+
+def shared(name: str) -> Any:
+    """Ressource partagée `name` du processus courant (pour Solution.evaluate)"""
+    try:
+        return _SHARED[name]
+    except KeyError:
+        raise KeyError(f"Ressource partagée {name!r} non attachée "
+                       f"(paramètre shared de ParallelTabouSearch)") from None
@@ -1,3 +1,8 @@
-from .tabou_search import TabouSearch
+from .._lazy import lazy_attributes
 
-__all__ = ['TabouSearch']
\ No newline at end of file
+__all__ = ['TabouSearch']
+
+# Sous-modules importés au premier accès aux noms
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'TabouSearch': '.tabou_search',
+})
@@ -1,59 +1,30 @@
+import io
 import pandas as pd
 import numpy as np
-from scipy.stats import pearsonr
 import os
-from collections import defaultdict
-import glob
+from pathlib import Path
 
+from compressed_input import input_stream
+from edge_store import EdgeSetWriter, edge_count, iter_edges, network_files, read_edges, write_edges
+from idmapping_index import open_idmapping_index
+from instrumentation import count, stage, traced
+from memory_budget import BudgetExceeded, Estimate, plan
+
+# Estimations mémoire pour le mode à budget (memory_budget.py), par interaction :
+# lignes lues et filtrées, résultats en dictionnaires
+BYTES_PER_EDGE = 700
+
+@traced("mapping")
 def load_mapping(file_path):
-    """Charge les mappings d'identifiants avec tous les types pertinents"""
-    mapping = {
-        'uniprot_to_gene': defaultdict(list),
-        'uniprot_to_name': defaultdict(list),
-        'gene_to_uniprot': defaultdict(list),
-        'name_to_uniprot': defaultdict(list),
-        'orf_to_uniprot': defaultdict(list),
-        'uniprot_to_uniprot': defaultdict(list),
-        'ensembl_to_uniprot': defaultdict(list),
-        'string_to_uniprot': defaultdict(list)
-    }
-    
-    with open(file_path, 'r') as f:
-        for line in f:
-            parts = line.strip().split('\t')
-            if len(parts) >= 3:
-                uniprot_id = parts[0]
-                db = parts[1]
-                db_id = parts[2]
-                
-                # Mapper Uniprot à lui-même
-                mapping['uniprot_to_uniprot'][uniprot_id].append(uniprot_id)
-                
-                if db == 'Gene_OrderedLocusName':
-                    mapping['uniprot_to_gene'][uniprot_id].append(db_id)
-                    mapping['gene_to_uniprot'][db_id].append(uniprot_id)
-                elif db == 'Gene_Name':
-                    mapping['uniprot_to_name'][uniprot_id].append(db_id)
-                    mapping['name_to_uniprot'][db_id.upper()].append(uniprot_id)
-                elif db == 'ORF':
-                    mapping['orf_to_uniprot'][db_id].append(uniprot_id)
-                elif db == 'Ensembl':
-                    mapping['ensembl_to_uniprot'][db_id].append(uniprot_id)
-                elif db == 'STRING':
-                    mapping['string_to_uniprot'][db_id].append(uniprot_id)
-    
-    # Simplifier les mappings en gardant le premier élément
-    simple_mappings = {}
-    for map_type in mapping:
-        simple_mappings[map_type] = {k: v[0] for k, v in mapping[map_type].items() if v}
-    
-    return simple_mappings
+    """Ouvre l'index idmapping partagé (compilé une seule fois, en mémoire mappée)"""
+    return open_idmapping_index(Path(file_path))
 
+@traced("expression")
 def load_expression_data(file_path, mappings, species):
     """Charge les données d'expression en fonction de l'espèce"""
     try:
-        # Trouver le début des données
-        with open(file_path, 'r', encoding='utf-8') as f:
+        # Trouver le début des données (GEO distribue les .soft compressés en .soft.gz)
+        with input_stream(file_path) as source, io.TextIOWrapper(source, encoding='utf-8') as f:
             for line in f:
                 if line.startswith('!dataset_table_begin'):
                     break
@@ -82,43 +53,31 @@ def load_expression_data(file_path, mappings, species):
             df[col] = pd.to_numeric(df[col], errors='coerce')
         df = df.dropna(how='all')
         
-        # Mapping différent selon l'espèce
+        # Mapping différent selon l'espèce (recherche vectorisée sur tout l'index)
+        identifiers = df.index.astype(str).str.strip()
         if species == 'human':
-            # Pour les données humaines, essayer plusieurs stratégies
-            def human_mapper(x):
-                try:
-                    x = str(x).upper()
-                    if x in mappings['name_to_uniprot']:
-                        return mappings['name_to_uniprot'][x]
-                    return None
-                except:
-                    return None
-            
-            df.index = df.index.map(human_mapper)
+            # Pour les données humaines, utiliser les noms de gènes
+            uniprot, found = mappings.lookup('Gene_Name', identifiers)
         else:
             # Pour la levure, utiliser les ORFs/noms de gènes
-            def yeast_mapper(x):
-                try:
-                    x = str(x)
-                    if x in mappings['gene_to_uniprot']:
-                        return mappings['gene_to_uniprot'][x]
-                    if x in mappings['orf_to_uniprot']:
-                        return mappings['orf_to_uniprot'][x]
-                    if x.upper() in mappings['name_to_uniprot']:
-                        return mappings['name_to_uniprot'][x.upper()]
-                    return None
-                except:
-                    return None
-            
-            df.index = df.index.map(yeast_mapper)
+            uniprot, found = mappings.lookup_first(
+                ['Gene_OrderedLocusName', 'ORF', 'Gene_Name'], identifiers)
+
+        df = df[found]
+        df.index = pd.Index(uniprot[found], name=df.index.name)
+        df = df.dropna()
+        count(rows_in=len(found), rows_out=len(df))
         
-        return df.dropna()
+        return df
     except Exception as e:
         print(f"Erreur lors du chargement des données d'expression: {str(e)}")
         return pd.DataFrame()
 
 def calculate_pcc(v, u):
     """Calcule le coefficient de corrélation de Pearson avec vérification de longueur"""
+    # Import différé : scipy.stats coûte plus d'une demi-seconde à l'import
+    from scipy.stats import pearsonr
+
     try:
         # Convertir en arrays numpy et s'assurer qu'ils sont 1D
         v = np.asarray(v, dtype=float).flatten()
@@ -151,9 +110,11 @@ def calculate_pcc(v, u):
         print(f"Error calculating PCC between shapes {np.shape(v)} and {np.shape(u)}: {str(e)}")
         return np.nan
 
-def calculate_coexpression(ppi, expr_data, output_file):
-    """Calcule et sauvegarde les scores de co-expression"""
+@traced("calcul_CO")
+def coexpression_scores(ppi, expr_data):
+    """Scores de co-expression (PCC ramené à [0,1]) des interactions, None si le recouvrement est insuffisant"""
     results = []
+    count(rows_in=len(ppi))
     proteins_in_ppi = set(ppi['protein1']).union(set(ppi['protein2']))
     proteins_in_expr = set(expr_data.index)
     common_proteins = proteins_in_ppi.intersection(proteins_in_expr)
@@ -165,7 +126,7 @@ def calculate_coexpression(ppi, expr_data, output_file):
     
     if len(common_proteins) < 2:
         print("Avertissement: Pas assez de protéines communes pour calculer la co-expression!")
-        return
+        return None
     
     # Pré-traitement: s'assurer que toutes les protéines ont le même nombre de points de données
     min_length = min([len(expr_data.loc[p].values) for p in common_proteins])
@@ -190,79 +151,135 @@ def calculate_coexpression(ppi, expr_data, output_file):
             if not np.isnan(pcc):
                 results.append({'protein1': p1, 'protein2': p2, 'PCC': pcc})
     
-    if results:
-        result_df = pd.DataFrame(results)
-        result_df.to_csv(output_file, sep='\t', index=False)
+    count(rows_out=len(results))
+    return pd.DataFrame(results, columns=['protein1', 'protein2', 'PCC'])
+
+def calculate_coexpression(ppi, expr_data, output_file):
+    """Calcule et sauvegarde les scores de co-expression"""
+    result_df = coexpression_scores(ppi, expr_data)
+    if result_df is None:
+        return
+    
+    if not result_df.empty:
+        write_edges(result_df, output_file)
+        count(rows_out=len(result_df))
         print(f"\nRésultats sauvegardés dans {output_file} ({len(result_df)} paires valides)")
     else:
         print("\nAucun résultat valide à sauvegarder.")
 
-def process_dataset(base_dir, species):
-    """Traite un ensemble de données complet"""
-    print(f"\n=== Traitement des données {species} ===")
-    
+def coexpression_estimate(ppi_file, expr_data):
+    """Estimation mémoire du calcul de co-expression d'un réseau (données d'expression communes)"""
+    n_edges = edge_count(ppi_file)
+    fixed = int(expr_data.memory_usage(deep=True).sum())
+    return Estimate(n_edges, fixed + n_edges * BYTES_PER_EDGE, fixed, BYTES_PER_EDGE)
+
+@traced("calcul_CO_blocs")
+def calculate_coexpression_blocked(ppi_file, mappings, expr_data, output_file, block_rows):
+    """calculate_coexpression par blocs d'interactions lus et écrits au fil de l'eau"""
+    with EdgeSetWriter(output_file, columns=['PCC']) as writer:
+        for ppi in iter_edges(ppi_file, block_rows, columns=[], header=None,
+                              names=['protein1', 'protein2'], dtype=str):
+            count(rows_in=len(ppi))
+            ppi = select_interactions(ppi, mappings)
+            if ppi.empty:
+                continue
+            result_df = coexpression_scores(ppi, expr_data)
+            if result_df is not None and not result_df.empty:
+                writer.write(result_df)
+    count(rows_out=writer.n_edges)
+    print(f"\nRésultats sauvegardés dans {output_file} ({writer.n_edges} paires valides)")
+
+def load_dataset(base_dir, species):
+    """Charge le mapping et les données d'expression d'une espèce, (mappings, expr_data) ou None"""
     # Déterminer les noms de fichiers en fonction de l'espèce
     if species == 'human':
         mapping_file = os.path.join(base_dir, "raw data/autres/HUMAN_9606_idmapping.dat")
         expr_file = os.path.join(base_dir, "raw data/autres/human_co-expression.soft")
-        ppi_pattern = os.path.join(base_dir, "clean data/interactions/*humain*")
     else:  # levure
         mapping_file = os.path.join(base_dir, "raw data/autres/YEAST_559292_idmapping.dat")
         expr_file = os.path.join(base_dir, "raw data/autres/levure_co-expression.soft")
-        ppi_pattern = os.path.join(base_dir, "clean data/interactions/*levure*")
     
     # Charger les mappings
     if not os.path.exists(mapping_file):
         print(f"Fichier de mapping introuvable: {mapping_file}")
-        return
+        return None
     
     mappings = load_mapping(mapping_file)
     print(f"\nStatistiques de mapping:")
-    print(f"- Uniprot IDs: {len(mappings['uniprot_to_uniprot'])}")
-    print(f"- Gene names: {len(mappings['name_to_uniprot'])}")
-    print(f"- Gene IDs: {len(mappings['gene_to_uniprot'])}")
-    print(f"- ORFs: {len(mappings['orf_to_uniprot'])}")
-    print(f"- Ensembl IDs: {len(mappings['ensembl_to_uniprot'])}")
-    print(f"- STRING IDs: {len(mappings['string_to_uniprot'])}")
+    print(f"- Uniprot IDs: {mappings.n_uniprot}")
+    print(f"- Gene names: {mappings.count('Gene_Name')}")
+    print(f"- Gene IDs: {mappings.count('Gene_OrderedLocusName')}")
+    print(f"- ORFs: {mappings.count('ORF')}")
+    print(f"- Ensembl IDs: {mappings.count('Ensembl')}")
+    print(f"- STRING IDs: {mappings.count('STRING')}")
     
     # Charger les données d'expression
     if not os.path.exists(expr_file):
         print(f"Fichier d'expression introuvable: {expr_file}")
-        return
+        return None
     
     expr_data = load_expression_data(expr_file, mappings, species)
     if expr_data.empty:
         print("Avertissement: Aucune donnée d'expression valide après mapping!")
-        return
+        return None
     
     print(f"\nDonnées d'expression chargées: {len(expr_data)} protéines")
+    return mappings, expr_data
+
+def select_interactions(ppi, mappings):
+    """Garder les interactions dont les deux identifiants sont des UniProt connus"""
+    ppi = ppi.dropna()
+    return ppi[mappings.has_uniprot(ppi['protein1'].values) & mappings.has_uniprot(ppi['protein2'].values)]
+
+@traced("CO", detail="species")
+def process_dataset(base_dir, species):
+    """Traite un ensemble de données complet"""
+    print(f"\n=== Traitement des données {species} ===")
+    
+    dataset = load_dataset(base_dir, species)
+    if dataset is None:
+        return
+    mappings, expr_data = dataset
     
     # Traiter les fichiers PPI
-    ppi_files = glob.glob(ppi_pattern)
+    if species == 'human':
+        ppi_pattern = os.path.join(base_dir, "clean data/interactions/*humain*")
+    else:  # levure
+        ppi_pattern = os.path.join(base_dir, "clean data/interactions/*levure*")
+    ppi_files = network_files(os.path.dirname(ppi_pattern), os.path.basename(ppi_pattern))
     if not ppi_files:
         print(f"Aucun fichier PPI trouvé avec le pattern: {ppi_pattern}")
     
     for ppi_file in ppi_files:
         print(f"\nTraitement de {os.path.basename(ppi_file)}")
         try:
-            ppi = pd.read_csv(ppi_file, sep='\t', header=None, names=['protein1', 'protein2'], dtype=str)
-            
-            # Mapper les identifiants
-            ppi['protein1'] = ppi['protein1'].apply(lambda x: mappings['uniprot_to_uniprot'].get(x, None))
-            ppi['protein2'] = ppi['protein2'].apply(lambda x: mappings['uniprot_to_uniprot'].get(x, None))
-            ppi = ppi.dropna()
+            with stage("reseau", detail=Path(ppi_file).stem):
+                output_name = os.path.splitext(os.path.basename(ppi_file))[0]
+                output_file = os.path.join(base_dir, f"clean data/autres/coexpression_{output_name}.txt")
+                
+                # Sous budget mémoire, les grands réseaux sont traités par blocs
+                execution = plan("CO", lambda: coexpression_estimate(ppi_file, expr_data))
+                if execution.blocked:
+                    calculate_coexpression_blocked(ppi_file, mappings, expr_data, output_file,
+                                                   execution.block_rows)
+                    continue
+                
+                ppi = read_edges(ppi_file, columns=[], header=None, names=['protein1', 'protein2'], dtype=str)
+                count(rows_in=len(ppi))
             
-            if ppi.empty:
-                print("Avertissement: Aucune interaction valide après mapping!")
-                continue
+                # Garder les interactions dont les deux identifiants sont des UniProt connus
+                ppi = select_interactions(ppi, mappings)
             
-            print(f"Interactions chargées: {len(ppi)}")
+                if ppi.empty:
+                    print("Avertissement: Aucune interaction valide après mapping!")
+                    continue
             
-            # Calculer la co-expression
-            output_name = os.path.splitext(os.path.basename(ppi_file))[0]
-            output_file = os.path.join(base_dir, f"clean data/autres/coexpression_{output_name}.txt")
+                print(f"Interactions chargées: {len(ppi)}")
             
-            calculate_coexpression(ppi, expr_data, output_file)
+                # Calculer la co-expression
+                calculate_coexpression(ppi, expr_data, output_file)
+        except BudgetExceeded:
+            raise
         except Exception as e:
             print(f"Erreur lors du traitement: {str(e)}")
 
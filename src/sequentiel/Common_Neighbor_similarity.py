@@ -1,22 +1,34 @@
 import pandas as pd
 import numpy as np
-import networkx as nx
+from scipy import sparse
 from collections import defaultdict
 import os
-import glob
 
+from edge_keys import unpack_pairs
+from edge_store import (EdgeSet, EdgeSetWriter, edge_count, iter_edge_blocks, network_files, read_edges, text_path,
+                        write_edges)
+from instrumentation import count, traced
+from memory_budget import Estimate, SortedRuns, plan
+
+@traced("lecture")
 def load_ppi_network(file_path):
     """Charge un réseau PPI à partir d'un fichier"""
-    ppi = pd.read_csv(file_path, sep='\t', header=None, names=['protein1', 'protein2'])
+    ppi = read_edges(file_path, columns=[], header=None, names=['protein1', 'protein2'])
+    count(rows_out=len(ppi))
     return ppi
 
+@traced("graphe")
 def build_graph(ppi_df):
     """Construit un graphe NetworkX à partir d'un dataframe PPI"""
+    # Import différé : seul le calcul HCN en mémoire passe par networkx
+    import networkx as nx
+
     G = nx.Graph()
     for _, row in ppi_df.iterrows():
         G.add_edge(row['protein1'], row['protein2'])
     return G
 
+@traced("calcul_HCN")
 def calculate_hcn_similarity(G, output_file):
     """Calcule la similarité HCN pour toutes les paires de protéines connectées"""
     results = []
@@ -54,39 +66,147 @@ def calculate_hcn_similarity(G, output_file):
     
     # Sauvegarder les résultats
     result_df = pd.DataFrame(results)
-    result_df.to_csv(output_file, sep='\t', index=False)
+    count(rows_in=G.number_of_edges(), rows_out=len(result_df))
+    write_edges(result_df, output_file)
     print(f"Résultats HCN sauvegardés dans {output_file}")
     return result_df
 
+HCN_BATCH = 100_000
+
+# Estimations mémoire (octets par arête) pour le mode à budget (memory_budget.py) :
+# graphe NetworkX et résultats en dictionnaires du calcul en mémoire ; adjacence
+# creuse et segments de tri du calcul par blocs ; produits de lignes d'un bloc
+NETWORKX_BYTES_PER_EDGE = 1_000
+ADJACENCY_BYTES_PER_EDGE = 40
+BLOCK_BYTES_PER_EDGE = 200
+
+# Réseaux finaux du dossier des interactions (sans les fichiers intermédiaires)
+NETWORKS = ["STRING_humain", "BIOGRID_humain", "STRING_levure", "BIOGRID_levure", "DIP_levure"]
+
+def hcn_adjacency(src, dst, n):
+    """Adjacence creuse symétrique (n x n) du graphe (src, dst), arêtes dupliquées et boucles comptées une fois"""
+    src, dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+    adjacency = sparse.csr_matrix(
+        (np.ones(2 * len(src), dtype=np.int32), (np.concatenate([src, dst]), np.concatenate([dst, src]))),
+        shape=(n, n))
+    adjacency.data[:] = 1
+    return adjacency
+
+def hcn_for_edges(src, dst, edge_u, edge_v, batch_size=HCN_BATCH, adjacency=None):
+    """
+    Calcule la similarité HCN d'une sélection d'arêtes (codes entiers) sur le
+    graphe (src, dst), par produits de lignes de l'adjacence creuse.
+    Mêmes valeurs et colonnes que calculate_hcn_similarity, pour les seules
+    arêtes demandées (une mise à jour n'a pas à tout recalculer). L'adjacence
+    déjà construite (hcn_adjacency) peut être fournie, src et dst sont alors ignorés.
+    """
+    edge_u, edge_v = np.asarray(edge_u, dtype=np.int64), np.asarray(edge_v, dtype=np.int64)
+    if adjacency is None:
+        src, dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+        n = int(max(src.max(initial=-1), dst.max(initial=-1), edge_u.max(initial=-1),
+                    edge_v.max(initial=-1))) + 1
+        adjacency = hcn_adjacency(src, dst, n)
+    degree = np.diff(adjacency.indptr)
+
+    common = np.zeros(len(edge_u), dtype=np.int64)
+    for start in range(0, len(edge_u), batch_size):
+        u = edge_u[start:start + batch_size]
+        v = edge_v[start:start + batch_size]
+        common[start:start + batch_size] = np.asarray(
+            adjacency[u].multiply(adjacency[v]).sum(axis=1)).ravel()
+
+    degree_v = degree[edge_u].astype(np.int64)
+    degree_u = degree[edge_v].astype(np.int64)
+    union = degree_v + degree_u - common
+    denominator = degree_v * degree_u * union
+    hcn = np.divide(common.astype(np.float64) ** 2, denominator,
+                    out=np.zeros(len(common)), where=denominator > 0)
+    return {'HCN_score': hcn, 'common_neighbors': common,
+            'degree_v': degree_v, 'degree_u': degree_u}
+
+def hcn_estimate(ppi_file):
+    """Estimation mémoire du calcul HCN d'un réseau (voir memory_budget.plan)"""
+    n_edges = edge_count(ppi_file)
+    return Estimate(n_edges, n_edges * NETWORKX_BYTES_PER_EDGE,
+                    n_edges * ADJACENCY_BYTES_PER_EDGE, BLOCK_BYTES_PER_EDGE)
+
+@traced("calcul_HCN_blocs")
+def calculate_hcn_blocked(ppi_file, output_file, block_rows):
+    """
+    Calcul HCN d'un réseau trop grand pour le graphe NetworkX : lecture par
+    blocs, arêtes dédupliquées par tri externe (clés non orientées, boucles
+    comprises comme dans le graphe), scores par produits de lignes de
+    l'adjacence creuse et écriture bloc par bloc. Les arêtes sortent triées
+    par clé, orientées (code le plus petit, code le plus grand).
+    """
+    src, dst = [], []
+    with SortedRuns(block_rows) as runs:
+        for block in iter_edge_blocks(ppi_file, block_rows, columns=[], header=None,
+                                      names=['protein1', 'protein2']):
+            src.append(np.asarray(block.src))
+            dst.append(np.asarray(block.dst))
+            runs.add(block.keys())
+            vocabulary = block.vocabulary
+        src, dst = np.concatenate(src), np.concatenate(dst)
+        count(rows_in=len(src))
+        adjacency = hcn_adjacency(src, dst, len(vocabulary))
+        del src, dst
+
+        with EdgeSetWriter(output_file) as writer:
+            for keys, _ in runs.merge(block_rows):
+                u, v = unpack_pairs(keys)
+                scores = hcn_for_edges(None, None, u, v, block_rows, adjacency)
+                writer.write(EdgeSet(vocabulary, u, v, scores))
+        count(rows_out=writer.n_edges)
+    print(f"Résultats HCN sauvegardés dans {output_file}")
+    return EdgeSet.load(output_file)
+
+@traced("HCN", detail="ppi_file")
+def process_ppi_file(ppi_file, output_dir):
+    """
+    Calcule les scores HCN d'un fichier PPI (HCN_scores_<réseau>.txt dans output_dir).
+    Sous budget mémoire, les grands réseaux passent par calculate_hcn_blocked.
+    """
+    print(f"\nTraitement du fichier: {os.path.basename(ppi_file)}")
+    output_name = os.path.splitext(os.path.basename(text_path(ppi_file)))[0]
+    output_file = os.path.join(output_dir, f"HCN_scores_{output_name}.txt")
+    
+    execution = plan("HCN", lambda: hcn_estimate(ppi_file))
+    if execution.blocked:
+        hcn_edges = calculate_hcn_blocked(ppi_file, output_file, execution.block_rows)
+        print(f"Nombre d'arêtes: {len(hcn_edges)}")
+        print(f"Score HCN moyen: {np.mean(hcn_edges.columns['HCN_score']):.4f}")
+        print(f"Nombre moyen de voisins communs: {np.mean(hcn_edges.columns['common_neighbors']):.2f}")
+        return hcn_edges
+    
+    # Charger le réseau PPI
+    ppi_df = load_ppi_network(ppi_file)
+    print(f"Nombre d'interactions chargées: {len(ppi_df)}")
+    
+    # Construire le graphe
+    G = build_graph(ppi_df)
+    print(f"Nombre de nœuds: {G.number_of_nodes()}")
+    print(f"Nombre d'arêtes: {G.number_of_edges()}")
+    
+    # Calculer les scores HCN
+    hcn_results = calculate_hcn_similarity(G, output_file)
+    count(rows_in=len(ppi_df), rows_out=len(hcn_results))
+    
+    # Afficher quelques statistiques
+    print(f"Score HCN moyen: {hcn_results['HCN_score'].mean():.4f}")
+    print(f"Nombre moyen de voisins communs: {hcn_results['common_neighbors'].mean():.2f}")
+    return hcn_results
+
 def process_all_ppi_networks(base_dir, output_dir):
     """Traite tous les fichiers PPI dans le dossier spécifié"""
     # Créer le dossier de sortie s'il n'existe pas
     os.makedirs(output_dir, exist_ok=True)
     
-    # Trouver tous les fichiers PPI
-    ppi_files = glob.glob(os.path.join(base_dir, "*i*"))[:5]  # Prendre les 5 premiers fichiers
+    # Réseaux finaux, une entrée par réseau qu'il soit en binaire ou en texte
+    ppi_files = [path for path in network_files(base_dir) if path.stem in NETWORKS]
     
     for ppi_file in ppi_files:
-        print(f"\nTraitement du fichier: {os.path.basename(ppi_file)}")
-        
-        # Charger le réseau PPI
-        ppi_df = load_ppi_network(ppi_file)
-        print(f"Nombre d'interactions chargées: {len(ppi_df)}")
-        
-        # Construire le graphe
-        G = build_graph(ppi_df)
-        print(f"Nombre de nœuds: {G.number_of_nodes()}")
-        print(f"Nombre d'arêtes: {G.number_of_edges()}")
-        
-        # Calculer les scores HCN
-        output_name = os.path.splitext(os.path.basename(ppi_file))[0]
-        output_file = os.path.join(output_dir, f"HCN_scores_{output_name}.txt")
-        
-        hcn_results = calculate_hcn_similarity(G, output_file)
-        
-        # Afficher quelques statistiques
-        print(f"Score HCN moyen: {hcn_results['HCN_score'].mean():.4f}")
-        print(f"Nombre moyen de voisins communs: {hcn_results['common_neighbors'].mean():.2f}")
+        process_ppi_file(ppi_file, output_dir)
 
 if __name__ == "__main__":
     # Configuration des chemins
@@ -2,11 +2,18 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from scipy import sparse
-from sklearn.metrics.pairwise import cosine_similarity
 import re
 from typing import Dict, Tuple, Optional
 import logging
 
+from compressed_input import input_stream
+from edge_keys import unpack_pairs
+from edge_store import (EdgeSetWriter, ProteinVocabulary, edge_count, iter_edges, read_edges, text_path,
+                        vocabulary_file, write_edges)
+from idmapping_index import IdMappingIndex, open_idmapping_index
+from instrumentation import count, traced
+from memory_budget import Estimate, SortedRuns, plan
+
 # Configuration des chemins
 BASE_DIR = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data")
 RAW_DATA_DIR = BASE_DIR / "raw data" / "autres"
@@ -17,37 +24,41 @@ GO_SLIM_YEAST = RAW_DATA_DIR / "go_slim_mapping.tab"
 GO_SLIM_HUMAN = RAW_DATA_DIR / "uniprotkb_Homo_sapiens_Human_AND_model_2025_04_03.tsv"
 MAPPING_FILE = RAW_DATA_DIR / "YEAST_559292_idmapping.dat"
 
+# Estimations mémoire pour le mode à budget (memory_budget.py) : en mémoire, matrice
+# de similarité dense n x n (float64, plus les copies de cosine_similarity) et
+# lignes du réseau en pandas ; par blocs, matrice d'incidence des annotations (par
+# protéine) et lignes d'un bloc (lecture, tri externe, produits de lignes)
+DENSE_BYTES_PER_PAIR = 16
+FRAME_BYTES_PER_EDGE = 300
+ANNOTATION_BYTES_PER_PROTEIN = 1_000
+BLOCK_BYTES_PER_EDGE = 400
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-def load_mapping(mapping_file: Path) -> Tuple[Dict[str, str], Dict[str, str]]:
-    """Charge le mapping UniProt vers SGD et inversement"""
+def load_mapping(mapping_file: Path) -> Optional[IdMappingIndex]:
+    """Ouvre l'index idmapping partagé (UniProt <-> SGD, recherches vectorisées)"""
     try:
-        dtype = {'UniProt': 'string', 'DB': 'string', 'ID': 'string'}
-        df = pd.read_csv(mapping_file, sep='\t', header=None,
-                        names=['UniProt', 'DB', 'ID'], dtype=dtype)
-        
-        sgd_mapping = df[df['DB'] == 'SGD']
-        uniprot_to_sgd = dict(zip(sgd_mapping['UniProt'], sgd_mapping['ID']))
-        sgd_to_uniprot = dict(zip(sgd_mapping['ID'], sgd_mapping['UniProt']))
-        
-        logger.info(f"Loaded {len(uniprot_to_sgd)} UniProt to SGD mappings")
-        return uniprot_to_sgd, sgd_to_uniprot
+        index = open_idmapping_index(mapping_file)
+        logger.info(f"Loaded {index.count('SGD')} SGD to UniProt mappings")
+        return index
     except Exception as e:
         logger.error(f"Erreur lors du chargement du mapping: {e}")
-        return {}, {}
+        return None
 
+@traced("annotations_GO")
 def load_go_slim(go_file: Path, is_human: bool = True, 
-                sgd_to_uniprot: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+                mapping_index: Optional[IdMappingIndex] = None) -> pd.DataFrame:
     """Charge les annotations GO et convertit les identifiants en UniProt si nécessaire"""
     try:
         if is_human:
             # Chargement des données humaines (déjà en UniProt)
-            df = pd.read_csv(go_file, sep='\t', usecols=['Entry', 'Gene Ontology (GO)'], 
-                            dtype={'Entry': 'string'})
+            with input_stream(go_file) as source:
+                df = pd.read_csv(source, sep='\t', usecols=['Entry', 'Gene Ontology (GO)'],
+                                 dtype={'Entry': 'string'})
             
             # Extraction des termes GO
             go_data = []
@@ -58,20 +69,22 @@ def load_go_slim(go_file: Path, is_human: bool = True,
             df_go = pd.DataFrame(go_data, columns=['protein', 'go_term'])
         else:
             # Chargement des données de levure (SGD -> besoin de conversion)
-            df = pd.read_csv(go_file, sep='\t', header=None, 
-                           usecols=[2, 5], names=['protein', 'go_term'],
-                           dtype={'protein': 'string', 'go_term': 'string'})
+            with input_stream(go_file) as source:
+                df = pd.read_csv(source, sep='\t', header=None,
+                                 usecols=[2, 5], names=['protein', 'go_term'],
+                                 dtype={'protein': 'string', 'go_term': 'string'})
             
             # Filtrage des termes GO valides
             df_go = df[df['go_term'].str.contains(r'^GO:\d+$', na=False)].copy()
             
             # Conversion SGD -> UniProt si le mapping est fourni
-            if sgd_to_uniprot:
+            if mapping_index is not None:
                 logger.info("Converting SGD IDs to UniProt IDs in GO annotations")
-                df_go['protein'] = df_go['protein'].map(sgd_to_uniprot)
-                df_go = df_go.dropna(subset=['protein'])  # Enlever les non mappés
+                uniprot, found = mapping_index.lookup('SGD', df_go['protein'].fillna('').values)
+                df_go = df_go[found].assign(protein=uniprot[found])  # Enlever les non mappés
         
         logger.info(f"Loaded {len(df_go)} GO annotations")
+        count(rows_in=len(df), rows_out=len(df_go))
         return df_go.drop_duplicates().reset_index(drop=True)
     except Exception as e:
         logger.error(f"Erreur lors du chargement des annotations GO: {e}")
@@ -79,6 +92,9 @@ def load_go_slim(go_file: Path, is_human: bool = True,
 
 def calculate_functional_similarity(proteins: list, go_annotations: pd.DataFrame) -> Optional[pd.DataFrame]:
     """Calcule la similarité fonctionnelle entre les protéines"""
+    # Import différé : le chemin par blocs (score_interactions_blocked) se passe de sklearn
+    from sklearn.metrics.pairwise import cosine_similarity
+
     try:
         proteins_set = sorted(set(proteins))
         logger.info(f"Calculating functional similarity for {len(proteins_set)} unique proteins")
@@ -114,85 +130,189 @@ def calculate_functional_similarity(proteins: list, go_annotations: pd.DataFrame
         logger.error(f"Error calculating functional similarity: {e}")
         return None
 
+def clean_interactions(ppi: pd.DataFrame) -> pd.DataFrame:
+    """Identifiants en majuscules sans espaces, sans doublons ni valeurs manquantes"""
+    ppi = ppi[['protein1', 'protein2']].astype('string')
+    ppi['protein1'] = ppi['protein1'].str.upper().str.strip()
+    ppi['protein2'] = ppi['protein2'].str.upper().str.strip()
+    return ppi.dropna().drop_duplicates()
+
+@traced("lecture")
 def load_ppi_network(ppi_file: Path) -> pd.DataFrame:
     """Charge un réseau PPI (supposé utiliser des UniProt IDs)"""
     try:
-        ppi = pd.read_csv(ppi_file, sep='\t', header=None,
+        ppi = read_edges(ppi_file, columns=[], header=None,
                          names=['protein1', 'protein2'], dtype='string')
         
-        # Nettoyage des identifiants
-        ppi['protein1'] = ppi['protein1'].str.upper().str.strip()
-        ppi['protein2'] = ppi['protein2'].str.upper().str.strip()
-        
-        # Suppression des doublons et des valeurs manquantes
-        ppi = ppi.dropna().drop_duplicates()
+        # Nettoyage des identifiants, suppression des doublons et des valeurs manquantes
+        ppi = clean_interactions(ppi)
         
         logger.info(f"Loaded PPI network with {len(ppi)} interactions")
+        count(rows_out=len(ppi))
         return ppi
     except Exception as e:
         logger.error(f"Error loading PPI network: {e}")
         return pd.DataFrame(columns=['protein1', 'protein2'])
 
-def main():
-    # Chargement des mappings
-    uniprot_to_sgd, sgd_to_uniprot = load_mapping(MAPPING_FILE)
+@traced("calcul_FS")
+def score_interactions(ppi: pd.DataFrame, go_annotations: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Ajoute la similarité fonctionnelle (colonne weight) aux interactions dont
+    les deux protéines sont annotées, y compris les similarités nulles : seules
+    les paires avec une protéine sans annotation GO sont absentes (score
+    inconnu, ignoré par l'agrégation de Weighted_PPI_Network).
+    """
+    count(rows_in=len(ppi))
+    # Liste de toutes les protéines du réseau
+    all_proteins = list(set(ppi['protein1']).union(set(ppi['protein2'])))
     
-    # Configuration des réseaux à traiter
-    networks = {
-        "STRING_levure": (GO_SLIM_YEAST, False),
-        "BIOGRID_humain": (GO_SLIM_HUMAN, True),
-        "STRING_humain": (GO_SLIM_HUMAN, True),
-        "BIOGRID_levure": (GO_SLIM_YEAST, False),
-        "DIP_levure": (GO_SLIM_YEAST, False)   
-    }
-
-    for network_name, (go_file, is_human) in networks.items():
-        logger.info(f"\nProcessing {network_name} network")
-        
-        # Chargement du réseau PPI
-        ppi_file = INTERACTIONS_DIR / f"{network_name}.txt"
+    # Calcul de la similarité fonctionnelle
+    similarity_matrix = calculate_functional_similarity(all_proteins, go_annotations)
+    
+    if similarity_matrix is None:
+        return None
+    
+    # Paires dont les deux protéines sont annotées (score 0 compris)
+    annotated = set(go_annotations['protein'])
+    ppi = ppi[ppi['protein1'].isin(annotated) & ppi['protein2'].isin(annotated)].copy()
+
+    # Ajout des poids aux interactions
+    ppi['weight'] = [similarity_matrix.at[p1, p2] for p1, p2 in zip(ppi['protein1'], ppi['protein2'])]
+    count(rows_out=len(ppi))
+    return ppi
+
+def annotation_matrix(go_annotations: pd.DataFrame) -> Tuple[pd.Index, sparse.csr_matrix]:
+    """
+    Matrice protéine x terme GO des annotations, lignes normalisées (norme L2) :
+    le produit de deux lignes est leur similarité cosinus.
+    """
+    rows, proteins = pd.factorize(go_annotations['protein'], sort=True)
+    cols, terms = pd.factorize(go_annotations['go_term'])
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)), shape=(len(proteins), len(terms)))
+    norms = np.sqrt(np.asarray(incidence.multiply(incidence).sum(axis=1)).ravel())
+    incidence = sparse.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ incidence
+    return pd.Index(proteins), incidence.tocsr()
+
+def fs_estimate(ppi_file: Path) -> Estimate:
+    """
+    Estimation mémoire du calcul FS d'un réseau. Le nombre de protéines est
+    majoré par deux fois le nombre d'arêtes et par le vocabulaire d'espèce.
+    """
+    n_edges = edge_count(ppi_file)
+    n_proteins = 2 * n_edges
+    vocabulary = ProteinVocabulary.open(vocabulary_file(text_path(ppi_file)))
+    if len(vocabulary):
+        n_proteins = min(n_proteins, len(vocabulary))
+    return Estimate(n_edges, n_proteins ** 2 * DENSE_BYTES_PER_PAIR + n_edges * FRAME_BYTES_PER_EDGE,
+                    n_proteins * ANNOTATION_BYTES_PER_PROTEIN, BLOCK_BYTES_PER_EDGE)
+
+@traced("calcul_FS_blocs")
+def score_interactions_blocked(ppi_file: Path, go_annotations: pd.DataFrame, output_file: Path,
+                               block_rows: int) -> int:
+    """
+    Similarité fonctionnelle d'un réseau trop grand pour la matrice dense :
+    lecture par blocs, doublons retirés par tri externe des paires orientées
+    (comme drop_duplicates), cosinus par produits de lignes de la matrice
+    d'annotations normalisée, écriture bloc par bloc des paires annotées
+    (similarités nulles comprises, comme score_interactions).
+    Les paires sortent triées par protéine.
+
+    Returns:
+        nombre d'interactions écrites
+    """
+    proteins, incidence = annotation_matrix(go_annotations)
+    with SortedRuns(block_rows) as runs:
+        for frame in iter_edges(ppi_file, block_rows, columns=[], header=None,
+                                names=['protein1', 'protein2'], dtype='string'):
+            ppi = clean_interactions(frame)
+            count(rows_in=len(ppi))
+            # Paires dont une protéine n'est pas annotée : score inconnu, écartées d'emblée
+            a = proteins.get_indexer(ppi['protein1'].values)
+            b = proteins.get_indexer(ppi['protein2'].values)
+            known = (a >= 0) & (b >= 0)
+            runs.add((a[known].astype(np.uint64) << np.uint64(32)) | b[known].astype(np.uint64))
+
+        with EdgeSetWriter(output_file, columns=['weight']) as writer:
+            for keys, _ in runs.merge(block_rows):
+                a, b = unpack_pairs(keys)
+                weight = np.asarray(incidence[a].multiply(incidence[b]).sum(axis=1)).ravel()
+                writer.write(pd.DataFrame({'protein1': proteins[a], 'protein2': proteins[b],
+                                           'weight': weight}))
+    count(rows_out=writer.n_edges)
+    return writer.n_edges
+
+# Réseaux à traiter : annotations GO et espèce
+NETWORKS = {
+    "STRING_levure": (GO_SLIM_YEAST, False),
+    "BIOGRID_humain": (GO_SLIM_HUMAN, True),
+    "STRING_humain": (GO_SLIM_HUMAN, True),
+    "BIOGRID_levure": (GO_SLIM_YEAST, False),
+    "DIP_levure": (GO_SLIM_YEAST, False)   
+}
+
+@traced("FS", detail="network_name")
+def process_network(network_name: str, go_file: Path, is_human: bool,
+                    mapping_index: Optional[IdMappingIndex] = None) -> Optional[Path]:
+    """
+    Calcule la similarité fonctionnelle des interactions d'un réseau (FS_<réseau>.txt).
+    Sous budget mémoire, les grands réseaux passent par score_interactions_blocked.
+    """
+    logger.info(f"\nProcessing {network_name} network")
+    
+    # Chargement du réseau PPI (sauf calcul par blocs)
+    ppi_file = INTERACTIONS_DIR / f"{network_name}.txt"
+    execution = plan("FS", lambda: fs_estimate(ppi_file))
+    if not execution.blocked:
         ppi = load_ppi_network(ppi_file)
+        count(rows_in=len(ppi))
         
         if ppi.empty:
             logger.warning(f"No valid interactions found for {network_name}")
-            continue
-        
-        # Chargement des annotations GO avec conversion si nécessaire
-        go_annotations = load_go_slim(
-            go_file, 
-            is_human=is_human,
-            sgd_to_uniprot=sgd_to_uniprot if not is_human else None
-        )
-        
-        if go_annotations.empty:
-            logger.warning(f"No GO annotations found for {network_name}")
-            continue
-        
-        # Liste de toutes les protéines du réseau
-        all_proteins = list(set(ppi['protein1']).union(set(ppi['protein2'])))
-        
-        # Calcul de la similarité fonctionnelle
-        similarity_matrix = calculate_functional_similarity(all_proteins, go_annotations)
-        
-        if similarity_matrix is None:
-            logger.warning(f"Could not compute similarity matrix for {network_name}")
-            continue
-        
-        # Ajout des poids aux interactions
-        ppi['weight'] = ppi.apply(
-            lambda row: similarity_matrix.loc[row['protein1'], row['protein2']]
-            if row['protein1'] in similarity_matrix.index and row['protein2'] in similarity_matrix.columns
-            else 0.0,
-            axis=1
-        )
-        
-        # Filtrage des interactions avec poids > 0
-        ppi = ppi[ppi['weight'] > 0]
-        
-        # Sauvegarde
-        output_file = OUTPUT_DIR / f"FS_{network_name}.txt"
-        ppi.to_csv(output_file, sep='\t', index=False)
-        logger.info(f"Saved weighted network to {output_file} with {len(ppi)} interactions")
+            return None
+    
+    # Index de mapping nécessaire pour convertir les annotations levure (SGD)
+    if not is_human and mapping_index is None:
+        mapping_index = load_mapping(MAPPING_FILE)
+    
+    # Chargement des annotations GO avec conversion si nécessaire
+    go_annotations = load_go_slim(
+        Path(go_file), 
+        is_human=is_human,
+        mapping_index=mapping_index if not is_human else None
+    )
+    
+    if go_annotations.empty:
+        logger.warning(f"No GO annotations found for {network_name}")
+        return None
+    
+    output_file = OUTPUT_DIR / f"FS_{network_name}.txt"
+    if execution.blocked:
+        n_scored = score_interactions_blocked(ppi_file, go_annotations, output_file,
+                                              execution.block_rows)
+        count(rows_out=n_scored)
+        logger.info(f"Saved weighted network to {output_file} with {n_scored} interactions")
+        return output_file
+    
+    # Similarité fonctionnelle des interactions
+    ppi = score_interactions(ppi, go_annotations)
+    
+    if ppi is None:
+        logger.warning(f"Could not compute similarity matrix for {network_name}")
+        return None
+    
+    # Sauvegarde
+    write_edges(ppi, output_file)
+    count(rows_out=len(ppi))
+    logger.info(f"Saved weighted network to {output_file} with {len(ppi)} interactions")
+    return output_file
+
+def main():
+    # Chargement des mappings
+    mapping_index = load_mapping(MAPPING_FILE)
+
+    for network_name, (go_file, is_human) in NETWORKS.items():
+        process_network(network_name, go_file, is_human, mapping_index)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
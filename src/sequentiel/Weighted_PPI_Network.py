@@ -2,7 +2,15 @@ import pandas as pd
 import numpy as np
 import os
 from pathlib import Path
-from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from edge_keys import build_vocabulary, encode_edges, pack_pairs, unique_keys, unpack_pairs
+from edge_store import (ProteinVocabulary, edge_count, edges_exist, edges_mtime, load_edges,
+                        network_files, read_edges, write_edges)
+from instrumentation import count, traced
+from memory_budget import require
+from score_table import ScoreTable
+from aggregation import aggregate
 
 # Configuration des chemins
 BASE_DIR = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\Github_CODE\Data")
@@ -11,95 +19,225 @@ INTERACTIONS_DIR = CLEAN_DATA_DIR / "interactions"
 OUTPUT_DIR = CLEAN_DATA_DIR / "weighted_ppi"
 SIMILARITY_DIR = CLEAN_DATA_DIR / "autres"
 
-# Créer le dossier de sortie
+SCORE_TABLE_DIR = CLEAN_DATA_DIR / "score_tables"
+
+# Créer les dossiers de sortie
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+SCORE_TABLE_DIR.mkdir(parents=True, exist_ok=True)
+
+# Sources de scores : canal -> (motif de fichier, colonne du score)
+SCORE_SOURCES = {
+    'HCN': ("HCN_scores_{}.txt", 'HCN_score'),
+    'PCC': ("coexpression_{}.txt", 'PCC'),
+    'Func': ("FS_{}.txt", 'weight'),
+    'SL': ("SL_{}.txt", 'SL'),
+}
+
+# Politique d'agrégation des canaux (voir aggregation.AGGREGATIONS)
+AGGREGATION_POLICY = 'mean'
+AGGREGATION_PARAMS = {}
+
+# Export TSV du réseau pondéré final (en plus du jeu binaire weighted_<réseau>.edges)
+EXPORT_TSV = True
+
+# Mode à budget (memory_budget.py) : la table de scores reste en mémoire, l'étape
+# échoue d'emblée si elle ne tient pas. Octets par arête du réseau (clés, une
+# colonne par canal, agrégation) et par ligne de source (clés, valeurs, tri)
+TABLE_BYTES_PER_EDGE = 8 + 4 * len(SCORE_SOURCES) + 32
+SOURCE_BYTES_PER_ROW = 40
+
+def load_network_edges(network_name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Charge les arêtes du réseau PPI sous forme codée.
+
+    Returns:
+        (vocabulaire, clés) : protéines triées et clés uint64 triées des arêtes
+    """
+    edges = load_edges(INTERACTIONS_DIR / f"{network_name}.txt", columns=[])
+    if edges is not None:
+        # Recodage entier du jeu binaire, sans passer par les identifiants
+        vocabulary, a, b = edges.compact()
+        valid = a != b
+        return vocabulary, unique_keys(pack_pairs(a[valid], b[valid]))
+
+    ppi = read_edges(INTERACTIONS_DIR / f"{network_name}.txt", header=None,
+                     usecols=[0, 1], names=['protein1', 'protein2'], dtype=str).dropna()
+    vocabulary = build_vocabulary(ppi['protein1'].values, ppi['protein2'].values)
+    keys, _ = encode_edges(ppi['protein1'].values, ppi['protein2'].values, vocabulary)
+    return vocabulary, unique_keys(keys)
 
-def load_similarity_scores(network_name):
+def load_edge_scores(score_file: Path, score_column: str,
+                     vocabulary: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Charge une source de scores en tableaux (clés uint64 triées, valeurs float32).
+    Les paires hors vocabulaire sont ignorées ; en cas de doublon A-B/B-A,
+    la première occurrence est conservée.
+    """
+    edges = load_edges(score_file, columns=[score_column])
+    if edges is not None:
+        a, b = edges.codes_on(vocabulary)
+        valid = (a >= 0) & (b >= 0) & (a != b)
+        values = np.asarray(edges.columns[score_column])[valid]
+        return unique_keys(pack_pairs(a[valid], b[valid]), values)
+
+    df = read_edges(score_file, usecols=['protein1', 'protein2', score_column],
+                    dtype={'protein1': str, 'protein2': str})
+    df = df.dropna(subset=['protein1', 'protein2'])
+    keys, valid = encode_edges(df['protein1'].values, df['protein2'].values, vocabulary)
+    values = pd.to_numeric(df[score_column], errors='coerce').values[valid].astype(np.float32)
+    return unique_keys(keys, values)
+
+def load_similarity_scores(network_name: str, vocabulary: np.ndarray) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
     """Charge tous les scores de similarité disponibles pour un réseau"""
-    scores = defaultdict(dict)
-    
-    # 1. Charger les scores HCN
-    hcn_file = SIMILARITY_DIR / f"HCN_scores_{network_name}.txt"
-    if hcn_file.exists():
-        hcn_df = pd.read_csv(hcn_file, sep='\t')
-        for _, row in hcn_df.iterrows():
-            pair = tuple(sorted([row['protein1'], row['protein2']]))
-            scores[pair]['HCN'] = row['HCN_score']
-    
-    # 2. Charger les scores de co-expression
-    coexpr_file = SIMILARITY_DIR / f"coexpression_{network_name}.txt"
-    if coexpr_file.exists():
-        coexpr_df = pd.read_csv(coexpr_file, sep='\t')
-        for _, row in coexpr_df.iterrows():
-            pair = tuple(sorted([row['protein1'], row['protein2']]))
-            scores[pair]['PCC'] = row['PCC']
-    
-    # 3. Charger les scores fonctionnels
-    func_file = SIMILARITY_DIR / f"matrice_S_{network_name}.txt"
-    if func_file.exists():
-        func_df = pd.read_csv(func_file, sep='\t', index_col=0)
-        proteins = func_df.index
-        for i in range(len(proteins)):
-            for j in range(i+1, len(proteins)):
-                pair = tuple(sorted([proteins[i], proteins[j]]))
-                scores[pair]['Func'] = func_df.iloc[i, j]
-    
-    # 4. Charger les scores de localisation
-    sl_file = SIMILARITY_DIR / f"SL_matrix_{network_name}.tsv"
-    if sl_file.exists():
-        sl_df = pd.read_csv(sl_file, sep='\t', index_col=0)
-        proteins = sl_df.index
-        for i in range(len(proteins)):
-            for j in range(i+1, len(proteins)):
-                pair = tuple(sorted([proteins[i], proteins[j]]))
-                scores[pair]['SL'] = sl_df.iloc[i, j]
-    
+    scores = {}
+    for channel, (pattern, column) in SCORE_SOURCES.items():
+        score_file = SIMILARITY_DIR / pattern.format(network_name)
+        if edges_exist(score_file):
+            scores[channel] = load_edge_scores(score_file, column, vocabulary)
     return scores
 
-def calculate_weighted_ppi(network_name):
-    """Calcule la moyenne pondérée pour un réseau PPI"""
-    print(f"\nTraitement du réseau {network_name}")
-    
+def score_table_bytes(network_name: str) -> int:
+    """Estimation mémoire de la construction de la table de scores d'un réseau"""
+    n_edges = edge_count(INTERACTIONS_DIR / f"{network_name}.txt")
+    source_rows = sum(edge_count(SIMILARITY_DIR / pattern.format(network_name))
+                      for pattern, _ in SCORE_SOURCES.values()
+                      if edges_exist(SIMILARITY_DIR / pattern.format(network_name)))
+    return n_edges * TABLE_BYTES_PER_EDGE + source_rows * SOURCE_BYTES_PER_ROW
+
+@traced("table_scores")
+def build_score_table(network_name: str) -> Optional[ScoreTable]:
+    """Construit la table de scores (arêtes x canaux) d'un réseau à partir des fichiers sources"""
+    require("table_scores", lambda: score_table_bytes(network_name))
+    # Arêtes du réseau codées sur le vocabulaire des protéines
+    vocabulary, edge_keys = load_network_edges(network_name)
+
     # Charger les scores de similarité
-    similarity_scores = load_similarity_scores(network_name)
+    similarity_scores = load_similarity_scores(network_name, vocabulary)
+    count(rows_in=len(edge_keys) + sum(len(keys) for keys, _ in similarity_scores.values()))
     if not similarity_scores:
+        return None
+    count(rows_out=len(edge_keys))
+    return ScoreTable.from_sources(vocabulary, edge_keys, similarity_scores)
+
+def load_score_table(network_name: str, rebuild: bool = False) -> Optional[ScoreTable]:
+    """
+    Charge la table de scores sauvegardée d'un réseau, ou la (re)construit si elle
+    est absente ou plus ancienne que le réseau ou l'une des sources de scores.
+    """
+    table_file = SCORE_TABLE_DIR / f"scores_{network_name}.npz"
+    sources = [INTERACTIONS_DIR / f"{network_name}.txt"] + [
+        SIMILARITY_DIR / pattern.format(network_name) for pattern, _ in SCORE_SOURCES.values()]
+    if not rebuild and table_file.exists():
+        newest_source = max((edges_mtime(f) for f in sources), default=0)
+        if table_file.stat().st_mtime >= newest_source:
+            return ScoreTable.load(table_file)
+
+    table = build_score_table(network_name)
+    if table is not None:
+        table_file.parent.mkdir(parents=True, exist_ok=True)
+        table.save(table_file)
+    return table
+
+@traced("mise_a_jour_table")
+def patch_score_table(network_name: str, stale_keys: np.ndarray,
+                      species_vocabulary: ProteinVocabulary) -> Optional[ScoreTable]:
+    """
+    Met à jour la table de scores sauvegardée d'un réseau après un changement de
+    version : les lignes des arêtes retirées ou dont les scores ont changé
+    (stale_keys, clés sur le vocabulaire d'espèce) sont écartées, celles des
+    arêtes nouvelles ou recalculées sont relues dans les sources, les autres
+    sont reprises telles quelles.
+    """
+    table_file = SCORE_TABLE_DIR / f"scores_{network_name}.npz"
+    if not table_file.exists():
+        return load_score_table(network_name, rebuild=True)
+
+    old = ScoreTable.load(table_file)
+    vocabulary, edge_keys = load_network_edges(network_name)
+
+    # Les vocabulaires triés se correspondent par une application croissante :
+    # les clés recodées restent canoniques et triées
+    position = pd.Index(vocabulary).get_indexer(old.vocabulary)
+    low, high = unpack_pairs(old.keys)
+    valid = (position[low] >= 0) & (position[high] >= 0)
+    old_keys = np.zeros(len(old.keys), dtype=np.uint64)
+    old_keys[valid] = pack_pairs(position[low[valid]], position[high[valid]])
+
+    # Clés périmées recodées sur le vocabulaire du réseau
+    lookup = np.full(len(species_vocabulary), -1, dtype=np.int64)
+    species_codes = species_vocabulary.codes(vocabulary)
+    found = species_codes >= 0
+    lookup[species_codes[found]] = np.flatnonzero(found)
+    stale_low, stale_high = unpack_pairs(stale_keys)
+    a, b = lookup[stale_low], lookup[stale_high]
+    stale = pack_pairs(a[(a >= 0) & (b >= 0)], b[(a >= 0) & (b >= 0)])
+
+    keep = valid & np.isin(old_keys, edge_keys) & ~np.isin(old_keys, stale)
+    fresh_keys = np.setdiff1d(edge_keys, old_keys[keep])
+    fresh = ScoreTable.from_sources(vocabulary, fresh_keys,
+                                    load_similarity_scores(network_name, vocabulary))
+
+    channels = list(dict.fromkeys(old.channels + fresh.channels))
+    keys = np.concatenate([old_keys[keep], fresh_keys])
+    order = np.argsort(keys, kind='stable')
+    columns = {}
+    for name in channels:
+        kept = old.columns[name][keep] if name in old.columns else np.full(keep.sum(), np.nan)
+        new = fresh.columns[name] if name in fresh.columns else np.full(len(fresh_keys), np.nan)
+        columns[name] = np.concatenate([kept, new])[order]
+    table = ScoreTable(vocabulary, keys[order], columns)
+    table.save(table_file)
+    count(rows_in=len(old.keys) + len(fresh_keys), rows_out=len(table))
+    print(f"Table de scores mise à jour: {keep.sum()} arêtes reprises, {len(fresh_keys)} relues")
+    return table
+
+@traced("agregation")
+def calculate_weighted_ppi(network_name: str, policy: str = AGGREGATION_POLICY,
+                           table: Optional[ScoreTable] = None, **params) -> Optional[pd.DataFrame]:
+    """Calcule le poids final de chaque arête d'un réseau PPI selon une politique d'agrégation"""
+    print(f"\nTraitement du réseau {network_name}")
+
+    if table is None:
+        table = load_score_table(network_name)
+    if table is None:
         print("Aucun score de similarité trouvé")
         return None
-    
-    # Calculer la moyenne pondérée
-    weighted_interactions = []
-    for pair, scores in similarity_scores.items():
-        # Calculer la moyenne des scores disponibles
-        valid_scores = [s for s in scores.values() if not np.isnan(s)]
-        if valid_scores:
-            weight = np.mean(valid_scores)
-            weighted_interactions.append({
-                'protein1': pair[0],
-                'protein2': pair[1],
-                'weight': weight
-            })
-    
-    if not weighted_interactions:
+
+    # Agrégation vectorisée des canaux, sur toutes les arêtes à la fois
+    weight = aggregate(table, policy, **(params or AGGREGATION_PARAMS))
+
+    keep = ~np.isnan(weight)
+    count(rows_in=len(table), rows_out=int(keep.sum()))
+    if not keep.any():
         print("Aucune interaction valide avec scores")
         return None
-    
+
     # Créer le DataFrame final
-    result_df = pd.DataFrame(weighted_interactions)
-    return result_df[['protein1', 'protein2', 'weight']]
+    return table.to_frame(weight, keep)
+
+@traced("ponderation", detail="network_name")
+def process_network(network_name: str, table: Optional[ScoreTable] = None) -> Optional[Path]:
+    """
+    Calcule et sauvegarde le réseau pondéré d'un réseau PPI (weighted_<réseau>.edges,
+    et weighted_<réseau>.txt si EXPORT_TSV), depuis `table` si elle est fournie
+    """
+    weighted_ppi = calculate_weighted_ppi(network_name, table=table)
+    if weighted_ppi is None:
+        return None
+
+    output_file = OUTPUT_DIR / f"weighted_{network_name}.txt"
+    write_edges(weighted_ppi, output_file, tsv=EXPORT_TSV, header=False)
+    count(rows_out=len(weighted_ppi))
+    print(f"Fichier sauvegardé: {output_file} ({len(weighted_ppi)} interactions)")
+    return output_file
 
 def process_all_networks():
     """Traite tous les réseaux PPI disponibles"""
     # Lister tous les fichiers PPI originaux
-    ppi_files = list(INTERACTIONS_DIR.glob("*.txt"))
-    
+    ppi_files = network_files(INTERACTIONS_DIR)
+
     for ppi_file in ppi_files:
-        network_name = ppi_file.stem
-        weighted_ppi = calculate_weighted_ppi(network_name)
-        
-        if weighted_ppi is not None:
-            output_file = OUTPUT_DIR / f"weighted_{network_name}.txt"
-            weighted_ppi.to_csv(output_file, sep='\t', index=False, header=False)
-            print(f"Fichier sauvegardé: {output_file} ({len(weighted_ppi)} interactions)")
+        process_network(ppi_file.stem)
 
 if __name__ == "__main__":
-    process_all_networks()
\ No newline at end of file
+    process_all_networks()
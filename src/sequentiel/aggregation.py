@@ -0,0 +1,146 @@
+"""
+Politiques d'agrégation des canaux de similarité en un poids final.
+
+Chaque politique est une fonction vectorisée qui prend la matrice (arêtes x canaux)
+d'une ScoreTable, avec NaN pour les scores manquants, et renvoie un poids par
+arête (NaN si l'arête n'est pas retenue). Les politiques sont enregistrées dans
+AGGREGATIONS et appelées par leur nom :
+
+    weights = aggregate(table, 'weighted_mean', weights={'HCN': 2, 'SL': 1})
+    weights = aggregate(table, 'at_least_k', k=3)
+"""
+
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from score_table import ScoreTable
+
+AGGREGATIONS: Dict[str, Callable] = {}
+
+
+def register(name: str):
+    """Enregistre une politique d'agrégation sous un nom"""
+    def decorator(func: Callable) -> Callable:
+        AGGREGATIONS[name] = func
+        return func
+    return decorator
+
+
+def available_counts(matrix: np.ndarray) -> np.ndarray:
+    """Nombre de canaux disponibles (non NaN) par arête"""
+    return np.count_nonzero(~np.isnan(matrix), axis=1)
+
+
+def _divide(total: np.ndarray, count: np.ndarray) -> np.ndarray:
+    return np.divide(total, count, out=np.full(len(total), np.nan), where=count > 0)
+
+
+@register('mean')
+def mean(matrix: np.ndarray, **_) -> np.ndarray:
+    """Moyenne simple des canaux disponibles"""
+    total = np.where(np.isnan(matrix), 0, matrix).sum(axis=1, dtype=np.float64)
+    return _divide(total, available_counts(matrix))
+
+
+@register('weighted_mean')
+def weighted_mean(matrix: np.ndarray, weights: Sequence[float] = None, **_) -> np.ndarray:
+    """Moyenne pondérée des canaux disponibles (poids renormalisés par arête)"""
+    if weights is None:
+        return mean(matrix)
+    weights = np.asarray(weights, dtype=np.float64)
+    available = ~np.isnan(matrix)
+    total = (np.where(available, matrix, 0) * weights).sum(axis=1)
+    weight_sum = (available * weights).sum(axis=1)
+    return _divide(total, weight_sum)
+
+
+@register('geometric_mean')
+def geometric_mean(matrix: np.ndarray, **_) -> np.ndarray:
+    """Moyenne géométrique des canaux disponibles (0 si un score vaut 0)"""
+    available = ~np.isnan(matrix)
+    clipped = np.where(available, np.clip(matrix, 0, None), 1.0)
+    has_zero = (clipped == 0).any(axis=1)
+    logs = np.log(np.where(clipped > 0, clipped, 1.0)).sum(axis=1, dtype=np.float64)
+    result = np.exp(_divide(logs, available.sum(axis=1)))
+    result[has_zero] = 0.0
+    return result
+
+
+@register('min')
+def minimum(matrix: np.ndarray, **_) -> np.ndarray:
+    """Plus petit score disponible"""
+    result = np.where(np.isnan(matrix), np.inf, matrix).min(axis=1).astype(np.float64)
+    result[np.isinf(result)] = np.nan
+    return result
+
+
+@register('max')
+def maximum(matrix: np.ndarray, **_) -> np.ndarray:
+    """Plus grand score disponible"""
+    result = np.where(np.isnan(matrix), -np.inf, matrix).max(axis=1).astype(np.float64)
+    result[np.isinf(result)] = np.nan
+    return result
+
+
+def rank_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Remplace chaque score par son rang centile dans son canal (ex aequo moyennés)"""
+    ranked = np.full(matrix.shape, np.nan)
+    for j in range(matrix.shape[1]):
+        column = matrix[:, j]
+        valid = np.flatnonzero(~np.isnan(column))
+        if len(valid) == 0:
+            continue
+        values = column[valid]
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        # Rang moyen des groupes d'ex aequo
+        starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+        ends = np.r_[starts[1:], len(sorted_values)]
+        group_rank = (starts + ends + 1) / 2.0
+        ranks = np.empty(len(values))
+        ranks[order] = np.repeat(group_rank, ends - starts)
+        ranked[valid, j] = ranks / len(values)
+    return ranked
+
+
+@register('rank_mean')
+def rank_mean(matrix: np.ndarray, weights: Sequence[float] = None, **_) -> np.ndarray:
+    """Moyenne (éventuellement pondérée) des rangs centiles de chaque canal"""
+    return weighted_mean(rank_normalize(matrix), weights=weights)
+
+
+@register('at_least_k')
+def at_least_k(matrix: np.ndarray, k: int = 4, base: str = 'mean', **params) -> np.ndarray:
+    """
+    Agrégation `base` restreinte aux arêtes ayant au moins k canaux disponibles
+    (k = nombre de canaux : interactions communes à toutes les sources).
+    """
+    if base == 'at_least_k':
+        raise ValueError("La politique de base ne peut pas être at_least_k")
+    result = AGGREGATIONS[base](matrix, **params)
+    result[available_counts(matrix) < k] = np.nan
+    return result
+
+
+def aggregate(table: ScoreTable, policy: str = 'mean',
+              channels: Optional[Sequence[str]] = None, **params) -> np.ndarray:
+    """
+    Calcule le poids final de chaque arête de la table avec une politique nommée.
+
+    Args:
+        table: Table de scores du réseau
+        policy: Nom de la politique (voir AGGREGATIONS)
+        channels: Canaux à combiner (tous par défaut)
+        **params: Paramètres de la politique ; `weights` peut être un dict canal -> poids
+
+    Returns:
+        Poids par arête (NaN si l'arête n'est pas retenue)
+    """
+    if policy not in AGGREGATIONS:
+        raise KeyError(f"Politique inconnue: {policy} (disponibles: {', '.join(AGGREGATIONS)})")
+    channels = list(channels) if channels is not None else table.channels
+    weights = params.get('weights')
+    if isinstance(weights, dict):
+        params['weights'] = [weights.get(c, 0.0) for c in channels]
+    return AGGREGATIONS[policy](table.matrix(channels), **params)
@@ -0,0 +1,171 @@
+"""
+Extraction du squelette (backbone) des réseaux pondérés avant le clustering.
+
+Trois méthodes, calculées de façon vectorisée sur les tableaux CSR :
+- disparity : filtre de disparité (Serrano et al. 2009), une arête est gardée si
+  elle est significative pour au moins une de ses extrémités
+  (alpha_ij = (1 - w_ij / s_i)^(k_i - 1) < alpha)
+- threshold : seuil global sur le poids
+- top_k : les k arêtes les plus lourdes de chaque nœud (union des deux extrémités)
+
+Chaque méthode renvoie un masque des arêtes conservées ; le rapport indique
+combien d'arêtes ont été retirées et le facteur de réduction obtenu.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from csr_graph import CSRGraph
+from edge_store import network_files
+from instrumentation import count, traced
+
+# Configuration des chemins
+BASE_DIR = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data")
+WEIGHTED_DIR = BASE_DIR / "weighted_networks"
+OUTPUT_DIR = BASE_DIR / "backbone_networks"
+
+# Méthode par défaut : seuil global, réduction prévisible (facteur ~1.6 sur
+# STRING_levure, ~7.8 pour top_k à k = 3 ; disparity à alpha = 0.05 n'y garde
+# qu'une arête)
+BACKBONE_METHOD = 'threshold'
+
+# Paramètres par défaut de chaque méthode (appel sans paramètres)
+DEFAULT_PARAMS = {
+    'disparity': {'alpha': 0.05},
+    'threshold': {'threshold': 0.3},
+    'top_k': {'k': 3},
+}
+
+# Part maximale d'arêtes retirées : au-delà, le squelette n'est pas sauvegardé
+MAX_EDGES_REMOVED = 0.9
+
+
+def disparity_pvalues(graph: CSRGraph) -> np.ndarray:
+    """
+    p-value du filtre de disparité de chaque arête, minimum sur les deux extrémités.
+    Un nœud de degré 1 ne rend aucune arête significative (p-value = 1).
+    """
+    degree = graph.degree().astype(np.float64)
+    strength = graph.strength()
+
+    def side(node):
+        k = degree[node]
+        s = strength[node]
+        ratio = np.divide(graph.weight, s, out=np.zeros(graph.n_edges), where=s > 0)
+        p = np.power(np.clip(1.0 - ratio, 0.0, 1.0), k - 1)
+        p[k <= 1] = 1.0
+        return p
+
+    return np.minimum(side(graph.src), side(graph.dst))
+
+
+def disparity_filter(graph: CSRGraph, alpha: float = 0.05, keep_leaves: bool = False) -> np.ndarray:
+    """Masque des arêtes significatives au seuil alpha"""
+    keep = disparity_pvalues(graph) < alpha
+    if keep_leaves:
+        # Les arêtes des nœuds de degré 1 sont conservées pour ne pas les isoler
+        degree = graph.degree()
+        keep |= (degree[graph.src] == 1) | (degree[graph.dst] == 1)
+    return keep
+
+
+def threshold_filter(graph: CSRGraph, threshold: float = 0.3) -> np.ndarray:
+    """Masque des arêtes de poids supérieur ou égal au seuil"""
+    return graph.weight >= threshold
+
+
+def top_k_filter(graph: CSRGraph, k: int = 10) -> np.ndarray:
+    """Masque des arêtes parmi les k plus lourdes d'au moins une de leurs extrémités"""
+    sources = graph.arc_sources()
+    # Tri des arcs par nœud puis par poids décroissant
+    order = np.lexsort((-graph.data, sources))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - graph.indptr[sources[order]]
+    keep = np.zeros(graph.n_edges, dtype=bool)
+    keep[graph.edge_of_arc[rank < k]] = True
+    return keep
+
+
+BACKBONE_METHODS = {
+    'disparity': disparity_filter,
+    'threshold': threshold_filter,
+    'top_k': top_k_filter,
+}
+
+
+def extract_backbone(graph: CSRGraph, method: str = BACKBONE_METHOD, **params):
+    """
+    Applique une méthode d'extraction du squelette, avec ses paramètres par
+    défaut (DEFAULT_PARAMS) si aucun n'est fourni.
+
+    Returns:
+        (squelette, rapport) : graphe réduit et statistiques de réduction
+    """
+    if method not in BACKBONE_METHODS:
+        raise KeyError(f"Méthode inconnue: {method} (disponibles: {', '.join(BACKBONE_METHODS)})")
+    params = params or DEFAULT_PARAMS[method]
+    keep = BACKBONE_METHODS[method](graph, **params)
+    backbone = graph.subgraph_edges(keep)
+    return backbone, backbone_report(graph, backbone, method, params)
+
+
+def backbone_report(graph: CSRGraph, backbone: CSRGraph, method: str, params: Dict) -> Dict:
+    """Statistiques de réduction du réseau"""
+    kept_nodes = np.count_nonzero(backbone.degree())
+    return {
+        'method': method,
+        'params': params,
+        'edges_before': graph.n_edges,
+        'edges_after': backbone.n_edges,
+        'edges_removed': graph.n_edges - backbone.n_edges,
+        'reduction_factor': graph.n_edges / backbone.n_edges if backbone.n_edges else float('inf'),
+        'nodes_before': int(np.count_nonzero(graph.degree())),
+        'nodes_after': int(kept_nodes),
+        'weight_kept': float(backbone.weight.sum() / graph.weight.sum()) if graph.n_edges else 0.0,
+    }
+
+
+@traced("backbone", detail="network_file")
+def process_network(network_file: Path, output_dir: Path = OUTPUT_DIR,
+                    method: str = BACKBONE_METHOD, max_removed: float = MAX_EDGES_REMOVED,
+                    **params) -> Optional[Dict]:
+    """
+    Extrait et sauvegarde le squelette d'un réseau pondéré. Le squelette est
+    refusé (rien n'est écrit, None renvoyé) si la méthode retire plus de
+    max_removed des arêtes.
+    """
+    graph = CSRGraph.from_file(network_file)
+    backbone, report = extract_backbone(graph, method, **params)
+    params = report['params']
+    count(rows_in=report['edges_before'], rows_out=report['edges_after'])
+
+    removed = report['edges_removed'] / report['edges_before'] if report['edges_before'] else 0.0
+    if removed > max_removed:
+        print(f"\n{network_file.stem} [{method} {params}] : squelette refusé, "
+              f"{report['edges_before']:,} -> {report['edges_after']:,} interactions "
+              f"({removed * 100:.1f}% retirées > {max_removed * 100:.0f}%, "
+              f"facteur {report['reduction_factor']:.2f})")
+        return None
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / network_file.name
+    backbone.to_frame('mean_weight').to_csv(output_file, sep='\t', index=False)
+
+    print(f"\n{network_file.stem} [{method} {params}]")
+    print(f"- Interactions: {report['edges_before']:,} -> {report['edges_after']:,} "
+          f"({report['edges_removed']:,} retirées, facteur {report['reduction_factor']:.2f})")
+    print(f"- Protéines: {report['nodes_before']:,} -> {report['nodes_after']:,}")
+    print(f"- Poids total conservé: {report['weight_kept'] * 100:.1f}%")
+    print(f"- Fichier généré: {output_file}")
+    return report
+
+
+def main():
+    for network_file in network_files(WEIGHTED_DIR, "weighted_*"):
+        process_network(network_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Génération en une passe des réseaux pour une série de seuils de filtrage.
+
+La source brute (STRING, DIP, BioGRID) est lue et notée une seule fois : chaque
+paire non orientée garde son meilleur score, et les paires sont triées par
+score décroissant. Le réseau d'un seuil (ou d'une taille cible) est alors un
+préfixe de cet ordre, les réseaux d'un balayage sont emboîtés :
+- seuil : préfixe des scores >= seuil (> seuil si strict), par recherche dichotomique
+- taille cible : seuil le plus bas qui retient au plus la cible (threshold_count),
+  avec repli sur les `cible` premières paires si l'écart dépasse la tolérance
+Les lignes de sortie sont sérialisées une fois ; chaque fichier écrit un préfixe
+d'octets. Les statistiques (interactions, protéines, scores) de chaque seuil
+sont calculées sur l'ordre par sommes cumulées.
+
+Garder pour chaque paire son meilleur score donne, à chaque seuil, le même
+ensemble de paires que le filtrage ligne à ligne des scripts filtrage_*.
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import count, traced
+from psimi import descending_order, threshold_count, unique_pairs
+
+# Configuration des chemins
+DATA_DIR = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data")
+SWEEP_DIR = DATA_DIR / "clean data" / "interactions" / "sweeps"
+
+# Balayages disponibles : source, seuils (score >= seuil, > si strict) ou tailles cibles
+SWEEPS = {
+    "STRING_humain": {"source": "string", "species": "humain",
+                      "thresholds": [400, 500, 600, 700, 800, 900]},
+    "STRING_levure": {"source": "string", "species": "levure",
+                      "thresholds": [400, 500, 600, 700, 800, 900]},
+    "DIP_levure": {"source": "dip", "strict": True, "header": "Protein1\tProtein2",
+                   "thresholds": [0.5, 0.6, 0.7, 0.8, 0.9]},
+    "BIOGRID_levure": {"source": "biogrid",
+                       "targets": [50000, 100000, 200000, 300000]},
+}
+
+TARGET_TOLERANCE = 0.2
+
+
+class Candidates(NamedTuple):
+    """Paires uniques au meilleur score, triées par score décroissant"""
+    protein1: np.ndarray
+    protein2: np.ndarray
+    score: np.ndarray
+
+
+class Cut(NamedTuple):
+    label: str
+    size: int
+    threshold: float
+
+
+def rank_candidates(protein1: np.ndarray, protein2: np.ndarray, scores: np.ndarray,
+                    canonical: bool = False) -> Candidates:
+    """
+    Une ligne par paire non orientée, à son meilleur score (première occurrence
+    en cas d'égalité), par score décroissant. Si canonical, chaque paire est
+    orientée (min, max), sinon dans l'orientation de la ligne retenue.
+    """
+    protein1 = np.asarray(protein1, dtype=object)
+    protein2 = np.asarray(protein2, dtype=object)
+    scores = np.asarray(scores, dtype=np.float64)
+    rows = unique_pairs(protein1, protein2, order=descending_order(scores))
+    a, b = protein1[rows], protein2[rows]
+    if canonical:
+        forward = a < b
+        a, b = np.where(forward, a, b), np.where(forward, b, a)
+    return Candidates(a, b, scores[rows])
+
+
+def threshold_cuts(sorted_scores: np.ndarray, thresholds: Sequence[float],
+                   strict: bool = False) -> List[Cut]:
+    """Taille du préfixe retenu par chaque seuil (scores triés par ordre décroissant)"""
+    side = 'left' if strict else 'right'
+    sizes = np.searchsorted(-sorted_scores, -np.asarray(thresholds, dtype=np.float64), side=side)
+    return [Cut(f"seuil_{threshold:g}", int(size), float(threshold))
+            for threshold, size in zip(thresholds, sizes)]
+
+
+def target_cuts(sorted_scores: np.ndarray, targets: Sequence[int],
+                tolerance: float = TARGET_TOLERANCE) -> List[Cut]:
+    """
+    Taille du préfixe retenu par chaque taille cible : seuil le plus bas qui en
+    retient au plus la cible, ou les `cible` premières paires si ce seuil s'en
+    écarte de plus de tolerance (même règle que filtrage_BIOGRID_levure.py).
+    """
+    cuts = []
+    for target in targets:
+        size = len(sorted_scores)
+        if size > target:
+            size, _ = threshold_count(sorted_scores, target)
+            if size < target * (1 - tolerance) or size > target * (1 + tolerance):
+                size = target
+        threshold = float(sorted_scores[size - 1]) if size else float('inf')
+        cuts.append(Cut(f"top_{target}", int(size), threshold))
+    return cuts
+
+
+def sweep_stats(candidates: Candidates, cuts: Sequence[Cut]) -> pd.DataFrame:
+    """
+    Statistiques de chaque réseau du balayage. Le nombre de protéines d'un
+    préfixe est le nombre de protéines apparues pour la première fois avant sa fin.
+    """
+    # Codes dans l'ordre d'apparition le long des paires (a0, b0, a1, b1, ...)
+    codes, _ = pd.factorize(np.column_stack([candidates.protein1, candidates.protein2]).ravel())
+    new = np.ones(len(codes), dtype=bool)
+    if len(codes):
+        new[1:] = codes[1:] > np.maximum.accumulate(codes)[:-1]
+    first_row = np.flatnonzero(new) // 2
+
+    # Scores absents (+inf : toujours retenus) exclus de la moyenne
+    finite = np.isfinite(candidates.score)
+    score_sum = np.concatenate([[0.0], np.cumsum(np.where(finite, candidates.score, 0.0))])
+    finite_count = np.concatenate([[0], np.cumsum(finite)])
+
+    rows = []
+    for cut in cuts:
+        size = cut.size
+        proteins = int(np.searchsorted(first_row, size, side='left'))
+        rows.append({
+            'network': cut.label,
+            'threshold': cut.threshold,
+            'interactions': size,
+            'proteins': proteins,
+            'min_score': float(candidates.score[size - 1]) if size else np.nan,
+            'max_score': float(candidates.score[0]) if size else np.nan,
+            'mean_score': score_sum[size] / finite_count[size] if finite_count[size] else np.nan,
+            'density': 2 * size / (proteins * (proteins - 1)) if proteins > 1 else 0.0,
+        })
+    return pd.DataFrame(rows)
+
+
+def write_nested_networks(candidates: Candidates, cuts: Sequence[Cut], output_dir: Path,
+                          name: str, header: Optional[str] = None) -> Dict[str, Path]:
+    """
+    Écrit un fichier par coupe ({name}_{label}.txt). Les lignes sont encodées
+    une seule fois ; chaque fichier est un préfixe du même tampon.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    largest = max((cut.size for cut in cuts), default=0)
+    lines = [f"{a}\t{b}\n".encode('utf-8')
+             for a, b in zip(candidates.protein1[:largest], candidates.protein2[:largest])]
+    ends = np.concatenate([[0], np.cumsum([len(line) for line in lines], dtype=np.int64)])
+    buffer = memoryview(b''.join(lines))
+    head = f"{header}\n".encode('utf-8') if header else b''
+
+    paths = {}
+    for cut in cuts:
+        path = output_dir / f"{name}_{cut.label}.txt"
+        with open(path, 'wb') as f_out:
+            f_out.write(head)
+            f_out.write(buffer[:ends[cut.size]])
+        paths[cut.label] = path
+    return paths
+
+
+@traced("lecture")
+def load_candidates(config: Dict) -> Candidates:
+    """Lecture et notation de la source brute d'un balayage (une seule passe)"""
+    source = config["source"]
+    if source == "string":
+        from string_links import filter_string_links
+        if config["species"] == "humain":
+            from filtrage_STRING_humain import input_path
+            taxon = "9606"
+        else:
+            from filtrage_STRING_levure import input_path
+            taxon = "4932"
+        # Seul le seuil le plus bas est appliqué à la lecture
+        interactions, _ = filter_string_links(input_path, taxon, min(config["thresholds"]),
+                                              best_score=True)
+        return rank_candidates(interactions["protein1"].values, interactions["protein2"].values,
+                               interactions["combined_score"].values)
+    if source == "dip":
+        from filtrage_DIP_levure import INPUT_FILE, load_dip_interactions
+        interactions, _ = load_dip_interactions(INPUT_FILE)
+        # Confiance absente : acceptée à tout seuil ; illisible (-inf) : rejetée
+        confidence = interactions['confidence']
+        readable = ~np.isneginf(confidence)
+        scores = np.where(np.isnan(confidence), np.inf, confidence)[readable]
+        return rank_candidates(interactions['protein_a'][readable], interactions['protein_b'][readable],
+                               scores, canonical=True)
+    if source == "biogrid":
+        from filtrage_BIOGRID_levure import INPUT_FILE, score_biogrid_interactions
+        _, clean, total_score = score_biogrid_interactions(INPUT_FILE)
+        return rank_candidates(clean['protein_a'], clean['protein_b'], total_score)
+    raise ValueError(f"Source inconnue: {source}")
+
+
+@traced("balayage", detail="name")
+def run_sweep(name: str, config: Dict = None, output_dir: Path = SWEEP_DIR,
+              candidates: Candidates = None) -> pd.DataFrame:
+    """Balayage complet : lecture unique, coupes, fichiers emboîtés et statistiques"""
+    config = config or SWEEPS[name]
+    print(f"\n=== Balayage {name} ===")
+    if candidates is None:
+        candidates = load_candidates(config)
+    print(f"Paires candidates: {len(candidates.score):,}")
+    count(rows_in=len(candidates.score))
+
+    if "targets" in config:
+        cuts = target_cuts(candidates.score, config["targets"])
+    else:
+        cuts = threshold_cuts(candidates.score, config["thresholds"], config.get("strict", False))
+
+    sweep_dir = output_dir / name
+    write_nested_networks(candidates, cuts, sweep_dir, name, config.get("header"))
+    stats = sweep_stats(candidates, cuts)
+    stats_file = sweep_dir / f"{name}_sweep_stats.tsv"
+    stats.to_csv(stats_file, sep='\t', index=False)
+
+    print(stats.to_string(index=False))
+    print(f"Réseaux et statistiques sauvegardés dans: {sweep_dir}")
+    return stats
+
+
+def main():
+    for name in sys.argv[1:] or SWEEPS:
+        run_sweep(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Mesures de performance des étapes du pipeline et des fonctions d'évaluation.
+
+Les étapes (HCN, FS, SL, co-expression, pondération, filtrage des complexes,
+profilage...) et evaluation.py (FF, métriques) sont chronométrées sur des
+réseaux PPI synthétiques de taille réglable (workload.py) et sur les réseaux
+de Data/clean data ; les résultats JSON se comparent d'un commit à l'autre.
+
+    python -m benchmark run --sizes 1000 10000 100000
+    python -m benchmark compare avant.json apres.json
+"""
+
+from .workload import Workload, generate_workload, load_clean_workload, weighted_adjacency
+from .cases import CASES, Case, register, select_cases
+from .runner import compare_results, load_results, run_benchmark, run_case, save_results
+
+__all__ = [
+    'Workload', 'generate_workload', 'load_clean_workload', 'weighted_adjacency',
+    'CASES', 'Case', 'register', 'select_cases',
+    'compare_results', 'load_results', 'run_benchmark', 'run_case', 'save_results',
+]
@@ -0,0 +1,127 @@
+"""
+Ligne de commande des mesures (à lancer depuis src/sequentiel) :
+
+    python -m benchmark run [--sizes N ...] [--cases MOTIF ...] [--networks RÉSEAU ...]
+                            [--repeat R] [--seed S] [--clean-data DOSSIER | --no-clean-data]
+                            [--no-limits] [--output FICHIER] [--verbose]
+    python -m benchmark compare AVANT.json APRÈS.json [--threshold 1.10]
+    python -m benchmark imports [--modules MODULE ...] [--repeat R] [--budget-ms 100]
+                                [--detail] [--output FICHIER]
+    python -m benchmark list
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from edge_store import network_files
+
+from .cases import CASES, select_cases
+from .imports import IMPORT_BUDGET, MODULES, measure_imports
+from .runner import (DEFAULT_CLEAN_DATA, REGRESSION_THRESHOLD, REPEAT, default_output,
+                     load_results, print_comparison, run_benchmark, save_results)
+from .workload import generate_workload, load_clean_workload
+
+SIZES = [1_000, 10_000]
+
+
+def workloads(options):
+    """Charges synthétiques puis réseaux nettoyés, construites à la demande"""
+    for n_proteins in options.sizes:
+        yield generate_workload(n_proteins, seed=options.seed)
+    if options.no_clean_data:
+        return
+    interactions = Path(options.clean_data) / "interactions"
+    networks = options.networks or [path.stem for path in network_files(interactions)]
+    for network in networks:
+        workload = load_clean_workload(options.clean_data, network, seed=options.seed)
+        if workload is None:
+            print(f"Réseau absent, ignoré: {interactions / network}")
+            continue
+        yield workload
+
+
+def run(options) -> int:
+    cases = select_cases(options.cases)
+    results = run_benchmark(workloads(options), cases, repeat=options.repeat,
+                            limits=not options.no_limits, quiet=not options.verbose)
+    parameters = {'sizes': options.sizes, 'seed': options.seed, 'repeat': options.repeat,
+                  'cases': list(cases), 'limits': not options.no_limits}
+    output = save_results(results, options.output or default_output(), parameters)
+    print(f"\nRésultats sauvegardés dans {output}")
+    return 1 if any(r['status'] == 'failed' for r in results) else 0
+
+
+def compare(options) -> int:
+    regressions = print_comparison(load_results(options.before), load_results(options.after),
+                                   options.threshold)
+    return 1 if regressions else 0
+
+
+def imports(options) -> int:
+    results = measure_imports(options.modules or MODULES, repeat=options.repeat,
+                              budget=options.budget_ms / 1000, detail=options.detail)
+    parameters = {'modules': [r['case'] for r in results], 'repeat': options.repeat,
+                  'budget_ms': options.budget_ms}
+    output = save_results(results, options.output or default_output(), parameters)
+    print(f"\nRésultats sauvegardés dans {output}")
+    over = [r['case'] for r in results if r.get('over_budget')]
+    if over:
+        print(f"Import au-delà de {options.budget_ms:.0f} ms: {', '.join(over)}", file=sys.stderr)
+    return 1 if over or any(r['status'] == 'failed' for r in results) else 0
+
+
+def list_cases(options) -> int:
+    for case in CASES.values():
+        limits = ", ".join(f"{key} <= {value:,}" for key, value in case.limits.items())
+        print(f"{case.name:<40} besoins: {', '.join(case.needs)}" + (f" ; {limits}" if limits else ""))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmark",
+                                     description="Mesures de performance du pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="mesure les cas sur les charges")
+    run_parser.add_argument("--sizes", type=int, nargs="*", default=SIZES,
+                            help="nombres de protéines des réseaux synthétiques")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=REPEAT, help="répétitions par cas")
+    run_parser.add_argument("--cases", nargs="*", help="noms ou motifs des cas (tous par défaut)")
+    run_parser.add_argument("--networks", nargs="*", help="réseaux de clean data (tous par défaut)")
+    run_parser.add_argument("--clean-data", type=Path, default=DEFAULT_CLEAN_DATA)
+    run_parser.add_argument("--no-clean-data", action="store_true",
+                            help="charges synthétiques seulement")
+    run_parser.add_argument("--no-limits", action="store_true",
+                            help="ignore les limites de taille des cas")
+    run_parser.add_argument("--output", type=Path, help="fichier JSON de résultats")
+    run_parser.add_argument("--verbose", action="store_true", help="affiche la sortie des étapes")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare deux fichiers de résultats")
+    compare_parser.add_argument("before", type=Path)
+    compare_parser.add_argument("after", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                                help="rapport des médianes au-delà duquel un cas régresse")
+    compare_parser.set_defaults(handler=compare)
+
+    imports_parser = commands.add_parser("imports", help="mesure les temps d'import à froid")
+    imports_parser.add_argument("--modules", nargs="*", help="modules à importer (liste par défaut)")
+    imports_parser.add_argument("--repeat", type=int, default=REPEAT, help="interpréteurs par module")
+    imports_parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET * 1000,
+                                help="durée maximale des imports de paquets")
+    imports_parser.add_argument("--detail", action="store_true",
+                                help="paquets les plus coûteux (python -X importtime)")
+    imports_parser.add_argument("--output", type=Path, help="fichier JSON de résultats")
+    imports_parser.set_defaults(handler=imports)
+
+    list_parser = commands.add_parser("list", help="liste les cas disponibles")
+    list_parser.set_defaults(handler=list_cases)
+
+    options = parser.parse_args(argv)
+    return options.handler(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
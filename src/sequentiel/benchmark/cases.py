@@ -0,0 +1,232 @@
+"""
+Cas mesurés : une fonction de préparation par étape du pipeline ou fonction
+d'évaluation, enregistrée dans CASES sous un nom.
+
+La préparation reçoit la charge et un dossier de travail, fait tout ce qui ne
+doit pas être chronométré (encodage, construction du graphe d'entrée...) et
+renvoie la fonction sans argument à mesurer. Chaque cas déclare les données
+dont il a besoin (champs de Workload) et des limites de taille au-delà
+desquelles il est ignoré par défaut (étapes quadratiques ou en boucle Python).
+"""
+
+import fnmatch
+import importlib
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Tuple
+
+from .workload import Workload, weighted_adjacency
+
+# Nombre de clusters optimisés par le cas evaluation.local_optimization
+LOCAL_OPTIMIZATION_CLUSTERS = 20
+
+
+class Case(NamedTuple):
+    name: str
+    prepare: Callable[[Workload, Path], Callable[[], object]]
+    needs: Tuple[str, ...]
+    limits: Dict[str, int]  # taille maximale par défaut (clé de Workload.size())
+
+
+CASES: Dict[str, Case] = {}
+
+
+def register(name: str, needs: Tuple[str, ...] = ('edges',), **limits: int):
+    """Enregistre un cas sous un nom, avec ses données requises et ses limites"""
+    def decorator(prepare: Callable) -> Callable:
+        CASES[name] = Case(name, prepare, tuple(needs), limits)
+        return prepare
+    return decorator
+
+
+def encoded_edges(workload: Workload):
+    """Vocabulaire trié, codes (a, b) et clés triées uniques des arêtes (sans boucles)"""
+    from edge_keys import build_vocabulary, encode_edges, unique_keys, unpack_pairs
+
+    p1, p2 = workload.edges['protein1'].values, workload.edges['protein2'].values
+    vocabulary = build_vocabulary(p1, p2)
+    keys, _ = encode_edges(p1, p2, vocabulary)
+    keys = unique_keys(keys)
+    a, b = unpack_pairs(keys)
+    return vocabulary, a, b, keys
+
+
+@register('HCN', edges=500_000)
+def hcn(workload: Workload, workdir: Path):
+    cn = importlib.import_module("Common_Neighbor_similarity")
+    output_file = workdir / "autres" / f"HCN_scores_{workload.name}.txt"
+    return lambda: cn.calculate_hcn_similarity(cn.build_graph(workload.edges), output_file)
+
+
+@register('HCN_vectorise')
+def hcn_vectorized(workload: Workload, workdir: Path):
+    from Common_Neighbor_similarity import hcn_for_edges
+
+    _, a, b, _ = encoded_edges(workload)
+    return lambda: hcn_for_edges(a, b, a, b)
+
+
+@register('FS', needs=('edges', 'go_annotations'), proteins=10_000)
+def functional_similarity(workload: Workload, workdir: Path):
+    # Matrice de similarité dense protéines x protéines : quadratique en mémoire
+    fs = importlib.import_module("Functional_Similarity")
+    return lambda: fs.score_interactions(fs.clean_interactions(workload.edges),
+                                         workload.go_annotations)
+
+
+@register('SL', needs=('edges', 'compartments'))
+def localization_similarity(workload: Workload, workdir: Path):
+    sl = importlib.import_module("filtrage_Subcellular_localization_data")
+
+    def run():
+        proteins, incidence = sl.build_incidence_matrix(workload.compartments)
+        return sl.create_sl_edges(workload.edges, proteins, incidence)
+    return run
+
+
+@register('CO', needs=('edges', 'expression'), edges=200_000)
+def coexpression(workload: Workload, workdir: Path):
+    co = importlib.import_module("Co-Expression_similarity")
+    return lambda: co.coexpression_scores(workload.edges, workload.expression)
+
+
+@register('table_scores', needs=('edges', 'channels'))
+def score_table(workload: Workload, workdir: Path):
+    from edge_keys import encode_edges, unique_keys
+    from score_table import ScoreTable
+
+    vocabulary, _, _, keys = encoded_edges(workload)
+
+    def run():
+        sources = {}
+        for channel, frame in workload.channels.items():
+            channel_keys, valid = encode_edges(frame['protein1'].values, frame['protein2'].values,
+                                               vocabulary)
+            sources[channel] = unique_keys(channel_keys, frame['score'].values[valid])
+        return ScoreTable.from_sources(vocabulary, keys, sources)
+    return run
+
+
+@register('ponderation', needs=('edges', 'channels'))
+def weighting(workload: Workload, workdir: Path):
+    weighted_ppi = importlib.import_module("Weighted_PPI_Network")
+    table = score_table(workload, workdir)()
+    return lambda: weighted_ppi.calculate_weighted_ppi(workload.name, table=table)
+
+
+@register('filtrage_complexes', needs=('weighted', 'complexes'))
+def complex_filter(workload: Workload, workdir: Path):
+    from filtrage_complexes_reseaux import ComplexSet, filter_complexes
+
+    ids = [str(i) for i in range(len(workload.complexes))]
+    lines = [" ".join(members) for members in workload.complexes]
+
+    def run():
+        complexes = ComplexSet(ids, workload.complexes, lines)
+        return filter_complexes(complexes, {workload.name: workload.weighted})
+    return run
+
+
+@register('csr_graph', needs=('weighted',))
+def csr_graph(workload: Workload, workdir: Path):
+    from csr_graph import CSRGraph
+
+    return lambda: CSRGraph.from_frame(workload.weighted)
+
+
+@register('shared_graph', needs=('weighted',))
+def shared_graph(workload: Workload, workdir: Path):
+    from csr_graph import CSRGraph
+    from shared_graph import SharedGraphStore
+
+    graph = CSRGraph.from_frame(workload.weighted)
+
+    def run():
+        # Publication, attachement (comme un processus fils) puis libération
+        with SharedGraphStore(graph) as store:
+            store.handle.attach()
+    return run
+
+
+@register('profilage', needs=('weighted',))
+def profiling(workload: Workload, workdir: Path):
+    from csr_graph import CSRGraph
+    from profilage_reseau import profile_network
+
+    graph = CSRGraph.from_frame(workload.weighted)
+    return lambda: profile_network(graph, workload.name)
+
+
+@register('backbone', needs=('weighted',))
+def backbone(workload: Workload, workdir: Path):
+    from backbone import extract_backbone
+    from csr_graph import CSRGraph
+
+    graph = CSRGraph.from_frame(workload.weighted)
+    return lambda: extract_backbone(graph)
+
+
+@register('evaluation.FF', needs=('weighted', 'complexes'))
+def fitness(workload: Workload, workdir: Path):
+    from evaluation import FF
+
+    graph = weighted_adjacency(workload.weighted)
+    clusters = [set(members) for members in workload.complexes]
+    return lambda: [FF(cluster, graph) for cluster in clusters]
+
+
+@register('evaluation.FF_partage', needs=('weighted', 'complexes'))
+def shared_fitness(workload: Workload, workdir: Path):
+    from csr_graph import CSRGraph
+    from evaluation import FF
+
+    # Graphe lu au travers de la vue CSR, comme par un processus fils attaché
+    graph = CSRGraph.from_frame(workload.weighted)
+    clusters = [set(members) for members in workload.complexes]
+    return lambda: [FF(cluster, graph) for cluster in clusters]
+
+
+@register('evaluation.local_optimization', needs=('weighted', 'complexes'))
+def local_optimization(workload: Workload, workdir: Path):
+    from evaluation import local_optimization as optimize
+
+    graph = weighted_adjacency(workload.weighted)
+    clusters = [set(members) for members in workload.complexes[:LOCAL_OPTIMIZATION_CLUSTERS]]
+    return lambda: [optimize(cluster, graph) for cluster in clusters]
+
+
+def metric_case(metric: str):
+    """Préparation d'un cas de métrique : clusters détectés contre complexes de référence"""
+    def prepare(workload: Workload, workdir: Path):
+        function = getattr(importlib.import_module("evaluation"), metric)
+        return lambda: function(workload.detected, workload.complexes)
+    return prepare
+
+
+# Métriques en O(détectés x connus) : limitées en nombre de complexes
+METRICS = ('precision_recall_fmeasure', 'coverage_rate', 'accuracy', 'MMR', 'jaccard_index',
+           'total_score')
+for _metric in METRICS:
+    register(f"evaluation.{_metric}", needs=('complexes', 'detected'),
+             complexes=1_000)(metric_case(_metric))
+
+
+def select_cases(names=None) -> Dict[str, Case]:
+    """Cas demandés par nom ou motif ('evaluation.*' : toutes les évaluations), tous par défaut"""
+    if not names:
+        return dict(CASES)
+    selected = {}
+    for name in names:
+        matches = [case for case in CASES if fnmatch.fnmatchcase(case, name)]
+        if not matches:
+            raise KeyError(f"Cas inconnu: {name} (disponibles: {', '.join(CASES)})")
+        selected.update((case, CASES[case]) for case in matches)
+    return selected
+
+
+def exceeded_limit(case: Case, size: Dict[str, int]) -> str:
+    """Raison de l'exclusion d'un cas par ses limites de taille ('' si aucune)"""
+    for key, limit in case.limits.items():
+        if size.get(key, 0) > limit:
+            return f"{key} = {size[key]:,} > {limit:,} (--no-limits pour forcer)"
+    return ''
+
@@ -0,0 +1,148 @@
+"""
+Temps d'import à froid des paquets et des modules chargés par les processus fils.
+
+Chaque mesure lance un interpréteur neuf (comme un processus fils en spawn)
+qui chronomètre le seul `import` du module, sans le démarrage de Python. Les
+résultats ont la forme de ceux de runner.py (charge "imports", un cas par
+module) : `python -m benchmark compare` s'applique aussi.
+
+Les modules de STARTUP_MODULES doivent s'importer en moins de IMPORT_BUDGET :
+les dépendances lourdes (numpy, matplotlib, multiprocessing...) n'y sont
+chargées qu'au premier usage. Avec `detail`, les paquets de plus haut niveau
+les plus coûteux sont relevés par `python -X importtime`.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .runner import REPEAT
+
+SEQUENTIEL_DIR = Path(__file__).resolve().parents[1]
+FRAMEWORKS_DIR = Path(__file__).resolve().parents[2] / "Frameworks"
+SEARCH_PATH = [SEQUENTIEL_DIR, FRAMEWORKS_DIR / "HPC_GA", FRAMEWORKS_DIR / "HPC_Tabu"]
+
+IMPORT_BUDGET = 0.100  # secondes
+WORKLOAD = "imports"
+TOP_IMPORTS = 5
+
+# Imports des paquets : sous IMPORT_BUDGET
+STARTUP_MODULES = ['HPC_GA', 'HPC_Tabu', 'HPC_GA.utils']
+# Modules chargés par les processus fils (cibles des pools et étapes du pipeline)
+WORKER_MODULES = [
+    'HPC_GA.parallel.parallel_ga',
+    'HPC_Tabu.parallel.parallel_tabou',
+    'pipeline',
+    'Common_Neighbor_similarity',
+    'Functional_Similarity',
+    'filtrage_Subcellular_localization_data',
+    'Co-Expression_similarity',
+    'Weighted_PPI_Network',
+    'filtrage_complexes_reseaux',
+]
+MODULES = STARTUP_MODULES + WORKER_MODULES
+
+TIMER = """
+import importlib, json, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+print(json.dumps(time.perf_counter() - start))
+"""
+
+
+def child_environment() -> Dict[str, str]:
+    """Environnement des interpréteurs de mesure : modules du dépôt sur le chemin"""
+    env = dict(os.environ)
+    paths = [str(path) for path in SEARCH_PATH]
+    if env.get('PYTHONPATH'):
+        paths.append(env['PYTHONPATH'])
+    env['PYTHONPATH'] = os.pathsep.join(paths)
+    return env
+
+
+def run_python(args: Sequence[str], cwd: str) -> subprocess.CompletedProcess:
+    # Dossier de travail temporaire : les étapes créent leurs dossiers de sortie à l'import
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=child_environment(),
+                          capture_output=True, text=True)
+
+
+def import_time(module: str, cwd: str) -> float:
+    """Durée (s) de l'import de `module` dans un interpréteur neuf"""
+    result = run_python(['-c', TIMER.format(module=module)], cwd)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "erreur"
+        if 'ModuleNotFoundError' in error or 'ImportError' in error:
+            raise ImportError(error)
+        raise RuntimeError(error)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def imported_packages(code: str, cwd: str) -> Dict[str, float]:
+    """Paquets de plus haut niveau importés par `code` (nom -> secondes cumulées), via -X importtime"""
+    result = run_python(['-X', 'importtime', '-c', code], cwd)
+    packages = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or line.count('|') != 2:
+            continue
+        _, cumulative, name = line.split('|')
+        name = name.strip()
+        if cumulative.strip().isdigit() and '.' not in name:
+            packages[name] = max(packages.get(name, 0.0), int(cumulative) / 1e6)
+    return packages
+
+
+def heaviest_imports(module: str, cwd: str, top: int = TOP_IMPORTS) -> List[Tuple[str, float]]:
+    """
+    Paquets les plus coûteux (nom, secondes cumulées) importés avec `module`,
+    hors démarrage de l'interpréteur et paquet du module lui-même.
+    """
+    startup = imported_packages("import importlib", cwd)
+    packages = imported_packages(f"import importlib; importlib.import_module({module!r})", cwd)
+    own = module.split('.')[0]
+    heaviest = [(name, seconds) for name, seconds in packages.items()
+                if name not in startup and name != own]
+    return sorted(heaviest, key=lambda item: -item[1])[:top]
+
+
+def measure_imports(modules: Sequence[str] = MODULES, repeat: int = REPEAT,
+                    budget: float = IMPORT_BUDGET, detail: bool = False) -> List[Dict]:
+    """Mesure les imports ; status 'ok', 'skipped' (module absent) ou 'failed'"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="benchmark_imports_") as tmp:
+        for module in modules:
+            record = {'workload': WORKLOAD, 'case': module, 'size': {}}
+            try:
+                times = [import_time(module, tmp) for _ in range(repeat)]
+            except ImportError as e:
+                record.update(status='skipped', reason=f"dépendance absente: {e}")
+            except RuntimeError as e:
+                record.update(status='failed', error=str(e))
+            else:
+                record.update(status='ok', times=times, min=min(times),
+                              median=float(np.median(times)), mean=float(np.mean(times)))
+                if module in STARTUP_MODULES:
+                    record['budget'] = budget
+                    record['over_budget'] = record['median'] > budget
+                if detail:
+                    record['heaviest'] = heaviest_imports(module, tmp)
+            results.append(record)
+            print(format_import(record))
+    return results
+
+
+def format_import(result: Dict) -> str:
+    if result['status'] != 'ok':
+        return f"- {result['case']:<40} {result['status']}: {result.get('reason') or result.get('error')}"
+    line = f"- {result['case']:<40} {result['median'] * 1000:8.1f} ms (min {result['min'] * 1000:.1f} ms)"
+    if result.get('over_budget'):
+        line += f"  > budget de {result['budget'] * 1000:.0f} ms"
+    for name, seconds in result.get('heaviest', []):
+        line += f"\n    {name:<36} {seconds * 1000:8.1f} ms"
+    return line
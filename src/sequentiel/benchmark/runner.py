@@ -0,0 +1,222 @@
+"""
+Exécution des cas sur les charges et comparaison de résultats entre commits.
+
+Chaque cas est préparé puis exécuté `repeat` fois ; on garde les durées de
+chaque répétition et leurs min / médiane / moyenne. Les résultats sont écrits
+en JSON avec l'environnement de mesure (commit, versions, machine) :
+
+    {"environment": {...}, "parameters": {...},
+     "results": [{"workload", "case", "size", "status", "times", "min", "median", "mean"}]}
+
+Deux fichiers se comparent cas par cas sur la médiane (compare_results).
+"""
+
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .cases import Case, exceeded_limit
+from .workload import Workload
+
+DEFAULT_CLEAN_DATA = Path(__file__).resolve().parents[3] / "Data" / "clean data"
+RESULTS_DIR = Path("benchmark_results")
+
+REPEAT = 3
+REGRESSION_THRESHOLD = 1.10
+
+
+def git_commit() -> Optional[str]:
+    """Commit courant (suffixe -dirty si l'arbre est modifié), None hors dépôt git"""
+    cwd = Path(__file__).resolve().parent
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if status.strip() else "")
+
+
+def environment() -> Dict:
+    """Contexte de la mesure, pour ne comparer que des résultats comparables"""
+    import pandas as pd
+    import scipy
+
+    return {
+        'commit': git_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scipy': scipy.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+@contextlib.contextmanager
+def silenced(quiet: bool = True):
+    """Coupe les affichages et journaux des étapes pendant les mesures"""
+    if not quiet:
+        yield
+        return
+    logging.disable(logging.INFO)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def time_call(run, repeat: int = REPEAT) -> List[float]:
+    """Durées (s) de `repeat` appels, ramasse-miettes vidé avant chacun"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_case(case: Case, workload: Workload, workdir: Path, repeat: int = REPEAT,
+             limits: bool = True, quiet: bool = True) -> Dict:
+    """Mesure un cas sur une charge ; status 'ok', 'skipped' (raison) ou 'failed' (erreur)"""
+    size = workload.size()
+    record = {'workload': workload.name, 'case': case.name, 'size': size}
+
+    missing = [field for field in case.needs if not workload.has(field)]
+    reason = f"données absentes: {', '.join(missing)}" if missing else ''
+    if not reason and limits:
+        reason = exceeded_limit(case, size)
+    if reason:
+        return {**record, 'status': 'skipped', 'reason': reason}
+
+    case_dir = workdir / workload.name / case.name
+    case_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        with silenced(quiet):
+            run = case.prepare(workload, case_dir)
+            times = time_call(run, repeat)
+    except ImportError as e:
+        return {**record, 'status': 'skipped', 'reason': f"dépendance absente: {e}"}
+    except Exception as e:
+        return {**record, 'status': 'failed', 'error': f"{type(e).__name__}: {e}",
+                'traceback': traceback.format_exc()}
+
+    return {**record, 'status': 'ok', 'times': times, 'min': min(times),
+            'median': float(np.median(times)), 'mean': float(np.mean(times))}
+
+
+def run_benchmark(workloads: Iterable[Workload], cases: Dict[str, Case], repeat: int = REPEAT,
+                  limits: bool = True, quiet: bool = True) -> List[Dict]:
+    """
+    Mesure tous les cas sur toutes les charges. Les étapes écrivent leurs
+    sorties (et créent leurs dossiers à l'import) dans un dossier temporaire,
+    qui est aussi le dossier courant pendant la mesure.
+    """
+    import instrumentation
+
+    # Les étapes décorées s'enregistrent : pas de résumé en fin de mesure
+    instrumentation.PRINT_SUMMARY = False
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as tmp:
+        os.chdir(tmp)
+        try:
+            for workload in workloads:
+                size = workload.size()
+                print(f"\n=== {workload.name}: {size['proteins']:,} protéines, "
+                      f"{size['edges']:,} arêtes, {size['complexes']:,} complexes ===")
+                for case in cases.values():
+                    result = run_case(case, workload, Path(tmp), repeat, limits, quiet)
+                    results.append(result)
+                    print(format_result(result))
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def format_result(result: Dict) -> str:
+    if result['status'] == 'ok':
+        return f"- {result['case']:<40} {result['median']:10.4f}s (min {result['min']:.4f}s)"
+    detail = result.get('reason') or result.get('error')
+    return f"- {result['case']:<40} {result['status']}: {detail}"
+
+
+def save_results(results: List[Dict], output_file: Path, parameters: Dict) -> Path:
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'parameters': parameters, 'results': results},
+                  f, indent=2)
+    return output_file
+
+
+def default_output() -> Path:
+    commit = git_commit() or "sans-commit"
+    return RESULTS_DIR / f"benchmark_{commit}_{datetime.now():%Y%m%d-%H%M%S}.json"
+
+
+def load_results(path: Path) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(old: Dict, new: Dict,
+                    threshold: float = REGRESSION_THRESHOLD) -> List[Tuple[str, str, float, float, float, str]]:
+    """
+    Compare deux fichiers de résultats sur les médianes des cas mesurés dans les deux.
+
+    Returns:
+        lignes (charge, cas, ancienne médiane, nouvelle médiane, rapport, verdict)
+        avec verdict 'regression' si rapport > threshold, 'gain' si < 1/threshold
+    """
+    def medians(data):
+        return {(r['workload'], r['case']): r['median'] for r in data['results']
+                if r['status'] == 'ok'}
+
+    before, after = medians(old), medians(new)
+    rows = []
+    for key in before:
+        if key not in after:
+            continue
+        ratio = after[key] / before[key] if before[key] > 0 else float('inf')
+        verdict = ('regression' if ratio > threshold else
+                   'gain' if ratio < 1 / threshold else '')
+        rows.append((*key, before[key], after[key], ratio, verdict))
+    return rows
+
+
+def print_comparison(old: Dict, new: Dict, threshold: float = REGRESSION_THRESHOLD) -> int:
+    """Affiche la comparaison et renvoie le nombre de régressions"""
+    print(f"Avant: {old['environment'].get('commit')} ({old['environment'].get('date')})")
+    print(f"Après: {new['environment'].get('commit')} ({new['environment'].get('date')})")
+    for field in ('cpus', 'python', 'numpy', 'pandas', 'scipy'):
+        if old['environment'].get(field) != new['environment'].get(field):
+            print(f"Attention: {field} différent ({old['environment'].get(field)} -> "
+                  f"{new['environment'].get(field)})", file=sys.stderr)
+
+    rows = compare_results(old, new, threshold)
+    print(f"\n{'charge':<28} {'cas':<40} {'avant':>10} {'après':>10} {'rapport':>8}")
+    for workload, case, before, after, ratio, verdict in rows:
+        print(f"{workload:<28} {case:<40} {before:10.4f} {after:10.4f} {ratio:8.2f} {verdict}")
+    regressions = sum(1 for row in rows if row[-1] == 'regression')
+    print(f"\n{len(rows)} cas comparés, {regressions} régression(s) au-delà de x{threshold:.2f}")
+    return regressions
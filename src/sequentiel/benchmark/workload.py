@@ -0,0 +1,309 @@
+"""
+Charges de travail des mesures : réseaux PPI synthétiques et réseaux nettoyés.
+
+Le générateur produit, pour une taille donnée et à partir d'une graine :
+- un réseau sans échelle (modèle de Chung-Lu : degrés attendus en loi de
+  puissance d'exposant 2 à 3, comme les réseaux PPI réels), avec ses hubs
+- des complexes plantés : groupes de protéines connexes et denses
+- des annotations GO et des compartiments, partagés au sein des complexes
+- une matrice d'expression où les membres d'un complexe suivent un profil commun
+- des scores de canaux (HCN, PCC, Func, SL) à couverture partielle
+- des clusters « détectés » (complexes perturbés et clusters aléatoires) pour
+  les métriques d'évaluation
+Les réseaux de Data/clean data sont chargés dans la même structure, sans les
+données annexes (GO, compartiments, expression) qui n'y sont pas.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from edge_keys import pack_pairs, unique_keys, unpack_pairs
+from edge_store import edges_exist, read_edges
+
+# Paramètres par défaut du générateur
+MEAN_DEGREE = 10.0
+DEGREE_EXPONENT = 2.5
+PROTEINS_PER_COMPLEX = 50
+MEAN_COMPLEX_SIZE = 6
+MAX_COMPLEX_SIZE = 40
+COMPLEX_DENSITY = 0.5
+GO_TERMS = 2000
+GO_TERMS_PER_PROTEIN = 4
+GO_COVERAGE = 0.9
+COMPARTMENTS = 30
+EXPRESSION_SAMPLES = 30
+EXPRESSION_COVERAGE = 0.8
+
+# Canal -> (couverture des arêtes, paramètres de la loi bêta des scores)
+CHANNELS = {
+    'HCN': (1.0, (0.5, 5.0)),
+    'PCC': (0.4, (5.0, 5.0)),
+    'Func': (0.7, (2.0, 2.0)),
+    'SL': (0.8, (1.0, 3.0)),
+}
+
+
+class Workload:
+    """Réseau et données associées sur lesquels les étapes sont mesurées"""
+
+    def __init__(self, name: str, edges: pd.DataFrame, weighted: Optional[pd.DataFrame] = None,
+                 complexes: Optional[List[List[str]]] = None,
+                 detected: Optional[List[List[str]]] = None,
+                 go_annotations: Optional[pd.DataFrame] = None,
+                 compartments: Optional[pd.DataFrame] = None,
+                 expression: Optional[pd.DataFrame] = None,
+                 channels: Optional[Dict[str, pd.DataFrame]] = None,
+                 parameters: Optional[Dict] = None):
+        self.name = name
+        self.edges = edges  # protein1, protein2
+        self.weighted = weighted  # protein1, protein2, weight
+        self.complexes = complexes
+        self.detected = detected
+        self.go_annotations = go_annotations  # protein, go_term
+        self.compartments = compartments  # protein, go_term
+        self.expression = expression  # protéines x échantillons (GSM...)
+        self.channels = channels  # canal -> protein1, protein2, score
+        self.parameters = parameters or {}
+
+    def has(self, *fields: str) -> bool:
+        return all(getattr(self, field) is not None for field in fields)
+
+    def size(self) -> Dict[str, int]:
+        proteins = pd.unique(np.concatenate([self.edges['protein1'].values,
+                                             self.edges['protein2'].values]))
+        return {
+            'proteins': int(len(proteins)),
+            'edges': int(len(self.edges)),
+            'complexes': int(len(self.complexes)) if self.complexes is not None else 0,
+        }
+
+
+def weighted_adjacency(weighted: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """Graphe {nœud: {voisin: poids}} attendu par evaluation.py"""
+    graph = defaultdict(dict)
+    for a, b, w in zip(weighted['protein1'].values, weighted['protein2'].values,
+                       weighted['weight'].values.astype(float)):
+        graph[a][b] = w
+        graph[b][a] = w
+    return dict(graph)
+
+
+def protein_ids(n: int) -> np.ndarray:
+    return np.array([f"SYN{i:07d}" for i in range(n)], dtype=object)
+
+
+def scale_free_keys(n_proteins: int, mean_degree: float, exponent: float,
+                    rng: np.random.Generator) -> np.ndarray:
+    """
+    Clés des arêtes d'un réseau de Chung-Lu : les extrémités sont tirées avec
+    une probabilité proportionnelle à un degré attendu en loi de puissance
+    (rang^(-1/(exponent-1))), boucles et doublons écartés.
+    """
+    expected = (np.arange(n_proteins) + 1.0) ** (-1.0 / (exponent - 1.0))
+    cdf = np.cumsum(expected / expected.sum())
+    cdf[-1] = 1.0
+    target = int(n_proteins * mean_degree / 2)
+    keys = np.zeros(0, dtype=np.uint64)
+    while len(keys) < target:
+        draw = int((target - len(keys)) * 1.1) + 16
+        a = np.searchsorted(cdf, rng.random(draw))
+        b = np.searchsorted(cdf, rng.random(draw))
+        valid = a != b
+        keys = unique_keys(np.concatenate([keys, pack_pairs(a[valid], b[valid])]))
+    return rng.permutation(keys)[:target]
+
+
+def plant_complexes(n_proteins: int, n_complexes: int, rng: np.random.Generator,
+                    mean_size: int = MEAN_COMPLEX_SIZE, max_size: int = MAX_COMPLEX_SIZE,
+                    density: float = COMPLEX_DENSITY):
+    """
+    Complexes plantés : membres tirés au hasard, reliés par une chaîne (complexe
+    connexe) et par chaque autre paire avec la probabilité `density`.
+
+    Returns:
+        (membres de chaque complexe (codes), clés des arêtes internes)
+    """
+    sizes = np.minimum(rng.geometric(1.0 / max(mean_size - 2, 1), n_complexes) + 2, max_size)
+    sizes = np.minimum(sizes, n_proteins)
+    members, keys = [], []
+    for size in sizes:
+        nodes = rng.choice(n_proteins, size=size, replace=False)
+        a, b = np.triu_indices(size, k=1)
+        chain = b == a + 1
+        chosen = chain | (rng.random(len(a)) < density)
+        members.append(nodes)
+        keys.append(pack_pairs(nodes[a[chosen]], nodes[b[chosen]]))
+    return members, np.concatenate(keys) if keys else np.zeros(0, dtype=np.uint64)
+
+
+def popular_terms(n_terms: int, count: int, rng: np.random.Generator) -> np.ndarray:
+    """Tirage de termes avec une popularité de Zipf (quelques termes très fréquents)"""
+    popularity = 1.0 / (np.arange(n_terms) + 1.0)
+    return rng.choice(n_terms, size=count, p=popularity / popularity.sum())
+
+
+def annotation_pairs(n_proteins: int, members: List[np.ndarray], n_terms: int,
+                     per_protein: float, shared: int, coverage: float,
+                     rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Annotations (protein, term) : termes propres à chaque protéine annotée et
+    `shared` termes communs à tous les membres de chaque complexe.
+    """
+    annotated = np.flatnonzero(rng.random(n_proteins) < coverage)
+    counts = 1 + rng.poisson(max(per_protein - 1, 0), len(annotated))
+    proteins = [np.repeat(annotated, counts)]
+    terms = [popular_terms(n_terms, int(counts.sum()), rng)]
+    for nodes in members:
+        complex_terms = popular_terms(n_terms, shared, rng)
+        proteins.append(np.repeat(nodes, shared))
+        terms.append(np.tile(complex_terms, len(nodes)))
+    pairs = pd.DataFrame({'protein': np.concatenate(proteins), 'term': np.concatenate(terms)})
+    return pairs.drop_duplicates().reset_index(drop=True)
+
+
+def expression_matrix(n_proteins: int, members: List[np.ndarray], n_samples: int,
+                      coverage: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Matrice d'expression (protéines x échantillons) : bruit propre à chaque
+    protéine, plus un profil commun aux membres d'un même complexe.
+    Les lignes non couvertes sont NaN.
+    """
+    values = rng.normal(8.0, 1.0, (n_proteins, n_samples))
+    for nodes in members:
+        values[nodes] += 1.5 * rng.normal(0.0, 1.0, n_samples)
+    values[rng.random(n_proteins) >= coverage] = np.nan
+    return values
+
+
+def perturb_complexes(complexes: Sequence[Sequence[str]], proteins: np.ndarray,
+                      rng: np.random.Generator, found: float = 0.8, drop: float = 0.2,
+                      extra: float = 0.5) -> List[List[str]]:
+    """
+    Clusters « détectés » à partir de complexes de référence : une partie des
+    complexes retrouvés avec des membres en moins et en plus, et des clusters
+    aléatoires (extra x nombre de complexes), comme en sortie d'un algorithme
+    de détection.
+    """
+    detected = []
+    for members in complexes:
+        if rng.random() >= found:
+            continue
+        kept = [p for p in members if rng.random() >= drop]
+        added = proteins[rng.integers(0, len(proteins), rng.integers(0, 3))].tolist()
+        cluster = list(dict.fromkeys(kept + added))
+        if len(cluster) >= 2:
+            detected.append(cluster)
+    for _ in range(int(extra * len(complexes))):
+        size = int(rng.integers(3, 11))
+        detected.append(list(dict.fromkeys(proteins[rng.integers(0, len(proteins), size)].tolist())))
+    return detected
+
+
+def channel_frames(keys: np.ndarray, ids: np.ndarray, rng: np.random.Generator,
+                   channels: Dict = CHANNELS) -> Dict[str, pd.DataFrame]:
+    """Scores synthétiques de chaque canal sur une fraction des arêtes"""
+    frames = {}
+    for channel, (coverage, (alpha, beta)) in channels.items():
+        selected = keys[rng.random(len(keys)) < coverage]
+        low, high = unpack_pairs(selected)
+        frames[channel] = pd.DataFrame({
+            'protein1': ids[low],
+            'protein2': ids[high],
+            'score': rng.beta(alpha, beta, len(selected)).astype(np.float32),
+        })
+    return frames
+
+
+def generate_workload(n_proteins: int, seed: int = 0, mean_degree: float = MEAN_DEGREE,
+                      exponent: float = DEGREE_EXPONENT, n_complexes: Optional[int] = None,
+                      n_terms: int = GO_TERMS, n_samples: int = EXPRESSION_SAMPLES) -> Workload:
+    """
+    Charge synthétique complète de n_proteins protéines (voir l'en-tête du
+    module). Deux appels de mêmes paramètres produisent la même charge.
+    """
+    rng = np.random.default_rng(seed)
+    if n_complexes is None:
+        n_complexes = max(n_proteins // PROTEINS_PER_COMPLEX, 1)
+
+    members, complex_keys = plant_complexes(n_proteins, n_complexes, rng)
+    background = scale_free_keys(n_proteins, mean_degree, exponent, rng)
+    keys = rng.permutation(unique_keys(np.concatenate([background, complex_keys])))
+
+    # Identifiants mélangés : les hubs ne sont pas les premiers codes
+    ids = protein_ids(n_proteins)[rng.permutation(n_proteins)]
+    low, high = unpack_pairs(keys)
+    swap = rng.random(len(keys)) < 0.5
+    edges = pd.DataFrame({'protein1': ids[np.where(swap, high, low)],
+                          'protein2': ids[np.where(swap, low, high)]})
+    weighted = edges.assign(weight=rng.beta(2.0, 5.0, len(edges)).astype(np.float32))
+
+    go = annotation_pairs(n_proteins, members, n_terms, GO_TERMS_PER_PROTEIN, 2, GO_COVERAGE, rng)
+    go_annotations = pd.DataFrame({'protein': ids[go['protein'].values],
+                                   'go_term': [f"GO:{t:07d}" for t in go['term'].values]})
+    sl = annotation_pairs(n_proteins, members, COMPARTMENTS, 1.5, 1, 1.0, rng)
+    compartments = pd.DataFrame({'protein': ids[sl['protein'].values],
+                                 'go_term': [f"compartment {t}" for t in sl['term'].values]})
+
+    values = expression_matrix(n_proteins, members, n_samples, EXPRESSION_COVERAGE, rng)
+    expression = pd.DataFrame(values, index=pd.Index(ids, name='IDENTIFIER'),
+                              columns=[f"GSM{k}" for k in range(n_samples)]).dropna()
+
+    complexes = [ids[nodes].tolist() for nodes in members]
+    return Workload(
+        name=f"synthetique_{n_proteins}",
+        edges=edges,
+        weighted=weighted,
+        complexes=complexes,
+        detected=perturb_complexes(complexes, ids, rng),
+        go_annotations=go_annotations,
+        compartments=compartments,
+        expression=expression,
+        channels=channel_frames(keys, ids, rng),
+        parameters={'proteins': n_proteins, 'seed': seed, 'mean_degree': mean_degree,
+                    'exponent': exponent, 'complexes': n_complexes},
+    )
+
+
+def complex_lists(complexes) -> List[List[str]]:
+    """Listes de protéines d'un ComplexSet (filtrage_complexes_reseaux)"""
+    return [complexes.vocabulary[complexes.members[start:end]].tolist()
+            for start, end in zip(complexes.offsets[:-1], complexes.offsets[1:])]
+
+
+def load_clean_workload(clean_dir: Path, network: str, seed: int = 0) -> Optional[Workload]:
+    """
+    Charge un réseau de Data/clean data (interactions/<réseau>.txt), avec son
+    réseau pondéré et ses complexes filtrés s'ils existent. Les clusters
+    détectés sont tirés des complexes comme pour les charges synthétiques.
+    """
+    from filtrage_complexes_reseaux import SPECIES_COMPLEXES, load_reference_complexes
+    from network_io import read_weighted_network
+
+    clean_dir = Path(clean_dir)
+    interactions = clean_dir / "interactions" / f"{network}.txt"
+    if not edges_exist(interactions):
+        return None
+    edges = read_edges(interactions, columns=[], header=None, usecols=[0, 1],
+                       names=['protein1', 'protein2'], dtype=str).dropna()
+
+    weighted_file = clean_dir / "weighted_networks" / f"weighted_{network}.txt"
+    weighted = read_weighted_network(weighted_file) if edges_exist(weighted_file) else None
+
+    complexes = detected = None
+    source, species = network.rsplit("_", 1)
+    config = SPECIES_COMPLEXES.get(species)
+    if config is not None:
+        complex_file = clean_dir / "complexes" / config["output"].format(network=source)
+        if complex_file.exists():
+            complexes = complex_lists(load_reference_complexes(complex_file, config["format"]))
+            proteins = pd.unique(np.concatenate([edges['protein1'].values,
+                                                 edges['protein2'].values]))
+            detected = perturb_complexes(complexes, np.asarray(proteins, dtype=object),
+                                         np.random.default_rng(seed))
+
+    return Workload(network, edges, weighted=weighted, complexes=complexes, detected=detected,
+                    parameters={'source': str(interactions)})
@@ -0,0 +1,203 @@
+"""
+Ouverture transparente des fichiers bruts, compressés ou non (.gz, .bz2, .xz, .zip).
+
+La compression est détectée sur les premiers octets (nombre magique), pas sur
+l'extension : STRING, BioGRID et les fichiers idmapping UniProt se lisent
+directement dans leur forme distribuée, sans décompression préalable sur disque.
+
+La décompression se fait en flux dans un thread d'arrière-plan qui remplit une
+file bornée de blocs pendant que l'appelant parse les blocs précédents (zlib,
+bz2 et lzma relâchent le GIL pendant la décompression, les deux se recouvrent).
+Pour le gzip, un décompresseur externe multi-thread (pigz, igzip) est utilisé
+s'il est installé, sa sortie étant lue par le même thread. Sur une machine à
+un seul cœur, le thread n'apporte rien : la décompression reste alors en ligne.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+)
+
+BLOCK_SIZE = 1 << 20
+QUEUE_BLOCKS = 16
+
+# Décompresseurs gzip externes, par préférence (lecture sur la sortie standard)
+EXTERNAL_GZIP = (('pigz', '-dc'), ('igzip', '-dc'))
+
+
+def detect_compression(path) -> Optional[str]:
+    """Compression d'un fichier d'après ses premiers octets ('gzip', 'bz2', 'xz', 'zip' ou None)"""
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    for magic, kind in MAGIC:
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+class ThreadedReader(io.RawIOBase):
+    """
+    Flux binaire lu par blocs dans un thread d'arrière-plan.
+
+    Le thread lit `raw` (fichier décompressé à la volée, sortie d'un processus...)
+    et dépose les blocs dans une file bornée ; readinto les consomme. Une erreur
+    de lecture est relancée côté appelant.
+    """
+
+    def __init__(self, raw: BinaryIO, block_size: int = BLOCK_SIZE,
+                 queue_blocks: int = QUEUE_BLOCKS, process: subprocess.Popen = None):
+        super().__init__()
+        self._raw = raw
+        self._process = process
+        self._block_size = block_size
+        self._queue = queue.Queue(maxsize=queue_blocks)
+        self._stop = threading.Event()
+        self._current = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, name="decompression", daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                block = self._raw.read(self._block_size)
+                if not self._put(block) or not block:
+                    return
+        except BaseException as e:  # relancée dans le thread lecteur
+            self._put(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._current and not self._eof:
+            item = self._queue.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+            self._current = memoryview(item)
+        n = min(len(buffer), len(self._current))
+        buffer[:n] = self._current[:n]
+        self._current = self._current[n:]
+        return n
+
+    def close(self):
+        if self.closed:
+            return
+        self._stop.set()
+        # Débloque un thread en attente de place dans la file
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join()
+        self._raw.close()
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            if self._eof and self._process.returncode not in (0, -9):
+                raise OSError(f"Échec de la décompression externe (code {self._process.returncode})")
+        super().close()
+
+
+def threaded(raw: BinaryIO, block_size: int = BLOCK_SIZE, **options) -> io.BufferedReader:
+    """Enveloppe un flux binaire ouvert dans une lecture par thread d'arrière-plan"""
+    return io.BufferedReader(ThreadedReader(raw, block_size, **options), buffer_size=block_size)
+
+
+def _external_gzip(path) -> Optional[subprocess.Popen]:
+    for tool, flag in EXTERNAL_GZIP:
+        executable = shutil.which(tool)
+        if executable:
+            return subprocess.Popen([executable, flag, os.fspath(path)],
+                                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    bufsize=BLOCK_SIZE)
+    return None
+
+
+def _zip_member(archive: zipfile.ZipFile, member: Optional[str]) -> str:
+    if member is not None:
+        return member
+    names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    if len(names) != 1:
+        raise ValueError(f"Archive à {len(names)} fichiers, préciser le membre à lire: "
+                         f"{', '.join(names[:5])}")
+    return names[0]
+
+
+def open_input(path, member: Optional[str] = None, threaded_read: Optional[bool] = None,
+               external: bool = True, block_size: int = BLOCK_SIZE) -> BinaryIO:
+    """
+    Ouvre un fichier brut en lecture binaire, décompressé à la volée.
+
+    Args:
+        member: fichier à lire dans une archive zip (facultatif si elle n'en contient qu'un)
+        threaded_read: décompression dans un thread d'arrière-plan (None : si plus d'un cœur)
+        external: décompresseur gzip externe (pigz, igzip) s'il est installé
+    """
+    path = Path(path)
+    if threaded_read is None:
+        threaded_read = (os.cpu_count() or 1) > 1
+    kind = detect_compression(path)
+    if kind is None:
+        return open(path, 'rb', buffering=block_size)
+
+    if kind == 'gzip' and external and threaded_read:
+        process = _external_gzip(path)
+        if process is not None:
+            return threaded(process.stdout, block_size, process=process)
+
+    if kind == 'gzip':
+        raw = gzip.open(path, 'rb')
+    elif kind == 'bz2':
+        raw = bz2.open(path, 'rb')
+    elif kind == 'xz':
+        raw = lzma.open(path, 'rb')
+    else:
+        # Le fichier de l'archive reste ouvert tant que le membre n'est pas fermé
+        with zipfile.ZipFile(path, 'r') as archive:
+            raw = archive.open(_zip_member(archive, member))
+
+    return threaded(raw, block_size) if threaded_read else raw
+
+
+@contextmanager
+def input_stream(source, **options) -> Iterator[BinaryIO]:
+    """
+    Flux binaire d'une source : un chemin est ouvert par open_input (et refermé
+    en sortie), un fichier déjà ouvert est rendu tel quel.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open_input(source, **options) as f:
+            yield f
+    else:
+        yield source
@@ -0,0 +1,194 @@
+"""
+Représentation CSR (compressed sparse row) d'un réseau PPI pondéré non orienté.
+
+Les protéines sont codées sur un vocabulaire trié, chaque arête unique est
+conservée une fois dans (src, dst, weight) avec src < dst, et les listes
+d'adjacence des deux sens sont stockées en CSR (indptr, indices, data) pour les
+calculs vectorisés par nœud (degrés, forces, top-k, composantes...).
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from edge_keys import build_vocabulary, encode_edges, pack_pairs, unique_keys, unpack_pairs
+from edge_store import EdgeSet, load_edges
+from network_io import read_weighted_network
+
+
+# Tableaux d'un graphe construit (hors vocabulaire), partagés par shared_graph.py
+ARRAYS = ('src', 'dst', 'weight', 'indptr', 'indices', 'data', 'edge_of_arc')
+
+
+class CSRGraph:
+    """Graphe non orienté pondéré en tableaux CSR"""
+
+    def __init__(self, vocabulary: np.ndarray, src: np.ndarray, dst: np.ndarray,
+                 weight: np.ndarray):
+        self.vocabulary = np.asarray(vocabulary)
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        self.weight = np.asarray(weight, dtype=np.float32)
+
+        # Adjacence symétrique : chaque arête apparaît dans les deux sens
+        n = len(self.vocabulary)
+        rows = np.concatenate([self.src, self.dst])
+        cols = np.concatenate([self.dst, self.src])
+        data = np.concatenate([self.weight, self.weight])
+        order = np.lexsort((cols, rows))
+        self.indices = cols[order]
+        self.data = data[order]
+        self.edge_of_arc = np.concatenate([np.arange(self.n_edges)] * 2)[order]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self.indptr[1:])
+
+    @classmethod
+    def from_arrays(cls, vocabulary: np.ndarray, arrays: Dict[str, np.ndarray]) -> 'CSRGraph':
+        """
+        Graphe sur des tableaux déjà construits (ARRAYS), sans copie ni
+        recalcul de l'adjacence : tableaux attachés en mémoire partagée.
+        """
+        graph = cls.__new__(cls)
+        graph.vocabulary = vocabulary
+        for name in ARRAYS:
+            setattr(graph, name, arrays[name])
+        return graph
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, vocabulary: Optional[np.ndarray] = None) -> 'CSRGraph':
+        """Construit le graphe depuis un DataFrame (protein1, protein2[, weight])"""
+        if vocabulary is None:
+            vocabulary = build_vocabulary(df['protein1'].values, df['protein2'].values)
+        weights = df['weight'].values if 'weight' in df else np.ones(len(df), dtype=np.float32)
+        keys, valid = encode_edges(df['protein1'].values, df['protein2'].values, vocabulary)
+        keys, weights = unique_keys(keys, np.asarray(weights)[valid])
+        src, dst = unpack_pairs(keys)
+        return cls(vocabulary, src, dst, weights)
+
+    @classmethod
+    def from_edges(cls, edges: EdgeSet) -> 'CSRGraph':
+        """Construit le graphe depuis un jeu d'arêtes binaire, sans décoder les identifiants"""
+        vocabulary, a, b = edges.compact()
+        weights = (next(iter(edges.columns.values())) if edges.columns
+                   else np.ones(len(edges), dtype=np.float32))
+        valid = a != b
+        keys, weights = unique_keys(pack_pairs(a[valid], b[valid]), np.asarray(weights)[valid])
+        src, dst = unpack_pairs(keys)
+        return cls(vocabulary, src, dst, weights)
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'CSRGraph':
+        """Charge un réseau pondéré weighted_*.txt (ou son jeu binaire weighted_*.edges)"""
+        edges = load_edges(path)
+        if edges is not None:
+            return cls.from_edges(edges)
+        return cls.from_frame(read_weighted_network(path))
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.vocabulary)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.src)
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def strength(self) -> np.ndarray:
+        """Somme des poids des arêtes incidentes à chaque nœud"""
+        return np.bincount(np.concatenate([self.src, self.dst]),
+                           weights=np.concatenate([self.weight, self.weight]),
+                           minlength=self.n_nodes)
+
+    def arc_sources(self) -> np.ndarray:
+        """Nœud d'origine de chaque arc de l'adjacence CSR"""
+        return np.repeat(np.arange(self.n_nodes, dtype=np.int32), self.degree())
+
+    def adjacency(self, weighted: bool = True) -> sparse.csr_matrix:
+        """Matrice d'adjacence symétrique scipy (partage les tableaux CSR)"""
+        data = self.data if weighted else np.ones(len(self.data), dtype=np.float32)
+        return sparse.csr_matrix((data, self.indices, self.indptr),
+                                 shape=(self.n_nodes, self.n_nodes))
+
+    def subgraph_edges(self, mask: np.ndarray) -> 'CSRGraph':
+        """Graphe restreint aux arêtes sélectionnées (même vocabulaire)"""
+        return CSRGraph(self.vocabulary, self.src[mask], self.dst[mask], self.weight[mask])
+
+    def adjacency_view(self) -> 'AdjacencyView':
+        """Vue {protéine: {voisin: poids}} du graphe, pour les métriques de evaluation.py"""
+        view = self.__dict__.get('_adjacency_view')
+        if view is None:
+            view = self._adjacency_view = AdjacencyView(self)
+        return view
+
+    def to_frame(self, weight_column: str = 'weight') -> pd.DataFrame:
+        return pd.DataFrame({
+            'protein1': self.vocabulary[self.src],
+            'protein2': self.vocabulary[self.dst],
+            weight_column: self.weight
+        })
+
+
+class AdjacencyView:
+    """
+    Le graphe vu comme le dictionnaire {nœud: {voisin: poids}} attendu par
+    evaluation.py (get, [], in, len, itération). Les dictionnaires de
+    voisins sont construits depuis le CSR au premier accès à chaque nœud,
+    puis gardés (par nœud) pour les accès suivants.
+    """
+
+    def __init__(self, graph: CSRGraph):
+        self.graph = graph
+        self._neighbors: Dict = {}
+
+    def _code(self, node) -> int:
+        vocabulary = self.graph.vocabulary
+        try:
+            code = int(np.searchsorted(vocabulary, node))
+        except (TypeError, ValueError):
+            return -1
+        return code if code < len(vocabulary) and vocabulary[code] == node else -1
+
+    def get(self, node, default=None):
+        neighbors = self._neighbors.get(node)
+        if neighbors is not None:
+            return neighbors
+        code = self._code(node)
+        if code < 0:
+            return default
+        graph = self.graph
+        start, end = graph.indptr[code], graph.indptr[code + 1]
+        neighbors = dict(zip(graph.vocabulary[graph.indices[start:end]].tolist(),
+                             graph.data[start:end].tolist()))
+        self._neighbors[node] = neighbors
+        return neighbors
+
+    def __getitem__(self, node) -> Dict:
+        neighbors = self.get(node)
+        if neighbors is None:
+            raise KeyError(node)
+        return neighbors
+
+    def __contains__(self, node) -> bool:
+        return node in self._neighbors or self._code(node) >= 0
+
+    def __len__(self) -> int:
+        return self.graph.n_nodes
+
+    def __iter__(self):
+        return iter(self.graph.vocabulary.tolist())
+
+
+def csr_ranges(indptr: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Positions des arcs CSR des lignes demandées (concaténation des plages indptr)"""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return offsets + np.arange(total)
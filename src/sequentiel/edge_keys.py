@@ -0,0 +1,117 @@
+"""
+Codage entier des arêtes PPI.
+
+Les protéines sont codées par leur rang dans un vocabulaire trié (int32) et une
+arête non orientée (a, b) est représentée par une clé uint64 unique :
+    clé = (min(a, b) << 32) | max(a, b)
+Les sources de scores deviennent ainsi des couples (clés triées, valeurs) que
+l'on aligne par fusion triée (np.searchsorted) au lieu de dictionnaires de tuples.
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def build_vocabulary(*columns: Iterable[str]) -> np.ndarray:
+    """Vocabulaire trié des protéines présentes dans une ou plusieurs colonnes"""
+    parts = [pd.unique(np.asarray(col, dtype=object)) for col in columns]
+    if not parts:
+        return np.array([], dtype=str)
+    return np.unique(np.concatenate(parts).astype(str))
+
+
+def encode(ids: Iterable[str], vocabulary) -> np.ndarray:
+    """
+    Code les identifiants par leur rang dans le vocabulaire (-1 si absent).
+    `vocabulary` peut être le tableau trié ou un pd.Index déjà construit dessus
+    (à réutiliser quand on code plusieurs colonnes).
+    """
+    if not isinstance(vocabulary, pd.Index):
+        vocabulary = pd.Index(vocabulary)
+    codes = vocabulary.get_indexer(np.asarray(ids, dtype=object))
+    return codes.astype(np.int32)
+
+
+def pack_pairs(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Clé uint64 canonique d'arêtes non orientées (indépendante de l'ordre a/b)"""
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    low = np.minimum(a, b).astype(np.uint64)
+    high = np.maximum(a, b).astype(np.uint64)
+    return (low << np.uint64(32)) | high
+
+
+def unpack_pairs(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Retrouve les codes (min, max) des extrémités à partir des clés"""
+    keys = np.asarray(keys, dtype=np.uint64)
+    low = (keys >> np.uint64(32)).astype(np.int32)
+    high = (keys & np.uint64(0xFFFFFFFF)).astype(np.int32)
+    return low, high
+
+
+def encode_edges(protein1, protein2, vocabulary,
+                 drop_self_loops: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Code une liste d'arêtes en clés uint64.
+
+    Returns:
+        (clés, masque) : clés des arêtes valides et masque des lignes conservées
+        (extrémités présentes dans le vocabulaire, sans boucles si demandé)
+    """
+    if not isinstance(vocabulary, pd.Index):
+        vocabulary = pd.Index(vocabulary)
+    a = encode(protein1, vocabulary)
+    b = encode(protein2, vocabulary)
+    valid = (a >= 0) & (b >= 0)
+    if drop_self_loops:
+        valid &= a != b
+    return pack_pairs(a[valid], b[valid]), valid
+
+
+def unique_keys(keys: np.ndarray, values: np.ndarray = None):
+    """
+    Trie et déduplique des clés en gardant la première occurrence.
+
+    Returns:
+        clés triées uniques, et les valeurs correspondantes si values est fourni
+    """
+    sorted_keys, first = np.unique(keys, return_index=True)
+    if values is None:
+        return sorted_keys
+    return sorted_keys, np.asarray(values)[first]
+
+
+def lookup_keys(sorted_keys: np.ndarray, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Position de chaque clé recherchée dans un tableau de clés trié.
+
+    Returns:
+        (positions, trouvées)
+    """
+    queries = np.asarray(queries, dtype=np.uint64)
+    if len(sorted_keys) == 0:
+        return np.zeros(len(queries), dtype=np.intp), np.zeros(len(queries), dtype=bool)
+    pos = np.searchsorted(sorted_keys, queries)
+    pos[pos == len(sorted_keys)] = 0
+    return pos, sorted_keys[pos] == queries
+
+
+def align_values(reference_keys: np.ndarray, source_keys: np.ndarray,
+                 source_values: np.ndarray, fill=np.nan, dtype=np.float32) -> np.ndarray:
+    """
+    Aligne les valeurs d'une source (clés triées) sur des clés de référence.
+    Les arêtes absentes de la source reçoivent `fill`.
+    """
+    pos, found = lookup_keys(source_keys, reference_keys)
+    result = np.full(len(reference_keys), fill, dtype=dtype)
+    if found.any():
+        result[found] = np.asarray(source_values)[pos[found]]
+    return result
+
+
+def decode_edges(keys: np.ndarray, vocabulary: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Identifiants (protein1, protein2) des arêtes à partir des clés"""
+    low, high = unpack_pairs(keys)
+    return vocabulary[low], vocabulary[high]
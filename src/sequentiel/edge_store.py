@@ -0,0 +1,632 @@
+"""
+Format binaire des fichiers intermédiaires (interactions, scores de similarité,
+réseaux pondérés) : vocabulaire de protéines par espèce et tableaux d'arêtes.
+
+Un jeu d'arêtes est un dossier <nom>.edges :
+    meta.json             vocabulaire utilisé, colonnes, nombre d'arêtes
+    src.npy, dst.npy      extrémités (int32, codes dans le vocabulaire)
+    column_<nom>.npy      une colonne par score (float32 ; int32 pour les comptes)
+Le vocabulaire d'une espèce (vocabulary/proteins_<espèce>.npy, à côté des
+dossiers interactions, autres, weighted_...) est commun à toutes les étapes et ne
+fait que croître : un code attribué ne change jamais, les fichiers déjà écrits
+restent valides quand une étape ajoute des protéines. Les tableaux sont ouverts
+en mémoire projetée (mmap) ; les identifiants ne sont décodés qu'à l'export.
+
+Le chemin binaire d'un fichier texte est son jumeau X.txt -> X.edges (les
+autres extensions sont conservées : X.temp -> X.temp.edges). Les lecteurs
+prennent le jumeau binaire s'il existe et n'est pas plus ancien que le texte ;
+l'export TSV reste disponible pour les sorties finales (write_edges(tsv=True),
+ou `python edge_store.py export <X.edges> [sortie.txt]`).
+
+Les réseaux plus grands que la mémoire se lisent par blocs (iter_edges,
+iter_edge_blocks) et s'écrivent par blocs (EdgeSetWriter).
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from edge_keys import pack_pairs
+
+EDGE_SUFFIX = ".edges"
+FORMAT_VERSION = 1
+
+# Écriture des intermédiaires : binaire, et TSV en plus si EXPORT_TSV
+WRITE_BINARY = True
+EXPORT_TSV = False
+
+# Dossier des vocabulaires (None : <dossier parent des données>/vocabulary)
+VOCABULARY_DIR: Optional[Path] = None
+
+SPECIES_ALIASES = {
+    'humain': ('humain', 'human', '9606'),
+    'levure': ('levure', 'yeast', '4932', '559292'),
+}
+
+LOCK_TIMEOUT = 60.0
+
+
+def binary_path(path) -> Path:
+    """Jumeau binaire d'un fichier texte (X.txt -> X.edges, X.temp -> X.temp.edges)"""
+    path = Path(path)
+    if path.suffix == EDGE_SUFFIX:
+        return path
+    if path.suffix == ".txt":
+        return path.with_suffix(EDGE_SUFFIX)
+    return path.with_name(path.name + EDGE_SUFFIX)
+
+
+def text_path(path) -> Path:
+    """Fichier texte correspondant à un jeu binaire (inverse de binary_path)"""
+    path = Path(path)
+    if path.suffix != EDGE_SUFFIX:
+        return path
+    stem = path.with_suffix('')
+    return stem if stem.suffix else stem.with_suffix(".txt")
+
+
+def is_edge_set(path) -> bool:
+    return (Path(path) / "meta.json").is_file()
+
+
+def resolve_edges(path) -> Path:
+    """
+    Fichier à lire pour un réseau : le jeu binaire s'il existe et n'est pas plus
+    ancien que le texte, sinon le fichier texte.
+    """
+    path = Path(path)
+    binary, text = binary_path(path), text_path(path)
+    if not is_edge_set(binary):
+        return text
+    if text.exists() and text.stat().st_mtime > (binary / "meta.json").stat().st_mtime:
+        return text
+    return binary
+
+
+def edges_exist(path) -> bool:
+    """Le réseau existe sous forme binaire ou texte"""
+    return is_edge_set(binary_path(path)) or text_path(path).exists()
+
+
+def edges_mtime(path) -> float:
+    """Date de modification de la forme lue par resolve_edges (0 si absente)"""
+    resolved = resolve_edges(path)
+    marker = resolved / "meta.json" if resolved.suffix == EDGE_SUFFIX else resolved
+    return marker.stat().st_mtime if marker.exists() else 0.0
+
+
+def network_files(directory, pattern: str = "*") -> List[Path]:
+    """
+    Réseaux d'un dossier correspondant au motif (sans extension), une entrée par
+    réseau quelle que soit sa forme, désignée par son chemin texte.
+    """
+    directory = Path(directory)
+    found = {text_path(p) for p in directory.glob(pattern + EDGE_SUFFIX) if is_edge_set(p)}
+    found.update(p for p in directory.glob(pattern + ".txt") if p.is_file())
+    return sorted(found)
+
+
+def species_of(path) -> Optional[str]:
+    """Espèce d'un fichier d'après son nom (humain, levure), None si inconnue"""
+    name = Path(path).name.lower()
+    for species, aliases in SPECIES_ALIASES.items():
+        if any(alias in name for alias in aliases):
+            return species
+    return None
+
+
+def vocabulary_file(edges_path, species: Optional[str] = None) -> Path:
+    """Fichier du vocabulaire d'espèce utilisé pour un jeu d'arêtes"""
+    edges_path = Path(edges_path)
+    species = species or species_of(edges_path) or "commun"
+    directory = VOCABULARY_DIR or edges_path.parent.parent / "vocabulary"
+    return Path(directory) / f"proteins_{species}.npy"
+
+
+@contextmanager
+def _locked(path: Path, timeout: float = LOCK_TIMEOUT):
+    """Verrou inter-processus par fichier <path>.lock (les étapes tournent en parallèle)"""
+    lock = path.with_name(path.name + ".lock")
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    start = time.monotonic()
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                stale = time.time() - lock.stat().st_mtime > timeout
+            except FileNotFoundError:
+                continue
+            if stale:
+                lock.unlink(missing_ok=True)
+            elif time.monotonic() - start > timeout:
+                raise TimeoutError(f"Verrou occupé: {lock}")
+            time.sleep(0.05)
+    try:
+        os.close(fd)
+        yield
+    finally:
+        lock.unlink(missing_ok=True)
+
+
+class ProteinVocabulary:
+    """
+    Vocabulaire de protéines d'une espèce, en ajout seul : le code d'une
+    protéine est sa position dans le fichier.
+    """
+
+    _cache: Dict[Path, Tuple[Tuple[int, int], 'ProteinVocabulary']] = {}
+
+    def __init__(self, path: Optional[Path], ids: np.ndarray):
+        self.path = Path(path) if path is not None else None
+        self.ids = np.asarray(ids)
+        self._index: Optional[pd.Index] = None
+
+    @classmethod
+    def open(cls, path) -> 'ProteinVocabulary':
+        """Vocabulaire enregistré (vide s'il n'existe pas encore), mis en cache par processus"""
+        path = Path(path)
+        if not path.exists():
+            return cls(path, np.array([], dtype=str))
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = cls._cache.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        vocabulary = cls(path, np.load(path, mmap_mode='r'))
+        cls._cache[path] = (signature, vocabulary)
+        return vocabulary
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def index(self) -> pd.Index:
+        if self._index is None:
+            self._index = pd.Index(np.asarray(self.ids, dtype=object))
+        return self._index
+
+    def codes(self, ids: Iterable[str]) -> np.ndarray:
+        """Codes des identifiants (-1 si absents)"""
+        return self.index.get_indexer(np.asarray(ids, dtype=object)).astype(np.int32)
+
+    def extends(self, other: 'ProteinVocabulary') -> bool:
+        """Ce vocabulaire prolonge `other` : les codes de `other` y restent valides"""
+        if other is self or other.ids is self.ids:
+            return True
+        n = len(other)
+        return n <= len(self) and bool(np.array_equal(self.ids[:n], other.ids))
+
+    def extend(self, ids: Iterable[str]) -> 'ProteinVocabulary':
+        """
+        Ajoute au fichier les identifiants absents (sous verrou, écriture atomique)
+        et rend le vocabulaire à jour.
+        """
+        ids = pd.unique(np.asarray(ids, dtype=object))
+        if self.path is None:
+            new = ids[self.codes(ids) < 0]
+            return ProteinVocabulary(None, np.concatenate([self.ids, new.astype(str)]))
+
+        with _locked(self.path):
+            current = ProteinVocabulary.open(self.path)
+            new = ids[current.codes(ids) < 0]
+            if not len(new):
+                return current
+            merged = np.concatenate([np.asarray(current.ids), new.astype(str)])
+            tmp = self.path.with_name(f"{self.path.stem}.{os.getpid()}.tmp.npy")
+            np.save(tmp, merged)
+            os.replace(tmp, self.path)
+            return ProteinVocabulary.open(self.path)
+
+
+class EdgeSet:
+    """Arêtes codées sur un vocabulaire d'espèce, avec leurs colonnes de scores"""
+
+    def __init__(self, vocabulary: ProteinVocabulary, src: np.ndarray, dst: np.ndarray,
+                 columns: Optional[Dict[str, np.ndarray]] = None):
+        self.vocabulary = vocabulary
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, values in (columns or {}).items():
+            self.add_column(name, values)
+
+    def add_column(self, name: str, values: np.ndarray):
+        values = np.asarray(values)
+        if values.dtype.kind in 'iub':
+            values = values.astype(np.int32, copy=False)
+        else:
+            values = values.astype(np.float32, copy=False)
+        if len(values) != len(self.src):
+            raise ValueError(f"Colonne {name}: {len(values)} valeurs pour {len(self.src)} arêtes")
+        self.columns[name] = values
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, vocabulary: ProteinVocabulary,
+                   columns: Optional[Sequence[str]] = None) -> 'EdgeSet':
+        """
+        Code un DataFrame (deux premières colonnes : protéines) ; les protéines
+        absentes sont ajoutées au vocabulaire. Colonnes conservées : `columns`,
+        par défaut toutes les colonnes numériques.
+        """
+        protein_columns = list(frame.columns[:2])
+        frame = frame.dropna(subset=protein_columns)
+        protein1 = frame[protein_columns[0]].to_numpy(dtype=object)
+        protein2 = frame[protein_columns[1]].to_numpy(dtype=object)
+        vocabulary = vocabulary.extend(np.concatenate([protein1, protein2]))
+        if columns is None:
+            columns = [c for c in frame.columns[2:] if pd.api.types.is_numeric_dtype(frame[c])]
+        return cls(vocabulary, vocabulary.codes(protein1), vocabulary.codes(protein2),
+                   {name: frame[name].to_numpy() for name in columns})
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    def select(self, rows: np.ndarray) -> 'EdgeSet':
+        """Sous-ensemble des arêtes (masque ou positions), colonnes comprises"""
+        return EdgeSet(self.vocabulary, self.src[rows], self.dst[rows],
+                       {name: values[rows] for name, values in self.columns.items()})
+
+    @staticmethod
+    def concat(parts: Sequence['EdgeSet']) -> 'EdgeSet':
+        """
+        Concatène des jeux d'arêtes d'un même vocabulaire d'espèce (le plus long,
+        qui prolonge les autres) ; les colonnes absentes d'un jeu valent NaN.
+        """
+        vocabulary = max((part.vocabulary for part in parts), key=len)
+        if not all(vocabulary.extends(part.vocabulary) for part in parts):
+            raise ValueError("Jeux d'arêtes codés sur des vocabulaires différents")
+        names = list(dict.fromkeys(name for part in parts for name in part.columns))
+        columns = {}
+        for name in names:
+            dtype = next(part.columns[name].dtype for part in parts if name in part.columns)
+            fill = np.nan if dtype.kind == 'f' else -1
+            columns[name] = np.concatenate([
+                np.asarray(part.columns[name]) if name in part.columns
+                else np.full(len(part), fill, dtype=dtype) for part in parts])
+        return EdgeSet(vocabulary, np.concatenate([part.src for part in parts]),
+                       np.concatenate([part.dst for part in parts]), columns)
+
+    def keys(self) -> np.ndarray:
+        """Clés uint64 des arêtes sur le vocabulaire d'espèce (voir edge_keys.py)"""
+        return pack_pairs(self.src, self.dst)
+
+    def proteins(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Identifiants (protein1, protein2) décodés"""
+        return self.vocabulary.ids[self.src], self.vocabulary.ids[self.dst]
+
+    def nodes(self) -> np.ndarray:
+        """Codes (d'espèce) des protéines présentes dans les arêtes"""
+        return np.unique(np.concatenate([self.src, self.dst]))
+
+    def compact(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Recodage sur le vocabulaire trié des seules protéines du réseau (celui de
+        edge_keys.build_vocabulary), par table de correspondance entière.
+
+        Returns:
+            (vocabulaire, codes protein1, codes protein2)
+        """
+        nodes = self.nodes()
+        ids = np.asarray(self.vocabulary.ids[nodes], dtype=str)
+        order = np.argsort(ids, kind='stable')
+        lookup = np.full(len(self.vocabulary), -1, dtype=np.int32)
+        lookup[nodes[order]] = np.arange(len(nodes), dtype=np.int32)
+        return ids[order], lookup[self.src], lookup[self.dst]
+
+    def codes_on(self, vocabulary: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Codes des extrémités dans un autre vocabulaire (-1 si absentes). Seul le
+        vocabulaire est recherché par identifiant ; les arêtes passent par une
+        table de correspondance entière.
+        """
+        vocabulary = np.asarray(vocabulary)
+        lookup = np.full(len(self.vocabulary), -1, dtype=np.int32)
+        species_codes = self.vocabulary.codes(vocabulary)
+        found = species_codes >= 0
+        lookup[species_codes[found]] = np.flatnonzero(found).astype(np.int32)
+        return lookup[self.src], lookup[self.dst]
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """DataFrame (protein1, protein2, colonnes...) ; colonnes None : toutes"""
+        protein1, protein2 = self.proteins()
+        data = {'protein1': protein1, 'protein2': protein2}
+        for name in (self.columns if columns is None else columns):
+            data[name] = np.asarray(self.columns[name])
+        return pd.DataFrame(data)
+
+    def save(self, path) -> Path:
+        """Écrit le dossier <path> (remplacement atomique d'une version précédente)"""
+        path = binary_path(path)
+        if self.vocabulary.path is None:
+            raise ValueError("Vocabulaire sans fichier: impossible de sauvegarder les arêtes")
+        tmp = _temporary_dir(path)
+        np.save(tmp / "src.npy", self.src)
+        np.save(tmp / "dst.npy", self.dst)
+        for name, values in self.columns.items():
+            np.save(tmp / f"column_{name}.npy", values)
+        _write_meta(tmp, path, self.vocabulary, len(self), list(self.columns))
+        return _install(tmp, path)
+
+    @classmethod
+    def load(cls, path, columns: Optional[Sequence[str]] = None, mmap: bool = True) -> 'EdgeSet':
+        """Ouvre un jeu d'arêtes (tableaux en mémoire projetée si mmap)"""
+        path = binary_path(path)
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+        if meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f"{path}: format {meta.get('format')} non supporté")
+        vocabulary = ProteinVocabulary.open(os.path.normpath(path / meta['vocabulary']))
+        if len(vocabulary) < meta['n_proteins']:
+            raise ValueError(f"{path}: vocabulaire {vocabulary.path} absent ou tronqué "
+                             f"({len(vocabulary)} < {meta['n_proteins']} protéines)")
+        mode = 'r' if mmap else None
+        names = meta['columns'] if columns is None else columns
+        missing = [name for name in names if name not in meta['columns']]
+        if missing:
+            raise KeyError(f"{path}: colonnes absentes: {', '.join(missing)}")
+        return cls(vocabulary,
+                   np.load(path / "src.npy", mmap_mode=mode),
+                   np.load(path / "dst.npy", mmap_mode=mode),
+                   {name: np.load(path / f"column_{name}.npy", mmap_mode=mode) for name in names})
+
+
+def _temporary_dir(path: Path) -> Path:
+    """Dossier d'écriture d'un jeu, installé par _install"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    return tmp
+
+
+def _write_meta(tmp: Path, path: Path, vocabulary: ProteinVocabulary, n_edges: int,
+                columns: List[str]):
+    meta = {
+        'format': FORMAT_VERSION,
+        'vocabulary': os.path.relpath(vocabulary.path, path),
+        'n_proteins': len(vocabulary),
+        'n_edges': n_edges,
+        'columns': columns,
+    }
+    with open(tmp / "meta.json", 'w') as f:
+        json.dump(meta, f, indent=1)
+
+
+def _install(tmp: Path, path: Path) -> Path:
+    """Remplace atomiquement une version précédente du jeu par le dossier écrit"""
+    old = path.with_name(f"{path.name}.{os.getpid()}.old")
+    if path.exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+class EdgeSetWriter:
+    """
+    Écriture d'un jeu d'arêtes par blocs, pour les réseaux qui ne tiennent pas
+    en mémoire. Chaque bloc (DataFrame, ou EdgeSet codé sur le vocabulaire
+    d'espèce) est ajouté aux tableaux bruts d'un dossier temporaire ; close()
+    écrit les en-têtes .npy et meta.json puis installe le jeu comme EdgeSet.save.
+    Le TSV (tsv, défaut EXPORT_TSV) est écrit au fil des blocs.
+
+        with EdgeSetWriter(path) as writer:
+            for block in blocks:
+                writer.write(block)
+    """
+
+    def __init__(self, path, species: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+                 tsv: Optional[bool] = None, header: bool = True, float_format: Optional[str] = None):
+        self.path = binary_path(path)
+        self.vocabulary = ProteinVocabulary.open(vocabulary_file(text_path(path), species))
+        self.columns = list(columns) if columns is not None else None
+        self.tsv = EXPORT_TSV if tsv is None else tsv
+        self.header, self.float_format = header, float_format
+        self.n_edges = 0
+        self._dtypes: Dict[str, np.dtype] = {}
+        self._tmp = _temporary_dir(self.path)
+        if self.tsv:
+            text_path(path).unlink(missing_ok=True)
+
+    def __enter__(self) -> 'EdgeSetWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def write(self, block: Union[pd.DataFrame, EdgeSet]):
+        if isinstance(block, pd.DataFrame):
+            frame = block
+            block = EdgeSet.from_frame(frame, self.vocabulary, self.columns)
+        else:
+            if self.tsv:
+                frame = block.to_frame(self.columns)
+            if os.path.abspath(block.vocabulary.path) != os.path.abspath(self.vocabulary.path):
+                # Bloc codé sur le vocabulaire d'un autre dossier : recodage par identifiant
+                block = EdgeSet.from_frame(block.to_frame(self.columns), self.vocabulary, self.columns)
+        if len(block.vocabulary) > len(self.vocabulary):
+            self.vocabulary = block.vocabulary
+        if self.columns is None:
+            self.columns = list(block.columns)
+        arrays = {'src': block.src, 'dst': block.dst,
+                  **{f"column_{name}": block.columns[name] for name in self.columns}}
+        for name, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            dtype = self._dtypes.setdefault(name, values.dtype)
+            with open(self._tmp / f"{name}.bin", 'ab') as f:
+                f.write(values.astype(dtype, copy=False).tobytes())
+        if self.tsv:
+            text = text_path(self.path)
+            text.parent.mkdir(parents=True, exist_ok=True)
+            frame.to_csv(text, sep='\t', index=False, mode='a', float_format=self.float_format,
+                         header=self.header and self.n_edges == 0)
+        self.n_edges += len(block)
+
+    def close(self) -> Path:
+        """Écrit les tableaux .npy (en-tête puis données brutes) et installe le jeu"""
+        names = ['src', 'dst'] + [f"column_{name}" for name in self.columns or []]
+        for name in names:
+            dtype = self._dtypes.get(name, np.dtype(np.int32 if name in ('src', 'dst') else np.float32))
+            raw = self._tmp / f"{name}.bin"
+            with open(self._tmp / f"{name}.npy", 'wb') as f:
+                np.lib.format.write_array_header_1_0(f, {
+                    'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+                    'shape': (self.n_edges,)})
+                if raw.exists():
+                    with open(raw, 'rb') as data:
+                        shutil.copyfileobj(data, f, 1 << 24)
+            raw.unlink(missing_ok=True)
+        vocabulary = ProteinVocabulary.open(self.vocabulary.path)
+        _write_meta(self._tmp, self.path, vocabulary, self.n_edges, list(self.columns or []))
+        return _install(self._tmp, self.path)
+
+
+def load_edges(path, columns: Optional[Sequence[str]] = None) -> Optional[EdgeSet]:
+    """Jeu d'arêtes binaire d'un réseau, None s'il n'existe que sous forme texte"""
+    resolved = resolve_edges(path)
+    if resolved.suffix != EDGE_SUFFIX:
+        return None
+    return EdgeSet.load(resolved, columns)
+
+
+def as_edge_set(path, species: Optional[str] = None, **read_csv_options) -> EdgeSet:
+    """
+    Jeu d'arêtes d'un réseau quelle que soit sa forme : le jeu binaire, ou le
+    fichier texte (lu par read_csv_options) codé sur le vocabulaire d'espèce.
+    """
+    edges = load_edges(path)
+    if edges is not None:
+        return edges
+    frame = pd.read_csv(text_path(path), **{'sep': '\t', **read_csv_options})
+    vocabulary = ProteinVocabulary.open(vocabulary_file(text_path(path), species))
+    return EdgeSet.from_frame(frame, vocabulary)
+
+
+def read_edges(path, columns: Optional[Sequence[str]] = None, **read_csv_options) -> pd.DataFrame:
+    """
+    DataFrame d'un réseau : depuis le jeu binaire (protein1, protein2, colonnes)
+    s'il existe, sinon pd.read_csv(path, **read_csv_options) (séparateur par
+    défaut : tabulation).
+    """
+    edges = load_edges(path, columns)
+    if edges is not None:
+        return edges.to_frame()
+    return pd.read_csv(text_path(path), **{'sep': '\t', **read_csv_options})
+
+
+def edge_count(path) -> int:
+    """Nombre d'arêtes d'un réseau sans le charger (lignes du fichier texte, en-tête compris)"""
+    resolved = resolve_edges(path)
+    if resolved.suffix == EDGE_SUFFIX:
+        with open(resolved / "meta.json") as f:
+            return json.load(f)['n_edges']
+    lines, last = 0, b'\n'
+    with open(resolved, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 24), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    return lines + (last != b'\n')
+
+
+def iter_edge_blocks(path, chunk_rows: int, species: Optional[str] = None,
+                     columns: Optional[Sequence[str]] = None,
+                     **read_csv_options) -> Iterator[EdgeSet]:
+    """
+    Blocs d'au plus chunk_rows arêtes codées sur le vocabulaire d'espèce :
+    tranches du jeu binaire (mémoire projetée), ou blocs du fichier texte codés
+    au fil de la lecture (les protéines nouvelles sont ajoutées au vocabulaire).
+    """
+    edges = load_edges(path, columns)
+    if edges is not None:
+        for start in range(0, len(edges), chunk_rows):
+            yield edges.select(slice(start, start + chunk_rows))
+        return
+    vocabulary = ProteinVocabulary.open(vocabulary_file(text_path(path), species))
+    reader = pd.read_csv(text_path(path), chunksize=chunk_rows, **{'sep': '\t', **read_csv_options})
+    with reader:
+        for frame in reader:
+            block = EdgeSet.from_frame(frame, vocabulary, columns)
+            vocabulary = block.vocabulary
+            yield block
+
+
+def iter_edges(path, chunk_rows: int, columns: Optional[Sequence[str]] = None,
+               **read_csv_options) -> Iterator[pd.DataFrame]:
+    """read_edges par blocs d'au plus chunk_rows lignes"""
+    edges = load_edges(path, columns)
+    if edges is not None:
+        for start in range(0, len(edges), chunk_rows):
+            yield edges.select(slice(start, start + chunk_rows)).to_frame()
+        return
+    reader = pd.read_csv(text_path(path), chunksize=chunk_rows, **{'sep': '\t', **read_csv_options})
+    with reader:
+        yield from reader
+
+
+def write_edges(frame: pd.DataFrame, path, species: Optional[str] = None,
+                columns: Optional[Sequence[str]] = None, tsv: Optional[bool] = None,
+                header: bool = True, float_format: Optional[str] = None) -> Path:
+    """
+    Sauvegarde un réseau (deux premières colonnes : protéines) : jeu binaire
+    jumeau de `path` si WRITE_BINARY, et TSV à `path` si tsv (défaut EXPORT_TSV)
+    ou si l'écriture binaire est désactivée.
+
+    Returns:
+        chemin du jeu binaire, ou du TSV s'il est le seul écrit
+    """
+    path = Path(path)
+    binary = WRITE_BINARY or path.suffix == EDGE_SUFFIX
+    tsv = (EXPORT_TSV if tsv is None else tsv) or not binary
+    if tsv:
+        text = text_path(path)
+        text.parent.mkdir(parents=True, exist_ok=True)
+        frame.to_csv(text, sep='\t', index=False, header=header, float_format=float_format)
+    if not binary:
+        return text_path(path)
+    vocabulary = ProteinVocabulary.open(vocabulary_file(text_path(path), species))
+    return EdgeSet.from_frame(frame, vocabulary, columns).save(path)
+
+
+def save_edges(edges: EdgeSet, path, tsv: Optional[bool] = None, header: bool = True,
+               float_format: Optional[str] = None) -> Path:
+    """Sauvegarde un jeu déjà codé (binaire, et TSV décodé si tsv ou EXPORT_TSV)"""
+    if EXPORT_TSV if tsv is None else tsv:
+        text = text_path(path)
+        text.parent.mkdir(parents=True, exist_ok=True)
+        edges.to_frame().to_csv(text, sep='\t', index=False, header=header,
+                                float_format=float_format)
+    return edges.save(path)
+
+
+def export_tsv(path, output=None, header: bool = True,
+               float_format: Optional[str] = None) -> Path:
+    """Exporte un jeu binaire en TSV (sortie par défaut : son chemin texte)"""
+    output = Path(output) if output is not None else text_path(path)
+    EdgeSet.load(path).to_frame().to_csv(output, sep='\t', index=False, header=header,
+                                         float_format=float_format)
+    return output
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != "export":
+        print("Usage: python edge_store.py export <réseau.edges> [sortie.txt]")
+        return
+    output = export_tsv(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"Exporté: {output}")
+
+
+if __name__ == "__main__":
+    main()
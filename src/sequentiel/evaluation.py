@@ -1,14 +1,29 @@
 import numpy as np
 from collections import defaultdict
 
+def resolve_graph(graph):
+    """
+    Graphe sous la forme {nœud: {voisins: poids}} attendue par les métriques.
+    Un dictionnaire est renvoyé tel quel ; un CSRGraph (csr_graph.py) ou un
+    handle de graphe en mémoire partagée (shared_graph.py, attaché sans
+    copie) sont vus au travers de leur adjacency_view().
+    """
+    if hasattr(graph, 'attach'):
+        graph = graph.attach()
+    if hasattr(graph, 'adjacency_view'):
+        graph = graph.adjacency_view()
+    return graph
+
 # Fonctions pour évaluer un seul cluster
 def cohesiveness(cluster, graph):
     """
     Calcule la cohésion d'un cluster.
     :param cluster: Ensemble des nœuds du cluster
-    :param graph: Graphe PPI sous forme de dictionnaire {nœud: {voisins: poids}}
+    :param graph: Graphe PPI sous forme de dictionnaire {nœud: {voisins: poids}},
+                  CSRGraph ou handle de graphe partagé (voir resolve_graph)
     :return: Score de cohésion
     """
+    graph = resolve_graph(graph)
     W_in = 0
     W_out = 0
     for node in cluster:
@@ -26,6 +41,7 @@ def density(cluster, graph):
     :param graph: Graphe PPI
     :return: Score de densité
     """
+    graph = resolve_graph(graph)
     W_in = 0
     for node in cluster:
         for neighbor, weight in graph.get(node, {}).items():
@@ -41,6 +57,7 @@ def AIEW(cluster, graph):
     :param graph: Graphe PPI
     :return: Score AIEW
     """
+    graph = resolve_graph(graph)
     W_in = 0
     E_C = 0
     for node in cluster:
@@ -57,6 +74,7 @@ def ABEW(cluster, graph):
     :param graph: Graphe PPI
     :return: Score ABEW
     """
+    graph = resolve_graph(graph)
     W_out = 0
     BE_C = 0
     for node in cluster:
@@ -73,6 +91,7 @@ def AWM(cluster, graph):
     :param graph: Graphe PPI
     :return: Score AWM
     """
+    graph = resolve_graph(graph)
     aiew = AIEW(cluster, graph)
     abew = ABEW(cluster, graph)
     return aiew / (aiew + abew) if (aiew + abew) > 0 else 0
@@ -84,6 +103,7 @@ def FF(cluster, graph):
     :param graph: Graphe PPI
     :return: Score FF combiné
     """
+    graph = resolve_graph(graph)
     return (
         cohesiveness(cluster, graph) +
         density(cluster, graph) +
@@ -100,6 +120,7 @@ def FS_fitness(individual, graph):
     :param graph: Graphe PPI
     :return: Score FS_fitness
     """
+    graph = resolve_graph(graph)
     return sum(FF(cluster, graph) for cluster in individual)
 
 # Fonction d'optimisation locale pour un cluster
@@ -111,6 +132,7 @@ def local_optimization(cluster, graph, max_iter=20):
     :param max_iter: Nombre maximum d'itérations
     :return: Cluster optimisé
     """
+    graph = resolve_graph(graph)
     optimized_cluster = set(cluster)
     changed = True
     iteration = 0
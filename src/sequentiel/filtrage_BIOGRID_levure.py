@@ -1,111 +1,97 @@
+import numpy as np
 import pandas as pd
-import re
 from pathlib import Path
 
-def extract_uniprot(alt_ids):
-    """Extract UniProt IDs from alternative IDs field"""
-    if pd.isna(alt_ids): 
-        return None
-    alt_ids = str(alt_ids)
-    patterns = [
-        r'uniprot/swiss[\W-]?prot:([A-Z0-9]{6,10})',
-        r'uniprot:([A-Z0-9]{6,10})',
-        r'swiss[\W-]?prot:([A-Z0-9]{6,10})',
-        r'([A-Z0-9]{6,10})\.\d'
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, alt_ids, re.IGNORECASE)
-        if match:
-            return match.group(1).upper()
-    return None
+from edge_store import write_edges
+from instrumentation import count, traced
+from psimi import (InteractionBatch, read_interactions, taxon_mask, resolved_mask, distinct_mask,
+                   term_scores, unique_pairs, descending_order, threshold_count)
 
-def process_biogrid_high_confidence():
+UNIPROT_PATTERNS = [
+    r'uniprot/swiss[\W-]?prot:([A-Z0-9]{6,10})',
+    r'uniprot:([A-Z0-9]{6,10})',
+    r'swiss[\W-]?prot:([A-Z0-9]{6,10})',
+    r'([A-Z0-9]{6,10})\.\d'
+]
+
+# High-confidence scoring system (less strict than ultra-strict version)
+METHOD_SCORES = {
+    'x-ray crystallography': 10,
+    'electron microscopy': 8,
+    'affinity chromatography': 6,
+    'coimmunoprecipitation': 4,
+    'two hybrid': 2,
+    'pull down': 3,
+    'mass spectrometry': 2
+}
+
+TYPE_SCORES = {
+    'direct interaction': 6,
+    'physical association': 3,
+    'complex': 4
+}
+
+TARGET_COUNT = 300000
+
+# File paths
+INPUT_FILE = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\raw data\Protein_Interactions\BIOGRID-ORGANISM-Saccharomyces_cerevisiae.txt")
+OUTPUT_FILE = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\BIOGRID_levure.txt")
+
+
+@traced("lecture")
+def score_biogrid_interactions(input_file=INPUT_FILE):
+    """
+    Streaming read and scoring of yeast interactions with valid, distinct UniProt IDs.
+
+    Returns:
+        (number of yeast interactions, clean interactions, total score per interaction)
+    """
+    n_yeast = 0
+    kept = []
+    for batch in read_interactions(input_file, 'mitab25', patterns=UNIPROT_PATTERNS, upper=True):
+        count(rows_in=len(batch))
+        batch = batch.select(taxon_mask(batch, '559292'))
+        n_yeast += len(batch)
+        kept.append(batch.select(resolved_mask(batch) & distinct_mask(batch)))
+    clean = InteractionBatch.concat(kept)
+    count(rows_out=len(clean))
+
+    total_score = (
+        term_scores(clean['method'], METHOD_SCORES, skip_psi_mi=True) * 3 +
+        term_scores(clean['type'], TYPE_SCORES, skip_psi_mi=True) * 2 +
+        clean['n_publications']
+    ).astype(np.float64)
+    return n_yeast, clean, total_score
+
+
+@traced("filtrage_BIOGRID_levure")
+def process_biogrid_high_confidence(input_file=INPUT_FILE, output_file=OUTPUT_FILE,
+                                    target_count=TARGET_COUNT):
     """Process BioGRID data to get ~50,000 high-confidence interactions"""
-    # File paths
-    input_file = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\raw data\Protein_Interactions\BIOGRID-ORGANISM-Saccharomyces_cerevisiae.txt")
-    output_file = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\BIOGRID_levure.txt")
-    
-    # Load data
+    # 1-4. Streaming read: Saccharomyces cerevisiae only, scored interactions
     try:
-        df = pd.read_csv(input_file, sep='\t', comment='#', header=None, dtype=str)
-        df.columns = [
-            'ID_A', 'ID_B', 'Alt_IDs_A', 'Alt_IDs_B', 
-            'Aliases_A', 'Aliases_B', 'Method', 'Author',
-            'PubIDs', 'TaxID_A', 'TaxID_B', 'IntType',
-            'SourceDB', 'IntIDs', 'Confidence'
-        ]
+        n_yeast, clean, total_score = score_biogrid_interactions(input_file)
+        count(rows_in=len(clean))
     except Exception as e:
         print(f"Error loading file: {e}")
         return
     
-    # 1. Filter for Saccharomyces cerevisiae
-    yeast_df = df[(df['TaxID_A'] == 'taxid:559292') & (df['TaxID_B'] == 'taxid:559292')].copy()
-    
-    # 2. Extract UniProt IDs
-    yeast_df['Protein1'] = yeast_df['Alt_IDs_A'].apply(extract_uniprot)
-    yeast_df['Protein2'] = yeast_df['Alt_IDs_B'].apply(extract_uniprot)
-    
-    # 3. Clean data
-    clean_df = yeast_df.dropna(subset=['Protein1', 'Protein2'])
-    clean_df = clean_df[clean_df['Protein1'] != clean_df['Protein2']].copy()
-    
-    # 4. High-confidence scoring system (less strict than ultra-strict version)
-    method_scores = {
-        'x-ray crystallography': 10,
-        'electron microscopy': 8,
-        'affinity chromatography': 6,
-        'coimmunoprecipitation': 4,
-        'two hybrid': 2,
-        'pull down': 3,
-        'mass spectrometry': 2
-    }
-    
-    type_scores = {
-        'direct interaction': 6,
-        'physical association': 3,
-        'complex': 4
-    }
-    
-    clean_df['Pub_Count'] = clean_df['PubIDs'].str.count(r'\|').add(1).fillna(1)
-    
-    clean_df['Method_Score'] = clean_df['Method'].apply(
-        lambda x: max([method_scores.get(method.lower(), 1)
-                      for method in str(x).split('|') 
-                      if 'psi-mi' not in method.lower()], default=1)
-    )
-    
-    clean_df['Type_Score'] = clean_df['IntType'].apply(
-        lambda x: max([type_scores.get(typ.lower(), 1)
-                      for typ in str(x).split('|') 
-                      if 'psi-mi' not in typ.lower()], default=1)
-    )
-    
-    clean_df['Total_Score'] = (
-        clean_df['Method_Score'] * 3 +
-        clean_df['Type_Score'] * 2 +
-        clean_df['Pub_Count']
-    )
-    
-    # 5. Remove duplicates keeping highest scores
-    clean_df['SortedPair'] = clean_df.apply(
-        lambda x: tuple(sorted([x['Protein1'], x['Protein2']])), axis=1
-    )
-    
-    non_redundant = clean_df.sort_values('Total_Score', ascending=False).drop_duplicates(subset=['SortedPair'])
+    # 5. Remove duplicates keeping highest scores (packed pair keys)
+    rows = unique_pairs(clean['protein_a'], clean['protein_b'], order=descending_order(total_score))
+    non_redundant = pd.DataFrame({
+        'Protein1': clean['protein_a'][rows],
+        'Protein2': clean['protein_b'][rows],
+        'Total_Score': total_score[rows]
+    })
     
-    # 6. Dynamic threshold to get ~50,000 interactions
-    target_count = 300000
+    # 6. Dynamic threshold: lowest score keeping at most target_count interactions
     if len(non_redundant) > target_count:
-        # Find score threshold that gives us ~50,000 interactions
-        thresholds = sorted(non_redundant['Total_Score'].unique(), reverse=True)
-        for threshold in thresholds:
-            filtered = non_redundant[non_redundant['Total_Score'] >= threshold]
-            if len(filtered) <= target_count:
-                break
+        n_kept, _ = threshold_count(non_redundant['Total_Score'].values, target_count)
         
         # If we're still too far from target, take top N
-        if len(filtered) < target_count * 0.8 or len(filtered) > target_count * 1.2:
-            filtered = non_redundant.head(target_count)
+        if n_kept < target_count * 0.8 or n_kept > target_count * 1.2:
+            n_kept = target_count
+        filtered = non_redundant.head(n_kept)
     else:
         filtered = non_redundant
         print(f"Warning: Only {len(non_redundant)} interactions available")
@@ -114,8 +100,8 @@ def process_biogrid_high_confidence():
     unique_proteins = pd.unique(filtered[['Protein1', 'Protein2']].values.ravel('K'))
     
     print(f"\nRésultats finaux (haute confiance):")
-    print(f"- Interactions levures totales : {len(yeast_df):,}")
-    print(f"- Interactions avec UniProt valides : {len(clean_df):,}")
+    print(f"- Interactions levures totales : {n_yeast:,}")
+    print(f"- Interactions avec UniProt valides : {len(clean):,}")
     print(f"- Interactions non-redondantes : {len(non_redundant):,}")
     print(f"- Interactions sélectionnées : {len(filtered):,}")
     print(f"- Protéines uniques : {len(unique_proteins):,}")
@@ -124,11 +110,11 @@ def process_biogrid_high_confidence():
     print(f"- Score moyen : {filtered['Total_Score'].mean():.1f}")
     
     # 8. Save
+    count(rows_out=len(filtered))
     try:
-        filtered[['Protein1', 'Protein2']].to_csv(
-            output_file, 
-            sep='\t', 
-            index=False, 
+        write_edges(
+            filtered[['Protein1', 'Protein2']],
+            output_file,
             header=False
         )
         print(f"\nDonnées sauvegardées dans : {output_file}")
@@ -136,4 +122,4 @@ def process_biogrid_high_confidence():
         print(f"Erreur lors de la sauvegarde : {e}")
 
 if __name__ == "__main__":
-    process_biogrid_high_confidence()
\ No newline at end of file
+    process_biogrid_high_confidence()
@@ -1,89 +1,70 @@
-import xml.etree.ElementTree as ET
 from pathlib import Path
 
-def process_dip_interactions():
-    # Configuration des chemins
-    input_file = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\raw data\Protein_Interactions\DIP_Interactions.mif25")
-    output_file = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\DIP_levure.txt")
-    
-    NS = {'mif': 'http://psi.hupo.org/mi/mif'}
-    tree = ET.parse(input_file)
-    root = tree.getroot()
+import numpy as np
+import pandas as pd
 
-    # 1. Extraction des protéines avec vérification
-    id_to_protein = {}
-    for interactor in root.findall(".//mif:interactor", NS):
-        interactor_id = interactor.get("id")
-        if not interactor_id:
-            continue
-            
-        uniprot_ref = interactor.find(".//mif:xref/mif:secondaryRef[@db='uniprot knowledge base']", NS)
-        refseq_ref = interactor.find(".//mif:xref/mif:secondaryRef[@db='refseq']", NS)
-        
-        protein_id = None
-        if uniprot_ref is not None:
-            protein_id = uniprot_ref.get("id")
-        elif refseq_ref is not None:
-            protein_id = refseq_ref.get("id")
-        else:
-            short_label = interactor.find(".//mif:names/mif:shortLabel", NS)
-            protein_id = short_label.text if short_label is not None else None
-        
-        if protein_id:
-            id_to_protein[interactor_id] = protein_id
+from edge_store import write_edges
+from instrumentation import count, traced
+from psimi import (InteractionBatch, read_interactions, resolved_mask, distinct_mask,
+                   confidence_mask, unique_pairs)
 
-    # 2. Extraction des interactions avec contrôle qualité
-    unique_interactions = set()
-    protein_set = set()  # Pour stocker les protéines uniques
-    
-    for interaction in root.findall(".//mif:interaction", NS):
-        participants = interaction.findall(".//mif:participant/mif:interactorRef", NS)
-        
-        if len(participants) != 2:
-            continue
-            
-        id1, id2 = participants[0].text, participants[1].text
-        
+MIN_SCORE = 0.8
+
+# Identifiant protéique : UniProt, sinon RefSeq, sinon shortLabel de l'interacteur
+ID_DBS = ('uniprot knowledge base', 'refseq')
+
+# Configuration des chemins
+INPUT_FILE = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\raw data\Protein_Interactions\DIP_Interactions.mif25")
+OUTPUT_FILE = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\DIP_levure.txt")
+
+
+@traced("lecture")
+def load_dip_interactions(input_file: Path = INPUT_FILE, min_score: float = None):
+    """
+    Lecture en flux (iterparse) des interactions binaires avec contrôle qualité.
+
+    Returns:
+        (interactions retenues, ensemble des protéines avant le filtre de score) ;
+        sans min_score, toutes les interactions valides avec leur confiance
+    """
+    kept = []
+    protein_batches = []
+    for batch in read_interactions(input_file, 'mif25', id_dbs=ID_DBS, label_fallback=True):
+        count(rows_in=len(batch))
         # Vérification que les deux protéines existent et sont différentes
-        if (id1 not in id_to_protein or 
-            id2 not in id_to_protein or 
-            id_to_protein[id1] == id_to_protein[id2]):
-            continue
-            
-        prot1, prot2 = id_to_protein[id1], id_to_protein[id2]
-        
-        # Ajout aux protéines uniques
-        protein_set.add(prot1)
-        protein_set.add(prot2)
-        
-        # Vérification du score
-        score_element = interaction.find(".//mif:confidence/mif:value", NS)
-        if score_element is not None:
-            try:
-                score = float(score_element.text)
-                if score <= 0.8:
-                    continue
-            except (ValueError, TypeError):
-                continue
-                
-        # Ajout sous forme triée pour éviter les doublons A-B vs B-A
-        sorted_interaction = tuple(sorted((prot1, prot2)))
-        unique_interactions.add(sorted_interaction)
+        batch = batch.select(resolved_mask(batch) & distinct_mask(batch))
+        protein_batches.append(pd.unique(np.concatenate([batch['protein_a'], batch['protein_b']])))
+        # Vérification du score (absent : accepté, illisible : rejeté)
+        if min_score is not None:
+            batch = batch.select(confidence_mask(batch, min_score, strict=True))
+        kept.append(batch)
+        count(rows_out=len(batch))
+    return InteractionBatch.concat(kept), set().union(*protein_batches)
+
+
+@traced("filtrage_DIP")
+def process_dip_interactions(input_file: Path = INPUT_FILE, output_file: Path = OUTPUT_FILE):
+    # 1-2. Interactions valides au-dessus du seuil de confiance
+    interactions, protein_set = load_dip_interactions(input_file, MIN_SCORE)
+
+    # Paires triées pour éviter les doublons A-B vs B-A (ordre du fichier)
+    rows = unique_pairs(interactions['protein_a'], interactions['protein_b'])
+    a, b = interactions['protein_a'][rows], interactions['protein_b'][rows]
+    forward = a < b
+    prot1, prot2 = np.where(forward, a, b), np.where(forward, b, a)
 
     # 3. Sauvegarde
-    with open(output_file, "w") as f:
-        f.write("Protein1\tProtein2\n")
-        for prot1, prot2 in unique_interactions:
-            f.write(f"{prot1}\t{prot2}\n")
+    count(rows_in=len(interactions), rows_out=len(rows))
+    write_edges(pd.DataFrame({'Protein1': prot1, 'Protein2': prot2}), output_file)
 
     # 4. Calcul et affichage des statistiques
     num_unique_proteins = len(protein_set)
-    num_unique_interactions = len(unique_interactions)
-    
+    num_unique_interactions = len(rows)
+
     print("\nRésultats du traitement:")
     print(f"- Protéines uniques: {num_unique_proteins}")
     print(f"- Interactions uniques: {num_unique_interactions}")
     print(f"Fichier sauvegardé: {output_file}")
 
 if __name__ == "__main__":
-    process_dip_interactions()
\ No newline at end of file
+    process_dip_interactions()
@@ -1,9 +1,14 @@
-from typing import Dict, List, Set
+from typing import Optional, Tuple
 import pandas as pd
 from pathlib import Path
-from collections import defaultdict
 import numpy as np
-from tqdm import tqdm
+from scipy import sparse
+
+from compressed_input import input_stream
+from edge_keys import pack_pairs, unique_keys, unpack_pairs
+from edge_store import EdgeSetWriter, edge_count, edges_exist, iter_edges, read_edges, write_edges
+from instrumentation import count, traced
+from memory_budget import Estimate, plan
 
 # Configuration des chemins
 BASE_DIR = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\Github_CODE\Data")
@@ -17,7 +22,17 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 HUMAN_COMPARTMENT = RAW_DATA_DIR / "human_compartment_integrated_full.tsv"
 YEAST_COMPARTMENT = RAW_DATA_DIR / "yeast_compartment_integrated_full.tsv"
 
-def load_compartment_data(compartment_file: Path, threshold: float = 1.0) -> Dict[str, Set[str]]:
+# Export optionnel de la matrice SL creuse (.npz) en plus de la liste d'arêtes
+EXPORT_SPARSE = False
+
+# Estimations mémoire pour le mode à budget (memory_budget.py) : lignes du réseau
+# (identifiants, copies normalisées, produits de lignes creuses, scores) et index
+# des protéines de la matrice d'incidence
+BYTES_PER_EDGE = 600
+BYTES_PER_PROTEIN = 100
+
+@traced("compartiments")
+def load_compartment_data(compartment_file: Path, threshold: float = 1.0) -> Tuple[pd.Index, sparse.csr_matrix]:
     """
     Charge les données de localisation subcellulaire et filtre par score de confiance.
     
@@ -26,122 +41,221 @@ def load_compartment_data(compartment_file: Path, threshold: float = 1.0) -> Dic
         threshold: Seuil de score minimum pour considérer une localisation
         
     Returns:
-        Dictionnaire {protéine: set(localisations)}
+        (protéines, incidence) : index des protéines et matrice creuse
+        protéine x compartiment (1 si la protéine est localisée dans le compartiment)
     """
     try:
         # Chargement des données
-        df = pd.read_csv(compartment_file, sep='\t', header=None,
-                        names=['protein_id', 'gene_name', 'go_id', 'go_term', 'score'])
+        with input_stream(compartment_file) as source:
+            df = pd.read_csv(source, sep='\t', header=None,
+                            names=['protein_id', 'gene_name', 'go_id', 'go_term', 'score'])
         
         # Filtrage par score et nettoyage
         df = df[df['score'] >= threshold]
-        df['protein_id'] = df['protein_id'].str.upper().str.strip()
-        df['go_term'] = df['go_term'].str.strip()
+        protein_id = df['protein_id'].str.upper().str.strip()
+        # Sans astype(str) : un nom de gène manquant reste NaN (retiré par dropna) et ne devient pas "NAN"
+        gene_name = df['gene_name'].str.upper()
+        go_term = df['go_term'].str.strip()
         
-        # Groupement par protéine
-        protein_locations = defaultdict(set)
-        for _, row in df.iterrows():
-            protein_locations[row['protein_id']].add(row['go_term'])
-            # On garde aussi le mapping par nom de gène si différent
-            if row['gene_name'] != row['protein_id']:
-                protein_locations[row['gene_name'].upper()].add(row['go_term'])
+        # On garde aussi le mapping par nom de gène si différent
+        alias = df['gene_name'] != df['protein_id']
+        pairs = pd.DataFrame({
+            'protein': pd.concat([protein_id, gene_name[alias]], ignore_index=True),
+            'go_term': pd.concat([go_term, go_term[alias]], ignore_index=True),
+        }).dropna().drop_duplicates()
+        count(rows_in=len(df), rows_out=len(pairs))
         
-        return dict(protein_locations)
+        return build_incidence_matrix(pairs)
     except Exception as e:
         print(f"Erreur lors du chargement du fichier {compartment_file}: {e}")
-        return {}
+        return pd.Index([]), sparse.csr_matrix((0, 0), dtype=np.float32)
 
-def calculate_sl_similarity(protein1: str, protein2: str, compartment_data: Dict[str, Set[str]]) -> float:
+def build_incidence_matrix(pairs: pd.DataFrame) -> Tuple[pd.Index, sparse.csr_matrix]:
+    """
+    Construit la matrice d'incidence protéine x compartiment à partir de paires
+    (protein, go_term) uniques, par groupement vectorisé (factorize).
     """
-    Calcule la similarité de localisation subcellulaire selon l'équation 5.
+    rows, proteins = pd.factorize(pairs['protein'], sort=True)
+    cols, terms = pd.factorize(pairs['go_term'])
+    data = np.ones(len(rows), dtype=np.float32)
+    incidence = sparse.csr_matrix((data, (rows, cols)), shape=(len(proteins), len(terms)))
+    incidence.sum_duplicates()
+    incidence.data[:] = 1.0
+    return pd.Index(proteins), incidence
+
+def calculate_sl_similarity(protein1, protein2, proteins: pd.Index,
+                            incidence: sparse.csr_matrix) -> np.ndarray:
+    """
+    Calcule la similarité de localisation subcellulaire selon l'équation 5,
+    |L1 ∩ L2|² / (|L1| · |L2|), pour des tableaux d'arêtes (protein1[i], protein2[i]).
     
     Args:
-        protein1: Première protéine
-        protein2: Seconde protéine
-        compartment_data: Dictionnaire des localisations
+        protein1: Premières protéines des arêtes
+        protein2: Secondes protéines des arêtes
+        proteins: Index des protéines de la matrice d'incidence
+        incidence: Matrice creuse protéine x compartiment
         
     Returns:
-        Score de similarité SL entre 0 et 1
+        Scores de similarité SL entre 0 et 1 (0 si une protéine n'a pas de localisation)
     """
-    loc1 = compartment_data.get(protein1, set())
-    loc2 = compartment_data.get(protein2, set())
+    idx1 = proteins.get_indexer(pd.Index(protein1))
+    idx2 = proteins.get_indexer(pd.Index(protein2))
+    scores = np.zeros(len(idx1), dtype=np.float64)
+    
+    known = (idx1 >= 0) & (idx2 >= 0)
+    if not known.any() or incidence.shape[1] == 0:
+        return scores
     
-    if not loc1 or not loc2:
-        return 0.0
+    # |L1 ∩ L2| : produit ligne à ligne des vecteurs d'incidence des deux extrémités
+    rows1 = incidence[idx1[known]]
+    rows2 = incidence[idx2[known]]
+    intersection = np.asarray(rows1.multiply(rows2).sum(axis=1)).ravel()
     
-    intersection = len(loc1 & loc2)
-    return (intersection ** 2) / (len(loc1) * len(loc2))
+    sizes = np.diff(incidence.indptr)
+    denominator = sizes[idx1[known]].astype(np.float64) * sizes[idx2[known]]
+    scores[known] = np.divide(intersection ** 2, denominator,
+                              out=np.zeros_like(denominator), where=denominator > 0)
+    return scores
 
-def create_sl_matrix(proteins: List[str], compartment_data: Dict[str, Set[str]]) -> pd.DataFrame:
+@traced("calcul_SL")
+def create_sl_edges(ppi: pd.DataFrame, proteins: pd.Index, incidence: sparse.csr_matrix) -> pd.DataFrame:
     """
-    Crée une matrice de similarité SL pour toutes les paires de protéines.
+    Calcule la similarité SL uniquement pour les arêtes du réseau PPI.
     
     Args:
-        proteins: Liste des protéines à inclure
-        compartment_data: Dictionnaire des localisations
+        ppi: Interactions (colonnes protein1, protein2)
+        proteins: Index des protéines de la matrice d'incidence
+        incidence: Matrice creuse protéine x compartiment
         
     Returns:
-        DataFrame de similarité (matrice carrée)
+        Liste d'arêtes (protein1, protein2, SL)
     """
-    n = len(proteins)
-    sl_matrix = np.zeros((n, n))
+    count(rows_in=len(ppi), rows_out=len(ppi))
+    protein1 = ppi['protein1'].astype(str).str.upper().str.strip().values
+    protein2 = ppi['protein2'].astype(str).str.upper().str.strip().values
+    return pd.DataFrame({
+        'protein1': ppi['protein1'].values,
+        'protein2': ppi['protein2'].values,
+        'SL': calculate_sl_similarity(protein1, protein2, proteins, incidence),
+    })
+
+def save_sl_sparse(sl_edges: pd.DataFrame, output_file: Path):
+    """
+    Exporte les scores SL sous forme de matrice creuse symétrique (.npz)
+    au lieu de la matrice dense TSV : seules les arêtes de score non nul sont stockées.
+    Une arête présente dans les deux sens (A-B et B-A) n'est stockée qu'une fois.
+    """
+    nonzero = sl_edges[sl_edges['SL'] > 0]
+    codes, proteins = pd.factorize(pd.concat([nonzero['protein1'], nonzero['protein2']]), sort=True)
+    # Paires canoniques uniques : coo_matrix additionnerait les doublons
+    keys, values = unique_keys(pack_pairs(codes[:len(nonzero)], codes[len(nonzero):]),
+                               nonzero['SL'].values.astype(np.float32))
+    row, col = unpack_pairs(keys)
     
-    # Création d'un index pour un accès rapide
-    protein_index = {prot: i for i, prot in enumerate(proteins)}
+    # Symétrisation (la diagonale n'est pas dupliquée)
+    mirror = row != col
+    matrix = sparse.coo_matrix(
+        (np.concatenate([values, values[mirror]]),
+         (np.concatenate([row, col[mirror]]), np.concatenate([col, row[mirror]]))),
+        shape=(len(proteins), len(proteins))
+    ).tocsr()
+    np.savez_compressed(output_file, proteins=np.asarray(proteins, dtype=str),
+                        data=matrix.data, indices=matrix.indices, indptr=matrix.indptr)
+
+def load_sl_sparse(sparse_file: Path) -> Tuple[pd.Index, sparse.csr_matrix]:
+    """Recharge une matrice SL creuse exportée par save_sl_sparse"""
+    with np.load(sparse_file) as npz:
+        proteins = pd.Index(npz['proteins'])
+        matrix = sparse.csr_matrix((npz['data'], npz['indices'], npz['indptr']),
+                                   shape=(len(proteins), len(proteins)))
+    return proteins, matrix
+
+def sl_estimate(ppi_file: Path, proteins: pd.Index, incidence: sparse.csr_matrix) -> Estimate:
+    """Estimation mémoire du calcul SL d'un réseau (la matrice d'incidence est commune aux deux chemins)"""
+    n_edges = edge_count(ppi_file)
+    fixed = (incidence.data.nbytes + incidence.indices.nbytes + incidence.indptr.nbytes
+             + len(proteins) * BYTES_PER_PROTEIN)
+    return Estimate(n_edges, fixed + n_edges * BYTES_PER_EDGE, fixed, BYTES_PER_EDGE)
+
+@traced("calcul_SL_blocs")
+def create_sl_edges_blocked(ppi_file: Path, proteins: pd.Index, incidence: sparse.csr_matrix,
+                            output_file: Path, block_rows: int) -> int:
+    """create_sl_edges par blocs de lignes lus et écrits au fil de l'eau. Returns: nombre d'interactions"""
+    with EdgeSetWriter(output_file, columns=['SL']) as writer:
+        for ppi in iter_edges(ppi_file, block_rows, columns=[], names=['protein1', 'protein2']):
+            writer.write(create_sl_edges(ppi, proteins, incidence))
+    count(rows_in=writer.n_edges, rows_out=writer.n_edges)
+    return writer.n_edges
+
+# Réseaux de chaque organisme et fichier de localisation correspondant
+NETWORKS = {
+    "human": {
+        "compartment_file": HUMAN_COMPARTMENT,
+        "ppi_files": ["BIOGRID_humain", "STRING_humain"]
+    },
+    "yeast": {
+        "compartment_file": YEAST_COMPARTMENT,
+        "ppi_files": ["BIOGRID_levure", "DIP_levure", "STRING_levure"]
+    }
+}
+
+@traced("SL", detail="network")
+def process_network(network: str, compartment_file: Path = None,
+                    compartment_data: Tuple[pd.Index, sparse.csr_matrix] = None) -> Optional[Path]:
+    """
+    Calcule la similarité SL des interactions d'un réseau (SL_<réseau>.txt).
+    Les données de localisation sont chargées depuis compartment_file si elles
+    ne sont pas fournies. Sous budget mémoire, les grands réseaux sont traités
+    par blocs (create_sl_edges_blocked).
+    """
+    print(f"  Traitement du réseau {network}...")
+    
+    # Charger le PPI (à adapter selon votre structure)
+    ppi_file = INTERACTIONS_DIR / f"{network}.txt"
+    if not edges_exist(ppi_file):
+        print(f"Fichier PPI {ppi_file} non trouvé")
+        return None
+    
+    if compartment_data is None:
+        compartment_data = load_compartment_data(Path(compartment_file))
+        
+    proteins, incidence = compartment_data
+    output_file = OUTPUT_DIR / f"SL_{network}.txt"
+    execution = plan("SL", lambda: sl_estimate(ppi_file, proteins, incidence))
+    if execution.blocked:
+        n_edges = create_sl_edges_blocked(ppi_file, proteins, incidence, output_file,
+                                          execution.block_rows)
+        count(rows_in=n_edges, rows_out=n_edges)
+        print(f"Scores SL sauvegardés dans {output_file} ({n_edges} interactions)")
+        if EXPORT_SPARSE:
+            print("Export de la matrice SL creuse ignoré (calcul par blocs)")
+        return output_file
     
-    # Calcul pour toutes les paires uniques
-    for i in tqdm(range(n), desc="Calcul SL"):
-        for j in range(i, n):
-            similarity = calculate_sl_similarity(
-                proteins[i], proteins[j], compartment_data)
-            sl_matrix[i][j] = similarity
-            sl_matrix[j][i] = similarity  # Matrice symétrique
+    # Chargement des interactions
+    ppi = read_edges(ppi_file, columns=[], names=['protein1', 'protein2'])
     
-    return pd.DataFrame(sl_matrix, index=proteins, columns=proteins)
+    # Similarité SL sur les arêtes uniquement (produits de lignes creuses)
+    sl_edges = create_sl_edges(ppi, proteins, incidence)
+    count(rows_in=len(ppi), rows_out=len(sl_edges))
+    
+    # Sauvegarde de la liste d'arêtes
+    write_edges(sl_edges, output_file, float_format='%.5f')
+    print(f"Scores SL sauvegardés dans {output_file} ({len(sl_edges)} interactions)")
+    
+    if EXPORT_SPARSE:
+        sparse_file = OUTPUT_DIR / f"SL_matrix_{network}.npz"
+        save_sl_sparse(sl_edges, sparse_file)
+        print(f"Matrice SL creuse sauvegardée dans {sparse_file}")
+    return output_file
 
 def main():
     # Chargement des données de localisation
     print("Chargement des données de localisation subcellulaire...")
-    human_comp = load_compartment_data(HUMAN_COMPARTMENT)
-    yeast_comp = load_compartment_data(YEAST_COMPARTMENT)
-    
-    # Exemple d'utilisation avec un réseau PPI
-    # (À adapter selon vos besoins spécifiques)
-    networks = {
-        "human": {
-            "compartment_data": human_comp,
-            "ppi_files": ["BIOGRID_humain", "STRING_humain"]
-        },
-        "yeast": {
-            "compartment_data": yeast_comp,
-            "ppi_files": ["BIOGRID_levure", "DIP_levure", "STRING_levure"]
-        }
-    }
-    
-    for organism, data in networks.items():
+    for organism, data in NETWORKS.items():
+        compartment_data = load_compartment_data(data["compartment_file"])
         print(f"\nTraitement des réseaux {organism}...")
-        compartment_data = data["compartment_data"]
-        
         for network in data["ppi_files"]:
-            print(f"  Traitement du réseau {network}...")
-            
-            # Charger le PPI (à adapter selon votre structure)
-            ppi_file = INTERACTIONS_DIR / f"{network}.txt"
-            if not ppi_file.exists():
-                print(f"Fichier PPI {ppi_file} non trouvé")
-                continue
-                
-            # Chargement des interactions
-            ppi = pd.read_csv(ppi_file, sep='\t', names=['protein1', 'protein2'])
-            proteins = sorted(set(ppi['protein1']).union(set(ppi['protein2'])))
-            
-            # Création de la matrice SL
-            sl_matrix = create_sl_matrix(proteins, compartment_data)
-            
-            # Sauvegarde
-            output_file = OUTPUT_DIR / f"SL_matrix_{network}.tsv"
-            sl_matrix.to_csv(output_file, sep='\t', float_format='%.5f')
-            print(f"Matrice SL sauvegardée dans {output_file}")
+            process_network(network, compartment_data=compartment_data)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,318 @@
+"""
+Filtrage des complexes de référence contre tous les réseaux PPI d'une espèce en une passe.
+
+Les complexes sont chargés une seule fois et codés en entiers sur le vocabulaire
+de leurs protéines : chaque appartenance (complexe, protéine) est une position
+du tableau plat `members`, les complexes étant délimités par `offsets`.
+Pour chaque réseau :
+- présence : masque des protéines du vocabulaire présentes dans le réseau,
+  réduit par complexe (np.minimum.reduceat)
+- connectivité : les arêtes induites (u, v dans un même complexe) sont trouvées
+  en développant les appartenances de u et en cherchant la clé (complexe, v)
+  parmi les appartenances triées
+Les arêtes induites de tous les réseaux forment un seul graphe sur les
+positions (réseau, appartenance) dont les composantes connexes (scipy) donnent
+d'un coup la connectivité de chaque complexe dans chaque réseau.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from csr_graph import csr_ranges
+from edge_keys import encode, lookup_keys
+from edge_store import edges_exist
+from instrumentation import count, traced
+from network_io import read_weighted_network
+
+# Configuration des chemins
+DATA_DIR = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data")
+COMPLEXES_DIR = DATA_DIR / "complexes"
+WEIGHTED_DIR = DATA_DIR / "weighted_networks"
+
+MIN_COMPLEX_SIZE = 3
+
+# Fichier de référence, format et noms de sortie par espèce
+#   corum  : en-tête, "complex_id<TAB>P1;P2;..."
+#   portal : sans en-tête, "id<TAB>P1 P2 ..."
+SPECIES_COMPLEXES = {
+    "humain": {
+        "complexes": COMPLEXES_DIR / "CORUM_complexes_humain.txt",
+        "format": "corum",
+        "networks": ["BIOGRID", "STRING"],
+        "output": "{network}_complexes_humain.txt",
+    },
+    "levure": {
+        "complexes": COMPLEXES_DIR / "complexes_levure.txt",
+        "format": "portal",
+        "networks": ["STRING", "DIP", "BIOGRID"],
+        "output": "complexes_{network}_levure.txt",
+    },
+}
+
+FORMATS = {
+    "corum": {"header": True, "separator": ";"},
+    "portal": {"header": False, "separator": " "},
+}
+
+
+class ComplexSet:
+    """Complexes codés en entiers : appartenances à plat délimitées par offsets"""
+
+    def __init__(self, ids: List[str], proteins: List[List[str]], lines: List[str]):
+        self.ids = ids
+        self.lines = lines  # texte d'origine des protéines, réécrit tel quel
+        sizes = np.array([len(p) for p in proteins], dtype=np.int64)
+        flat = [protein for complex_proteins in proteins for protein in complex_proteins]
+        self.vocabulary = pd.Index(np.unique(np.array(flat, dtype=object)).astype(str)) \
+            if flat else pd.Index([], dtype=object)
+        self.members = encode(flat, self.vocabulary).astype(np.int64)
+        self.offsets = np.zeros(len(proteins) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.offsets[1:])
+        self.complex_of = np.repeat(np.arange(len(proteins), dtype=np.int64), sizes)
+
+        # Appartenances triées par clé (complexe << 32 | protéine) pour les recherches
+        keys = (self.complex_of.astype(np.uint64) << np.uint64(32)) | self.members.astype(np.uint64)
+        self.key_order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.key_order]
+
+        # Appartenances de chaque protéine (CSR protéine -> positions)
+        self.by_protein = np.argsort(self.members, kind='stable')
+        self.protein_indptr = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.members, minlength=len(self.vocabulary)),
+                  out=self.protein_indptr[1:])
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def subset(self, indices: np.ndarray) -> 'ComplexSet':
+        """Complexes sélectionnés (positions), dans l'ordre donné"""
+        proteins = [list(self.vocabulary[self.members[self.offsets[i]:self.offsets[i + 1]]])
+                    for i in indices]
+        return ComplexSet([self.ids[i] for i in indices], proteins,
+                          [self.lines[i] for i in indices])
+
+    def touching(self, proteins: Iterable[str]) -> np.ndarray:
+        """Positions des complexes qui contiennent au moins une des protéines"""
+        codes = encode(list(proteins), self.vocabulary)
+        touched = np.zeros(len(self.vocabulary), dtype=bool)
+        touched[codes[codes >= 0]] = True
+        return np.unique(self.complex_of[touched[self.members]])
+
+    def induced_edges(self, u: np.ndarray, v: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Arêtes du réseau (codes du vocabulaire) induites dans chaque complexe.
+
+        Returns:
+            (position de u, position de v) dans members, une ligne par couple
+            (arête, complexe contenant ses deux extrémités)
+        """
+        counts = self.protein_indptr[u + 1] - self.protein_indptr[u]
+        pos_u = self.by_protein[csr_ranges(self.protein_indptr, u)]
+        v_rep = np.repeat(v, counts)
+        queries = (self.complex_of[pos_u].astype(np.uint64) << np.uint64(32)) | v_rep.astype(np.uint64)
+        idx, found = lookup_keys(self.sorted_keys, queries)
+        return pos_u[found], self.key_order[idx[found]]
+
+
+def load_reference_complexes(path: Path, fmt: str) -> ComplexSet:
+    """Charge les complexes (protéines dédupliquées, ordre du fichier conservé)"""
+    spec = FORMATS[fmt]
+    ids, proteins, lines = [], [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        if spec["header"]:
+            next(f, None)
+        for line in f:
+            parts = line.strip().split('\t')
+            if len(parts) < 2:
+                continue
+            members = [p.strip() for p in parts[1].split(spec["separator"]) if p.strip()]
+            ids.append(parts[0].strip())
+            proteins.append(list(dict.fromkeys(members)))
+            lines.append(spec["separator"].join(members))
+    return ComplexSet(ids, proteins, lines)
+
+
+def filter_complexes(complexes: ComplexSet, networks: Dict[str, pd.DataFrame],
+                     min_size: int = MIN_COMPLEX_SIZE) -> Dict[str, Dict]:
+    """
+    Teste tous les complexes contre tous les réseaux.
+
+    Returns:
+        {réseau: {'keep': masque des complexes conservés, 'stats': compteurs}}
+    """
+    n_complexes = len(complexes)
+    n_members = len(complexes.members)
+    starts = complexes.offsets[:-1]
+    non_empty = complexes.sizes > 0
+    small = complexes.sizes < min_size
+
+    present_all = {}
+    rows, cols = [], []
+    for k, (name, df) in enumerate(networks.items()):
+        a = encode(df['protein1'].values, complexes.vocabulary).astype(np.int64)
+        b = encode(df['protein2'].values, complexes.vocabulary).astype(np.int64)
+
+        # Présence de chaque protéine du vocabulaire dans le réseau, puis par complexe
+        present = np.zeros(len(complexes.vocabulary), dtype=bool)
+        present[a[a >= 0]] = True
+        present[b[b >= 0]] = True
+        all_present = np.zeros(n_complexes, dtype=bool)
+        if n_members:
+            reduced = np.minimum.reduceat(present[complexes.members], starts[non_empty])
+            all_present[non_empty] = reduced.astype(bool)
+        present_all[name] = all_present
+
+        # Arêtes induites, positions décalées par réseau
+        inside = (a >= 0) & (b >= 0) & (a != b)
+        pos_u, pos_v = complexes.induced_edges(a[inside], b[inside])
+        rows.append(pos_u + k * n_members)
+        cols.append(pos_v + k * n_members)
+
+    # Un seul graphe (réseaux x appartenances) : composantes de tous les complexes d'un coup
+    n_nodes = len(networks) * n_members
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+    graph = sparse.csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)),
+                              shape=(n_nodes, n_nodes))
+    _, labels = connected_components(graph, directed=False)
+
+    results = {}
+    for k, name in enumerate(networks):
+        connected = np.ones(n_complexes, dtype=bool)
+        if n_members:
+            local = labels[k * n_members:(k + 1) * n_members]
+            same = local == np.repeat(local[starts], complexes.sizes)
+            connected[non_empty] = np.minimum.reduceat(same, starts[non_empty]).astype(bool)
+
+        missing = ~small & ~present_all[name]
+        disconnected = ~small & ~missing & ~connected
+        keep = ~small & ~missing & ~disconnected
+        results[name] = {
+            'keep': keep,
+            'stats': {
+                'total': n_complexes,
+                'kept': int(keep.sum()),
+                'small': int(small.sum()),
+                'missing_proteins': int(missing.sum()),
+                'disconnected': int(disconnected.sum()),
+            },
+        }
+    return results
+
+
+def save_complexes(complexes: ComplexSet, keep: np.ndarray, fmt: str, output_file: Path):
+    """Écrit les complexes conservés dans le format du fichier de référence"""
+    with open(output_file, 'w', encoding='utf-8', newline='') as f_out:
+        if FORMATS[fmt]["header"]:
+            f_out.write("complex_id\tproteins\n")
+        for i in np.flatnonzero(keep):
+            f_out.write(f"{complexes.ids[i]}\t{complexes.lines[i]}\n")
+
+
+def load_kept(complexes: ComplexSet, fmt: str, output_file: Path) -> np.ndarray:
+    """Masque des complexes présents dans un fichier de sortie existant (save_complexes)"""
+    with open(output_file, 'r', encoding='utf-8') as f:
+        if FORMATS[fmt]["header"]:
+            next(f, None)
+        written = set(line.rstrip('\n') for line in f)
+    return np.array([f"{cid}\t{line}" in written for cid, line in zip(complexes.ids, complexes.lines)],
+                    dtype=bool)
+
+
+@traced("complexes", detail="species")
+def process_species(species: str, config: Dict = None, weighted_dir: Path = WEIGHTED_DIR,
+                    output_dir: Path = COMPLEXES_DIR) -> Dict[str, Dict]:
+    """Filtre les complexes d'une espèce contre tous ses réseaux et écrit un fichier par réseau"""
+    config = config or SPECIES_COMPLEXES[species]
+    weighted_dir, output_dir = Path(weighted_dir), Path(output_dir)
+    print(f"\n=== Complexes {species} ===")
+    complexes = load_reference_complexes(config["complexes"], config["format"])
+    print(f"Complexes chargés: {len(complexes):,} ({len(complexes.vocabulary):,} protéines)")
+
+    networks = {}
+    for network in config["networks"]:
+        ppi_file = weighted_dir / f"weighted_{network}_{species}.txt"
+        if not edges_exist(ppi_file):
+            print(f"Réseau absent, ignoré: {ppi_file.name}")
+            continue
+        networks[network] = read_weighted_network(ppi_file)
+
+    results = filter_complexes(complexes, networks)
+    count(rows_in=len(complexes) * len(networks),
+          rows_out=sum(int(result['stats']['kept']) for result in results.values()))
+    for network, result in results.items():
+        stats = result['stats']
+        output_file = output_dir / config["output"].format(network=network)
+        save_complexes(complexes, result['keep'], config["format"], output_file)
+
+        print(f"\nRéseau {network}:")
+        print(f"- Complexes analysés: {stats['total']:,}")
+        if stats['total']:
+            print(f"- Complexes conservés: {stats['kept']:,} ({stats['kept']/stats['total']*100:.1f}%)")
+        print(f"  - Rejetés (taille < {MIN_COMPLEX_SIZE}): {stats['small']:,}")
+        print(f"  - Rejetés (protéines manquantes): {stats['missing_proteins']:,}")
+        print(f"  - Rejetés (non connectés): {stats['disconnected']:,}")
+        print(f"- Fichier généré: {output_file}")
+    return results
+
+
+@traced("mise_a_jour_complexes", detail="species")
+def patch_species(species: str, changed: Dict[str, Iterable[str]], config: Dict = None,
+                  weighted_dir: Path = WEIGHTED_DIR, output_dir: Path = COMPLEXES_DIR) -> Dict[str, int]:
+    """
+    Met à jour les fichiers de complexes d'une espèce après un changement de
+    réseaux : pour chaque réseau, seuls les complexes qui contiennent une
+    protéine dont les arêtes ont changé (`changed`) sont re-testés, les autres
+    gardent la décision du fichier existant.
+
+    Returns:
+        {réseau: nombre de complexes re-testés}
+    """
+    config = config or SPECIES_COMPLEXES[species]
+    weighted_dir, output_dir = Path(weighted_dir), Path(output_dir)
+    complexes = load_reference_complexes(config["complexes"], config["format"])
+
+    retested = {}
+    for network, proteins in changed.items():
+        if network not in config["networks"]:
+            continue
+        ppi_file = weighted_dir / f"weighted_{network}_{species}.txt"
+        output_file = output_dir / config["output"].format(network=network)
+        if not edges_exist(ppi_file):
+            print(f"Réseau absent, ignoré: {ppi_file.name}")
+            continue
+        ppi = read_weighted_network(ppi_file)
+
+        if output_file.exists():
+            keep = load_kept(complexes, config["format"], output_file)
+            affected = complexes.touching(proteins)
+        else:
+            keep = np.zeros(len(complexes), dtype=bool)
+            affected = np.arange(len(complexes))
+        if len(affected):
+            result = filter_complexes(complexes.subset(affected), {network: ppi})
+            keep[affected] = result[network]['keep']
+        save_complexes(complexes, keep, config["format"], output_file)
+
+        retested[network] = len(affected)
+        print(f"Complexes {network} {species}: {len(affected):,} re-testés, "
+              f"{int(keep.sum()):,} conservés -> {output_file}")
+    return retested
+
+
+def main():
+    for species in SPECIES_COMPLEXES:
+        process_species(species)
+
+
+if __name__ == "__main__":
+    main()
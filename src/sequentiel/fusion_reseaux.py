@@ -0,0 +1,144 @@
+"""
+Fusion multi-sources des réseaux PPI d'une espèce (ex. BIOGRID + DIP + STRING pour la levure).
+
+Tous les réseaux pondérés d'une espèce sont codés sur un vocabulaire de protéines
+commun. L'union des arêtes est obtenue par tri des clés uint64 ; pour chaque arête
+on garde un masque de preuves (bit i = présente dans la source i), le nombre de
+sources et le poids de chaque source, combinés ensuite par une politique
+d'agrégation (voir aggregation.py).
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from edge_keys import build_vocabulary, encode_edges, unique_keys, lookup_keys
+from edge_store import edges_exist
+from instrumentation import count, traced
+from network_io import read_weighted_network
+from score_table import ScoreTable
+from aggregation import aggregate
+
+# Configuration des chemins
+BASE_DIR = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data")
+WEIGHTED_DIR = BASE_DIR / "weighted_networks"
+OUTPUT_DIR = BASE_DIR / "fused_networks"
+
+SPECIES_NETWORKS = {
+    "levure": ["BIOGRID", "DIP", "STRING"],
+    "humain": ["BIOGRID", "STRING"],
+}
+
+# Combinaison des poids des sources et nombre minimum de sources par arête
+FUSION_POLICY = 'mean'
+MIN_SOURCES = 1
+
+
+def load_species_networks(species: str, networks: List[str],
+                          weighted_dir: Path = WEIGHTED_DIR) -> Dict[str, pd.DataFrame]:
+    """Charge les réseaux pondérés disponibles d'une espèce"""
+    loaded = {}
+    for network in networks:
+        path = weighted_dir / f"weighted_{network}_{species}.txt"
+        if not edges_exist(path):
+            print(f"Réseau absent, ignoré: {path.name}")
+            continue
+        loaded[network] = read_weighted_network(path)
+    return loaded
+
+
+def fuse_networks(networks: Dict[str, pd.DataFrame]) -> Tuple[ScoreTable, np.ndarray]:
+    """
+    Union des arêtes de plusieurs réseaux sur un vocabulaire commun.
+
+    Returns:
+        (table, evidence) : table de scores (une colonne de poids par source,
+        NaN si l'arête est absente de la source) et masque de preuves uint8 par arête
+    """
+    names = list(networks)
+    if len(names) > 8:
+        raise ValueError("Au plus 8 sources peuvent être fusionnées (masque de preuves uint8)")
+
+    vocabulary = build_vocabulary(*[df[col].values for df in networks.values()
+                                    for col in ('protein1', 'protein2')])
+    vocab_index = pd.Index(vocabulary)
+
+    # Chaque source : clés triées uniques et poids associés
+    sources = {}
+    for name, df in networks.items():
+        keys, valid = encode_edges(df['protein1'].values, df['protein2'].values, vocab_index)
+        sources[name] = unique_keys(keys, df['weight'].values[valid])
+
+    # Union par tri des clés de toutes les sources
+    union = np.unique(np.concatenate([keys for keys, _ in sources.values()]))
+
+    evidence = np.zeros(len(union), dtype=np.uint8)
+    table = ScoreTable(vocabulary, union)
+    for bit, name in enumerate(names):
+        keys, weights = sources[name]
+        pos, found = lookup_keys(keys, union)
+        evidence[found] |= np.uint8(1 << bit)
+        column = np.full(len(union), np.nan, dtype=np.float32)
+        column[found] = weights[pos[found]]
+        table.add_channel(name, column)
+
+    return table, evidence
+
+
+def fused_network(table: ScoreTable, evidence: np.ndarray, policy: str = FUSION_POLICY,
+                  min_sources: int = MIN_SOURCES, **params) -> pd.DataFrame:
+    """
+    Réseau fusionné : poids combiné, nombre de sources et masque de preuves.
+    min_sources = nombre de sources donne l'intersection, 1 l'union.
+    """
+    n_sources = np.unpackbits(evidence[:, None], axis=1).sum(axis=1)
+    weight = aggregate(table, policy, **params)
+    keep = (n_sources >= min_sources) & ~np.isnan(weight)
+
+    fused = table.to_frame(weight, keep)
+    fused['n_sources'] = n_sources[keep]
+    fused['evidence'] = evidence[keep]
+    return fused
+
+
+@traced("fusion", detail="species")
+def process_species(species: str, networks: List[str], weighted_dir: Path = WEIGHTED_DIR,
+                    output_dir: Path = OUTPUT_DIR) -> Optional[pd.DataFrame]:
+    """Fusionne les réseaux d'une espèce et sauvegarde le réseau fusionné"""
+    print(f"\n=== Fusion des réseaux {species} ===")
+    loaded = load_species_networks(species, networks, weighted_dir)
+    if len(loaded) < 2:
+        print("Moins de deux réseaux disponibles, fusion ignorée")
+        return None
+
+    table, evidence = fuse_networks(loaded)
+    fused = fused_network(table, evidence)
+    count(rows_in=sum(len(frame) for frame in loaded.values()), rows_out=len(fused))
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / f"fused_{species}.txt"
+    fused.to_csv(output_file, sep='\t', index=False, float_format='%.6f')
+
+    # Statistiques
+    names = table.channels
+    print(f"- Sources: {', '.join(f'{name} (bit {bit})' for bit, name in enumerate(names))}")
+    for name in names:
+        print(f"  - {name}: {len(loaded[name]):,} interactions")
+    print(f"- Protéines (vocabulaire commun): {len(table.vocabulary):,}")
+    print(f"- Union: {len(table):,} interactions")
+    counts = np.bincount(fused['n_sources'].values, minlength=len(names) + 1)
+    for k in range(1, len(names) + 1):
+        print(f"  - présentes dans {k} source(s): {counts[k]:,}")
+    print(f"- Réseau fusionné: {len(fused):,} interactions -> {output_file}")
+    return fused
+
+
+def main():
+    for species, networks in SPECIES_NETWORKS.items():
+        process_species(species, networks)
+
+
+if __name__ == "__main__":
+    main()
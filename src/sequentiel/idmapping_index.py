@@ -0,0 +1,306 @@
+"""
+Index compilé des fichiers UniProt idmapping (YEAST_559292_idmapping.dat, HUMAN_9606_idmapping.dat).
+
+Le fichier texte est lu une seule fois puis compilé, pour chaque type de base
+(STRING, SGD, Gene_Name, ORF, Ensembl, Gene_OrderedLocusName), en tableaux
+triés clé -> valeur sauvegardés au format .npy. Les étapes suivantes ouvrent ces
+tableaux en mémoire mappée (mmap) et font des recherches vectorisées sur des
+tableaux entiers d'identifiants avec np.searchsorted. Le fichier source peut
+rester compressé tel que distribué (.dat.gz), voir compressed_input.py.
+
+Utilisation :
+    index = open_idmapping_index(MAPPING_FILE)
+    uniprot, found = index.lookup('STRING', ids)             # externe -> UniProt
+    sgd, found = index.lookup('SGD', uniprot_ids, reverse=True)  # UniProt -> externe
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from compressed_input import input_stream
+from edge_store import _locked
+
+DB_TYPES = ("STRING", "SGD", "Gene_Name", "ORF", "Ensembl", "Gene_OrderedLocusName")
+
+# Version du format sur disque (à incrémenter si la normalisation change)
+INDEX_VERSION = 1
+
+CHUNK_SIZE = 2_000_000
+
+# Attente maximale du verrou de compilation (compiler l'index humain prend plusieurs minutes)
+BUILD_LOCK_TIMEOUT = 3600.0
+
+# Index déjà ouverts dans ce processus, partagés entre les étapes
+_OPEN_INDEXES: Dict[Path, "IdMappingIndex"] = {}
+
+
+def _normalize_keys(db_type: str, ids: pd.Series) -> pd.Series:
+    """Normalise les identifiants externes avant indexation"""
+    if db_type == "STRING":
+        # 4932.YAL001C -> YAL001C, 9606.ENSP00000361930 -> ENSP00000361930
+        return ids.str.split('.', n=1).str[-1]
+    if db_type == "Gene_Name":
+        # Les noms de gènes sont recherchés en majuscules
+        return ids.str.upper()
+    return ids
+
+
+def _to_bytes(values: Union[pd.Series, np.ndarray, Iterable[str]]) -> np.ndarray:
+    """Convertit un tableau d'identifiants en tableau d'octets (dtype 'S')"""
+    values = np.asarray(values, dtype=object).astype(str)
+    try:
+        return values.astype('S')
+    except UnicodeEncodeError:
+        return np.char.encode(values, 'utf-8')
+
+
+def _first_occurrence_sorted(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Trie par clé en gardant la première valeur rencontrée dans le fichier"""
+    sorted_keys, first = np.unique(keys, return_index=True)
+    return sorted_keys, values[first]
+
+
+def _index_dir_for(mapping_file: Path) -> Path:
+    return mapping_file.with_name(mapping_file.name + ".idx")
+
+
+def _source_signature(mapping_file: Path) -> Dict[str, Union[int, float, str]]:
+    stat = mapping_file.stat()
+    return {
+        'version': INDEX_VERSION,
+        'source': mapping_file.name,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+    }
+
+
+def build_idmapping_index(mapping_file: Path, index_dir: Optional[Path] = None,
+                          db_types: Iterable[str] = DB_TYPES) -> Path:
+    """
+    Compile un fichier idmapping en tableaux triés (.npy) par type de base.
+    L'index est écrit dans un dossier temporaire puis mis en place par
+    os.replace : les fichiers d'un index existant, peut-être ouverts en mémoire
+    mappée par d'autres processus, ne sont jamais réécrits.
+
+    Args:
+        mapping_file: Fichier UniProt *_idmapping.dat[.gz] (UniProt, DB, ID)
+        index_dir: Dossier de sortie (par défaut <mapping_file>.idx)
+        db_types: Types de base à indexer
+
+    Returns:
+        Chemin du dossier de l'index
+    """
+    mapping_file = Path(mapping_file)
+    index_dir = Path(index_dir) if index_dir else _index_dir_for(mapping_file)
+    db_types = tuple(db_types)
+    index_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = index_dir.with_name(f"{index_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    try:
+        _write_index(mapping_file, tmp_dir, db_types)
+        _install(tmp_dir, index_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return index_dir
+
+
+def _install(tmp_dir: Path, index_dir: Path):
+    """Remplace index_dir par tmp_dir (l'ancien index est renommé puis supprimé)"""
+    if not index_dir.exists():
+        os.replace(tmp_dir, index_dir)
+        return
+    old_dir = index_dir.with_name(f"{index_dir.name}.{os.getpid()}.old")
+    os.replace(index_dir, old_dir)
+    os.replace(tmp_dir, index_dir)
+    # Les fichiers encore mappés restent lisibles jusqu'à leur fermeture
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _write_index(mapping_file: Path, index_dir: Path, db_types: Tuple[str, ...]):
+    """Écrit les tableaux et meta.json de l'index dans index_dir"""
+    # Lecture par blocs : seules les lignes des types demandés sont conservées
+    parts = {db: [] for db in db_types}
+    accessions = []
+    with input_stream(mapping_file) as source:
+        reader = pd.read_csv(source, sep='\t', header=None, usecols=[0, 1, 2],
+                             names=['UniProt', 'DB', 'ID'], dtype=str,
+                             quoting=3, chunksize=CHUNK_SIZE)
+        for chunk in reader:
+            chunk = chunk.dropna()
+            accessions.append(chunk['UniProt'].unique())
+            chunk = chunk[chunk['DB'].isin(db_types)]
+            for db, group in chunk.groupby('DB', sort=False):
+                parts[db].append(group[['UniProt', 'ID']])
+
+    # Ensemble des accessions UniProt présentes dans le fichier
+    uniprot_ids = np.unique(_to_bytes(pd.unique(np.concatenate(accessions)) if accessions else []))
+    np.save(index_dir / "UniProtKB.npy", uniprot_ids)
+
+    counts = {}
+    for db in db_types:
+        if parts[db]:
+            df = pd.concat(parts[db], ignore_index=True)
+        else:
+            df = pd.DataFrame(columns=['UniProt', 'ID'], dtype=str)
+        external = _to_bytes(_normalize_keys(db, df['ID']))
+        uniprot = _to_bytes(df['UniProt'])
+
+        # Sens direct : identifiant externe -> UniProt
+        keys, values = _first_occurrence_sorted(external, uniprot)
+        np.save(index_dir / f"{db}.keys.npy", keys)
+        np.save(index_dir / f"{db}.values.npy", values)
+
+        # Sens inverse : UniProt -> identifiant externe
+        rkeys, rvalues = _first_occurrence_sorted(uniprot, external)
+        np.save(index_dir / f"{db}.rkeys.npy", rkeys)
+        np.save(index_dir / f"{db}.rvalues.npy", rvalues)
+        counts[db] = int(len(keys))
+
+    meta = _source_signature(mapping_file)
+    meta.update({'db_types': list(db_types), 'counts': counts,
+                 'uniprot_ids': int(len(uniprot_ids))})
+    with open(index_dir / "meta.json", 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+class IdMappingIndex:
+    """Index idmapping ouvert en mémoire mappée, avec recherches vectorisées"""
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        with open(self.index_dir / "meta.json") as f:
+            self.meta = json.load(f)
+        self.db_types = tuple(self.meta['db_types'])
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def _array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(self.index_dir / f"{name}.npy", mmap_mode='r')
+        return self._arrays[name]
+
+    def _check_db(self, db_type: str):
+        if db_type not in self.db_types:
+            raise KeyError(f"Type de base non indexé: {db_type} (disponibles: {', '.join(self.db_types)})")
+
+    @staticmethod
+    def _search(keys: np.ndarray, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Position de chaque requête dans keys (trié) et masque des clés trouvées"""
+        if len(keys) == 0 or len(queries) == 0:
+            return np.zeros(len(queries), dtype=np.intp), np.zeros(len(queries), dtype=bool)
+        pos = np.searchsorted(keys, queries)
+        pos[pos == len(keys)] = 0
+        found = keys[pos] == queries
+        return pos, found
+
+    def lookup(self, db_type: str, ids, reverse: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Recherche vectorisée d'un tableau d'identifiants.
+
+        Args:
+            db_type: Type de base (STRING, SGD, Gene_Name, ORF, Ensembl, Gene_OrderedLocusName)
+            ids: Identifiants à convertir (externes, ou UniProt si reverse=True)
+            reverse: Si True, convertit UniProt -> identifiant externe
+
+        Returns:
+            (valeurs, trouvés) : tableau de chaînes ('' si absent) et masque booléen
+        """
+        self._check_db(db_type)
+        prefix = f"{db_type}.r" if reverse else f"{db_type}."
+        keys = self._array(prefix + "keys")
+        values = self._array(prefix + "values")
+
+        if reverse:
+            queries = _to_bytes(ids)
+        else:
+            # Les requêtes subissent la même normalisation que les clés indexées
+            ids = pd.Series(np.asarray(ids, dtype=object).astype(str))
+            queries = _to_bytes(_normalize_keys(db_type, ids))
+        pos, found = self._search(keys, queries)
+        result = np.where(found, values[pos] if len(values) else b'', b'')
+        return result.astype(str), found
+
+    def lookup_first(self, db_types: Iterable[str], ids) -> Tuple[np.ndarray, np.ndarray]:
+        """Convertit vers UniProt en essayant plusieurs types de base dans l'ordre"""
+        ids = np.asarray(ids, dtype=object).astype(str)
+        result = np.full(len(ids), '', dtype=object)
+        found = np.zeros(len(ids), dtype=bool)
+        for db_type in db_types:
+            todo = ~found
+            if not todo.any():
+                break
+            values, hit = self.lookup(db_type, ids[todo])
+            idx = np.flatnonzero(todo)[hit]
+            result[idx] = values[hit]
+            found[idx] = True
+        return result.astype(str), found
+
+    def has_uniprot(self, ids) -> np.ndarray:
+        """Masque des identifiants présents comme accession UniProt dans le fichier"""
+        _, found = self._search(self._array("UniProtKB"), _to_bytes(ids))
+        return found
+
+    def count(self, db_type: str) -> int:
+        """Nombre de clés distinctes indexées pour un type de base"""
+        self._check_db(db_type)
+        return self.meta['counts'][db_type]
+
+    @property
+    def n_uniprot(self) -> int:
+        return self.meta['uniprot_ids']
+
+
+def _is_stale(mapping_file: Path, index_dir: Path, db_types: Tuple[str, ...]) -> bool:
+    meta_file = index_dir / "meta.json"
+    if not meta_file.exists():
+        return True
+    with open(meta_file) as f:
+        meta = json.load(f)
+    signature = _source_signature(mapping_file)
+    if any(meta.get(k) != v for k, v in signature.items()):
+        return True
+    return not set(db_types).issubset(meta.get('db_types', []))
+
+
+def open_idmapping_index(mapping_file: Path, index_dir: Optional[Path] = None,
+                         db_types: Iterable[str] = DB_TYPES) -> IdMappingIndex:
+    """
+    Ouvre l'index d'un fichier idmapping, en le compilant s'il est absent ou périmé.
+
+    L'index est compilé une seule fois sur disque puis partagé : entre les étapes
+    d'un même processus (cache) et entre processus (pages mmap du système).
+    Un verrou évite que plusieurs processus le compilent en même temps.
+    """
+    mapping_file = Path(mapping_file)
+    index_dir = Path(index_dir) if index_dir else _index_dir_for(mapping_file)
+    db_types = tuple(db_types)
+
+    cached = _OPEN_INDEXES.get(index_dir)
+    if cached is not None and set(db_types).issubset(cached.db_types):
+        return cached
+
+    if _is_stale(mapping_file, index_dir, db_types):
+        with _locked(index_dir, BUILD_LOCK_TIMEOUT):
+            # Un autre processus a pu compiler l'index pendant l'attente du verrou
+            if _is_stale(mapping_file, index_dir, db_types):
+                print(f"Compilation de l'index idmapping: {mapping_file.name}")
+                build_idmapping_index(mapping_file, index_dir, db_types)
+
+    index = IdMappingIndex(index_dir)
+    _OPEN_INDEXES[index_dir] = index
+    return index
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Compilation explicite : python idmapping_index.py <fichier idmapping> [...]
+    for path in sys.argv[1:]:
+        out = build_idmapping_index(Path(path))
+        print(f"Index compilé: {out}")
@@ -0,0 +1,464 @@
+"""
+Instrumentation des étapes du pipeline : durées, CPU, mémoire, lignes et octets.
+
+Chaque étape, ou sous-étape, est un bloc mesuré :
+
+    with stage("HCN", detail=network):
+        ...
+        count(rows_in=len(ppi), rows_out=len(scores))
+
+ou une fonction décorée par @traced("HCN", detail="ppi_file"). Les blocs
+s'imbriquent. À la sortie d'un bloc, on enregistre :
+- le temps mur et le temps CPU du processus et de ses fils terminés (pools de
+  processus d'une étape)
+- le pic de mémoire résidente pendant le bloc. Sous Linux, VmHWM est remis à
+  zéro à l'entrée ; ailleurs, le RSS est échantillonné (psutil), à défaut on
+  prend le pic du processus.
+- les lignes en entrée et en sortie déclarées par count()
+- les octets lus et écrits par le processus (compteurs d'E/S du système)
+
+Les enregistrements sont ajoutés à une trace JSON-lines : TRACE_FILE, ou la
+variable d'environnement PIPELINE_TRACE. Un tableau les résume en fin
+d'exécution.
+
+Un profileur peut être attaché aux blocs de plus haut niveau dont le nom
+correspond à PROFILE_STAGES. Il se choisit par PROFILER ('cprofile' ou
+'sampling') ou par la variable PIPELINE_PROFILE. Il écrit dans PROFILE_DIR un
+profil .prof, ou des piles repliées .folded (format flamegraph).
+
+    python instrumentation.py trace.jsonl [--run ID] [--depth N]
+"""
+
+import argparse
+import atexit
+import cProfile
+import fnmatch
+import functools
+import inspect
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Configuration (les variables d'environnement suivent les étapes dans les processus du pool)
+TRACE_FILE = os.environ.get("PIPELINE_TRACE") or None
+PROFILER = os.environ.get("PIPELINE_PROFILE") or None  # None, 'cprofile' ou 'sampling'
+PROFILE_DIR = Path(os.environ.get("PIPELINE_PROFILE_DIR") or "profiles")
+PROFILE_STAGES = os.environ.get("PIPELINE_PROFILE_STAGES") or "*"
+RUN_ID = os.environ.get("PIPELINE_RUN_ID") or f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+PRINT_SUMMARY = True
+SUMMARY_DEPTH = 1
+
+SAMPLING_INTERVAL = 0.005
+MEMORY_SAMPLING_INTERVAL = 0.02
+
+MB = 1024 * 1024
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def current_rss() -> Optional[int]:
+    """Mémoire résidente du processus (octets), None si indisponible"""
+    try:
+        with open("/proc/self/statm", 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+
+def io_counters() -> Optional[Tuple[int, int]]:
+    """(octets lus, octets écrits) par le processus depuis son lancement, None si indisponible"""
+    try:
+        with open("/proc/self/io", 'r') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        pass
+    if psutil is not None:
+        try:
+            counters = psutil.Process().io_counters()
+            return (getattr(counters, 'read_chars', counters.read_bytes),
+                    getattr(counters, 'write_chars', counters.write_bytes))
+        except (AttributeError, psutil.Error):
+            pass
+    return None
+
+
+class PeakMemory:
+    """
+    Pic de mémoire résidente depuis la dernière remise à zéro, par la meilleure
+    méthode disponible :
+    - 'hwm' : VmHWM de /proc/self/status, remis à zéro par /proc/self/clear_refs
+    - 'sampling' : RSS échantillonné par un thread (psutil)
+    - 'process' : pic du processus depuis son lancement (getrusage), sans remise à zéro
+    """
+
+    def __init__(self):
+        self.mode = self._detect()
+        self._sampled = 0
+        self._sampler = None
+
+    @staticmethod
+    def _detect() -> Optional[str]:
+        try:
+            with open("/proc/self/clear_refs", 'w') as f:
+                f.write("5")
+            if PeakMemory._hwm() is not None:
+                return 'hwm'
+        except OSError:
+            pass
+        if psutil is not None:
+            return 'sampling'
+        if resource is not None:
+            return 'process'
+        return None
+
+    @staticmethod
+    def _hwm() -> Optional[int]:
+        try:
+            with open("/proc/self/status", 'r') as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _sample(self):
+        while True:
+            rss = current_rss() or 0
+            if rss > self._sampled:
+                self._sampled = rss
+            time.sleep(MEMORY_SAMPLING_INTERVAL)
+
+    def reset(self):
+        if self.mode == 'hwm':
+            try:
+                with open("/proc/self/clear_refs", 'w') as f:
+                    f.write("5")
+            except OSError:
+                pass
+        elif self.mode == 'sampling':
+            self._sampled = current_rss() or 0
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name="memory-sampler",
+                                                 daemon=True)
+                self._sampler.start()
+
+    def peak(self) -> Optional[int]:
+        if self.mode == 'hwm':
+            return self._hwm()
+        if self.mode == 'sampling':
+            return max(self._sampled, current_rss() or 0)
+        if self.mode == 'process':
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == 'darwin' else peak * 1024
+        return None
+
+
+class SamplingProfiler:
+    """Profileur par échantillonnage de la pile d'un thread, en piles repliées (flamegraph)"""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLING_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path: Path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, samples in self.stacks.most_common():
+                f.write(f"{stack} {samples}\n")
+
+
+class Span:
+    """Bloc mesuré en cours (étape ou sous-étape)"""
+
+    def __init__(self, name: str, detail: Optional[str] = None, parent: Optional['Span'] = None):
+        self.name = name
+        self.detail = detail
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        label = f"{name}[{detail}]" if detail else name
+        self.path = f"{parent.path}/{label}" if parent is not None else label
+        self.rows_in: Optional[int] = None
+        self.rows_out: Optional[int] = None
+        self.peak = 0
+
+    def count(self, rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+        """Ajoute des lignes lues et produites au bloc"""
+        if rows_in is not None:
+            self.rows_in = (self.rows_in or 0) + int(rows_in)
+        if rows_out is not None:
+            self.rows_out = (self.rows_out or 0) + int(rows_out)
+
+
+_memory = PeakMemory()
+_stack: List[Span] = []
+_records: List[Dict] = []
+_profiling = False
+
+
+def _file_label(value) -> str:
+    text = os.fspath(value) if isinstance(value, os.PathLike) else str(value)
+    return Path(text).stem if isinstance(value, os.PathLike) or os.sep in text or '/' in text else text
+
+
+def _start_profiler(span: Span):
+    global _profiling
+    if PROFILER is None or _profiling or not fnmatch.fnmatchcase(span.name, PROFILE_STAGES):
+        return None
+    if PROFILER == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif PROFILER == 'sampling':
+        profiler = SamplingProfiler(threading.get_ident())
+        profiler.start()
+    else:
+        raise ValueError(f"Profileur inconnu: {PROFILER} (disponibles: cprofile, sampling)")
+    _profiling = True
+    return profiler
+
+
+def _stop_profiler(profiler, span: Span) -> Optional[str]:
+    global _profiling
+    if profiler is None:
+        return None
+    _profiling = False
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    name = re.sub(r'[^\w.-]+', '_', span.path)
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        path = PROFILE_DIR / f"{name}_{os.getpid()}.prof"
+        profiler.dump_stats(path)
+    else:
+        profiler.stop()
+        path = PROFILE_DIR / f"{name}_{os.getpid()}.folded"
+        profiler.save(path)
+    return str(path)
+
+
+def _emit(record: Dict):
+    _records.append(record)
+    if TRACE_FILE:
+        Path(TRACE_FILE).parent.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        # Une écriture par ligne en mode ajout : les processus du pool partagent la trace
+        fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+def _cpu_time() -> float:
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _mb(value: Optional[int]) -> Optional[float]:
+    return round(value / MB, 1) if value is not None else None
+
+
+@contextmanager
+def stage(name: str, detail: Optional[str] = None) -> Iterator[Span]:
+    """Mesure un bloc (étape, ou sous-étape s'il est imbriqué dans un autre)"""
+    parent = _stack[-1] if _stack else None
+    span = Span(name, detail, parent)
+    if parent is not None:
+        parent.peak = max(parent.peak, _memory.peak() or 0)
+    _memory.reset()
+    rss_start = current_rss()
+    io_start = io_counters()
+    started = time.time()
+    wall_start, cpu_start = time.perf_counter(), _cpu_time()
+    profiler = _start_profiler(span)
+
+    _stack.append(span)
+    status, error = 'ok', None
+    try:
+        yield span
+    except BaseException as e:
+        status, error = 'failed', f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _stack.pop()
+        wall, cpu = time.perf_counter() - wall_start, _cpu_time() - cpu_start
+        profile_file = _stop_profiler(profiler, span)
+        span.peak = max(span.peak, _memory.peak() or 0)
+        if parent is not None:
+            parent.peak = max(parent.peak, span.peak)
+        io_end = io_counters()
+        _emit({
+            'run': RUN_ID,
+            'pid': os.getpid(),
+            'stage': span.path,
+            'name': name,
+            'detail': detail,
+            'depth': span.depth,
+            'start': round(started, 3),
+            'wall_s': round(wall, 4),
+            'cpu_s': round(cpu, 4),
+            'peak_rss_mb': _mb(span.peak or None),
+            'rss_start_mb': _mb(rss_start),
+            'rss_end_mb': _mb(current_rss()),
+            'memory_mode': _memory.mode,
+            'rows_in': span.rows_in,
+            'rows_out': span.rows_out,
+            'bytes_read': io_end[0] - io_start[0] if io_start and io_end else None,
+            'bytes_written': io_end[1] - io_start[1] if io_start and io_end else None,
+            'status': status,
+            'error': error,
+            'profile': profile_file,
+        })
+
+
+def traced(name: Optional[str] = None, detail: Optional[str] = None):
+    """
+    Décorateur : chaque appel de la fonction est un bloc mesuré, nommé `name`
+    (nom de la fonction par défaut). `detail` désigne un paramètre dont la
+    valeur distingue les appels (nom de réseau, fichier : on garde son nom sans
+    extension).
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+        signature = inspect.signature(func) if detail else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            label = None
+            if signature is not None:
+                bound = signature.bind_partial(*args, **kwargs)
+                bound.apply_defaults()
+                value = bound.arguments.get(detail)
+                label = _file_label(value) if value is not None else None
+            with stage(stage_name, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+    """Déclare des lignes lues / produites dans le bloc en cours (sans effet hors bloc)"""
+    if _stack:
+        _stack[-1].count(rows_in, rows_out)
+
+
+def records() -> List[Dict]:
+    """Enregistrements de ce processus"""
+    return list(_records)
+
+
+def load_trace(path, run: Optional[str] = None) -> List[Dict]:
+    """Enregistrements d'une trace JSON-lines, pour une exécution (par défaut la dernière)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if run is None and entries:
+        run = max(entries, key=lambda r: r['start'])['run']
+    return [r for r in entries if r['run'] == run]
+
+
+def _format_number(value, unit: str = '') -> str:
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:,.1f}{unit}"
+    return f"{value:,}{unit}"
+
+
+def summary_table(entries: List[Dict], max_depth: int = SUMMARY_DEPTH) -> str:
+    """Tableau des blocs (jusqu'à max_depth niveaux d'imbrication), dans l'ordre de lancement"""
+    rows = [r for r in entries if r['depth'] <= max_depth]
+    rows.sort(key=lambda r: (r['start'], r['depth']))
+    header = (f"{'étape':<48} {'mur (s)':>9} {'CPU (s)':>9} {'pic RSS (Mo)':>12} "
+              f"{'lignes entrée':>14} {'lignes sortie':>14} {'lu (Mo)':>9} {'écrit (Mo)':>10}")
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        label = "  " * r['depth'] + (r['stage'].rsplit('/', 1)[-1])
+        if r['status'] != 'ok':
+            label += " (échec)"
+        read = r['bytes_read'] / MB if r.get('bytes_read') is not None else None
+        written = r['bytes_written'] / MB if r.get('bytes_written') is not None else None
+        lines.append(f"{label[:48]:<48} {r['wall_s']:>9.2f} {r['cpu_s']:>9.2f} "
+                     f"{_format_number(r['peak_rss_mb']):>12} {_format_number(r['rows_in']):>14} "
+                     f"{_format_number(r['rows_out']):>14} {_format_number(read):>9} "
+                     f"{_format_number(written):>10}")
+    top = [r for r in entries if r['depth'] == 0]
+    if top:
+        lines.append("-" * len(header))
+        peak = max((r['peak_rss_mb'] or 0) for r in top)
+        lines.append(f"{'total (' + str(len(top)) + ' étapes)':<48} "
+                     f"{sum(r['wall_s'] for r in top):>9.2f} {sum(r['cpu_s'] for r in top):>9.2f} "
+                     f"{peak:>12,.1f}")
+    return "\n".join(lines)
+
+
+def print_summary(entries: Optional[List[Dict]] = None, max_depth: int = SUMMARY_DEPTH):
+    entries = records() if entries is None else entries
+    if entries:
+        print("\nRésumé de l'instrumentation:")
+        print(summary_table(entries, max_depth))
+
+
+@atexit.register
+def _summary_at_exit():
+    if PRINT_SUMMARY and _records:
+        print_summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résumé d'une trace d'instrumentation")
+    parser.add_argument("trace", type=Path)
+    parser.add_argument("--run", help="identifiant d'exécution (défaut : la dernière)")
+    parser.add_argument("--depth", type=int, default=SUMMARY_DEPTH,
+                        help="niveaux de sous-étapes affichés")
+    options = parser.parse_args()
+    global PRINT_SUMMARY
+    PRINT_SUMMARY = False
+    entries = load_trace(options.trace, options.run)
+    if not entries:
+        print(f"Trace vide: {options.trace}")
+        return
+    print(f"Exécution {entries[0]['run']} ({len(entries)} blocs)")
+    print(summary_table(entries, options.depth))
+
+
+if __name__ == "__main__":
+    main()
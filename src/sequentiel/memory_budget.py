@@ -0,0 +1,252 @@
+"""
+Mode à budget mémoire : chaque étape choisit son algorithme d'après un budget en octets.
+
+Le budget est MEMORY_BUDGET, lu dans la variable d'environnement
+PIPELINE_MEMORY_BUDGET ("16G", "512M", ou un nombre d'octets) ; sans budget,
+les étapes gardent leur chemin en mémoire. Avec un budget, une étape estime
+avant tout calcul :
+- la mémoire de son chemin en mémoire (lecture complète, matrices denses...)
+- la partie incompressible de son chemin par blocs (vocabulaire, matrice
+  d'incidence, adjacence creuse) et le coût de chaque ligne d'un bloc
+Si le chemin en mémoire tient dans le budget, il est pris ; sinon l'étape
+travaille par blocs dont la taille est déduite de la place restante ; si même la
+partie incompressible ne tient pas, BudgetExceeded est levée avec l'estimation.
+
+Seule une fraction SAFETY du budget est planifiée : les estimations sont
+grossières et pandas fait des copies temporaires.
+
+Pour la déduplication au-delà de la mémoire, SortedRuns trie les clés par
+segments écrits sur disque (SPILL_DIR) puis les fusionne par blocs bornés.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+KB, MB, GB = 1 << 10, 1 << 20, 1 << 30
+UNITS = {'': 1, 'k': KB, 'm': MB, 'g': GB, 't': 1 << 40}
+
+
+def parse_size(value) -> Optional[int]:
+    """Taille en octets d'une valeur "16G", "1.5GB", "512M", "2GiB" ou d'un nombre (None si vide)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([kmgt]?)(?:i?b)?\s*', str(value).lower())
+    if match is None:
+        raise ValueError(f"Taille invalide: {value!r} (exemples: 16G, 512M, 1073741824)")
+    return int(float(match.group(1)) * UNITS[match.group(2)])
+
+
+def format_size(n_bytes: float) -> str:
+    for unit, size in (('Go', GB), ('Mo', MB), ('Ko', KB)):
+        if n_bytes >= size:
+            return f"{n_bytes / size:.1f} {unit}"
+    return f"{int(n_bytes)} o"
+
+
+MEMORY_BUDGET: Optional[int] = parse_size(os.environ.get("PIPELINE_MEMORY_BUDGET"))
+SPILL_DIR: Optional[str] = os.environ.get("PIPELINE_SPILL_DIR") or None  # None : dossier temporaire
+SAFETY = 0.8
+MIN_BLOCK_ROWS = 10_000
+
+IN_MEMORY = 'memoire'
+BLOCKED = 'blocs'
+
+
+class BudgetExceeded(MemoryError):
+    """Le chemin par blocs d'une étape ne tient pas dans le budget mémoire"""
+
+    def __init__(self, stage: str, required: int, budget: int):
+        self.stage, self.required, self.budget = stage, required, budget
+        super().__init__(
+            f"{stage}: {format_size(required)} estimés au minimum pour un budget de "
+            f"{format_size(budget)} ({format_size(budget * SAFETY)} planifiables) ; "
+            f"augmenter PIPELINE_MEMORY_BUDGET ou la mémoire de l'étape")
+
+
+class Estimate(NamedTuple):
+    rows: int          # lignes à traiter (arêtes)
+    in_memory: int     # octets du chemin en mémoire
+    fixed: int         # octets incompressibles du chemin par blocs
+    per_row: int       # octets par ligne d'un bloc
+
+
+class Plan(NamedTuple):
+    stage: str
+    mode: str          # IN_MEMORY ou BLOCKED
+    block_rows: int    # lignes par bloc (toutes en mémoire)
+    estimate: Optional[Estimate]
+
+    @property
+    def blocked(self) -> bool:
+        return self.mode == BLOCKED
+
+
+def current_budget(budget: Optional[int] = None) -> Optional[int]:
+    return MEMORY_BUDGET if budget is None else budget
+
+
+def usable(budget: int) -> int:
+    return int(budget * SAFETY)
+
+
+def plan(stage: str, estimate: Callable[[], Estimate], budget: Optional[int] = None) -> Plan:
+    """
+    Choisit le chemin d'une étape. `estimate` n'est appelé que si un budget est
+    fixé (l'estimation peut demander une passe sur les données).
+    """
+    budget = current_budget(budget)
+    if budget is None:
+        return Plan(stage, IN_MEMORY, 0, None)
+    sizes = estimate()
+    available = usable(budget)
+    if sizes.in_memory <= available:
+        return Plan(stage, IN_MEMORY, max(sizes.rows, 1), sizes)
+
+    minimum = sizes.fixed + sizes.per_row * MIN_BLOCK_ROWS
+    if minimum > available:
+        raise BudgetExceeded(stage, minimum, budget)
+    block_rows = max(MIN_BLOCK_ROWS, (available - sizes.fixed) // max(sizes.per_row, 1))
+    block_rows = int(min(block_rows, max(sizes.rows, 1)))
+    print(f"{stage}: {format_size(sizes.in_memory)} estimés en mémoire > "
+          f"{format_size(available)} planifiables : calcul par blocs de {block_rows:,} lignes "
+          f"({format_size(sizes.fixed)} fixes)")
+    return Plan(stage, BLOCKED, block_rows, sizes)
+
+
+def require(stage: str, estimate: Callable[[], int], budget: Optional[int] = None):
+    """
+    Échec immédiat si une étape sans chemin par blocs dépasse le budget
+    (`estimate` : octets nécessaires, appelé seulement si un budget est fixé).
+    """
+    budget = current_budget(budget)
+    if budget is None:
+        return
+    required = estimate()
+    if required > usable(budget):
+        raise BudgetExceeded(stage, required, budget)
+
+
+class SortedRuns:
+    """
+    Tri externe de clés uint64, avec des colonnes associées.
+
+    Les blocs ajoutés s'accumulent jusqu'à run_rows lignes, puis sont triés,
+    dédupliqués et écrits en segment (.npy) sur disque. merge() fusionne les
+    segments par blocs d'au plus block_rows lignes, en ordre de clé croissant,
+    et garde pour chaque clé la première occurrence dans l'ordre d'ajout. Un
+    seul segment reste en mémoire, sans passer par le disque.
+
+        with SortedRuns(run_rows) as runs:
+            for block in blocks:
+                runs.add(keys, {'score': values})
+            for keys, columns in runs.merge(block_rows):
+                ...
+    """
+
+    def __init__(self, run_rows: int, directory: Optional[str] = None):
+        self.run_rows = max(int(run_rows), 1)
+        self.directory = directory if directory is not None else SPILL_DIR
+        self._tmp: Optional[Path] = None
+        self._pending: List[Tuple[np.ndarray, Dict[str, np.ndarray]]] = []
+        self._pending_rows = 0
+        self._runs: List[Dict[str, Path]] = []
+
+    def __enter__(self) -> 'SortedRuns':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._tmp is not None:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+            self._tmp = None
+
+    def add(self, keys: np.ndarray, columns: Optional[Dict[str, np.ndarray]] = None):
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(keys):
+            return
+        self._pending.append((keys, {name: np.asarray(v) for name, v in (columns or {}).items()}))
+        self._pending_rows += len(keys)
+        if self._pending_rows >= self.run_rows:
+            self._spill()
+
+    def _sorted_pending(self) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Segment en attente trié, première occurrence de chaque clé"""
+        keys = np.concatenate([k for k, _ in self._pending])
+        names = list(self._pending[0][1])
+        columns = {name: np.concatenate([c[name] for _, c in self._pending]) for name in names}
+        self._pending, self._pending_rows = [], 0
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        rows = order[first]
+        return keys[first], {name: values[rows] for name, values in columns.items()}
+
+    def _spill(self):
+        keys, columns = self._sorted_pending()
+        if self._tmp is None:
+            self._tmp = Path(tempfile.mkdtemp(prefix="runs_", dir=self.directory))
+        run = {'keys': self._tmp / f"run{len(self._runs)}_keys.npy"}
+        np.save(run['keys'], keys)
+        for name, values in columns.items():
+            run[name] = self._tmp / f"run{len(self._runs)}_{name}.npy"
+            np.save(run[name], values)
+        self._runs.append(run)
+
+    def merge(self, block_rows: int) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        """Blocs (clés triées uniques, colonnes) de la fusion des segments"""
+        block_rows = max(int(block_rows), 1)
+        if not self._runs:
+            if self._pending:
+                keys, columns = self._sorted_pending()
+                for start in range(0, len(keys), block_rows):
+                    yield keys[start:start + block_rows], {
+                        name: values[start:start + block_rows] for name, values in columns.items()}
+            return
+        if self._pending:
+            self._spill()
+
+        runs = [{name: np.load(path, mmap_mode='r') for name, path in run.items()}
+                for run in self._runs]
+        names = [name for name in runs[0] if name != 'keys']
+        positions = [0] * len(runs)
+        step = max(block_rows // len(runs), 1)
+        while True:
+            active = [r for r, run in enumerate(runs) if positions[r] < len(run['keys'])]
+            if not active:
+                return
+            # Frontière : plus petite dernière clé des fenêtres des segments non épuisés par
+            # leur fenêtre ; au-delà, un segment peut encore contenir des clés plus petites
+            windows = {r: runs[r]['keys'][positions[r]:positions[r] + step] for r in active}
+            bounded = [windows[r][-1] for r in active if positions[r] + step < len(runs[r]['keys'])]
+            frontier = min(bounded) if bounded else None
+
+            parts, origin = [], []
+            for r in active:
+                window = windows[r]
+                taken = len(window) if frontier is None else int(
+                    np.searchsorted(window, frontier, side='right'))
+                if taken:
+                    parts.append((r, positions[r], taken))
+                    origin.append(np.full(taken, r, dtype=np.int32))
+                    positions[r] += taken
+            keys = np.concatenate([np.asarray(runs[r]['keys'][p:p + n]) for r, p, n in parts])
+            origin = np.concatenate(origin)
+            order = np.lexsort((origin, keys))
+            keys = keys[order]
+            first = np.ones(len(keys), dtype=bool)
+            first[1:] = keys[1:] != keys[:-1]
+            rows = order[first]
+            columns = {name: np.concatenate([np.asarray(runs[r][name][p:p + n]) for r, p, n in parts])[rows]
+                       for name in names}
+            yield keys[first], columns
@@ -0,0 +1,315 @@
+"""
+Mise à jour incrémentale des réseaux après une nouvelle version des sources.
+
+Quand STRING, BioGRID ou DIP publient une nouvelle version, seule une petite
+part des arêtes change. Au lieu de relancer tout le pipeline, la nouvelle
+liste d'arêtes filtrée est comparée à la version en place (clés uint64 sur le
+vocabulaire d'espèce, commun aux deux versions, voir edge_store.py) :
+- FS, SL et co-expression sont des scores de paire : les lignes des arêtes
+  conservées sont reprises, seules les paires nouvelles sont calculées
+- HCN dépend des voisinages des deux extrémités : il est recalculé pour les
+  arêtes qui touchent une protéine dont les voisins ont changé (à un saut
+  des arêtes ajoutées ou retirées), repris pour les autres
+- la table de scores et le réseau pondéré sont mis à jour sur place
+  (Weighted_PPI_Network.patch_score_table), puis les fichiers de complexes :
+  seuls les complexes qui contiennent une protéine dont les arêtes pondérées
+  ont changé sont re-testés
+
+La nouvelle version filtrée est attendue à côté de l'actuelle
+(interactions/<réseau>.nouveau, binaire ou texte) ou passée en argument :
+    python mise_a_jour_incrementale.py STRING_humain BIOGRID_levure=/chemin/nouveau.edges
+Une version écrite ailleurs est recodée par identifiant sur le vocabulaire de
+la version en place. Elle remplace la version en place une fois les scores mis à jour.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from edge_keys import unpack_pairs
+from edge_store import (EdgeSet, ProteinVocabulary, as_edge_set, binary_path, edges_exist,
+                        save_edges, text_path)
+from instrumentation import count, traced
+
+# Configuration des chemins
+DATA_DIR = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data")
+CLEAN_DATA_DIR = DATA_DIR / "clean data"
+INTERACTIONS_DIR = CLEAN_DATA_DIR / "interactions"
+SIMILARITY_DIR = CLEAN_DATA_DIR / "autres"
+WEIGHTED_DIR = CLEAN_DATA_DIR / "weighted_networks"
+SCORE_TABLE_DIR = CLEAN_DATA_DIR / "score_tables"
+COMPLEXES_DIR = CLEAN_DATA_DIR / "complexes"
+
+NEW_RELEASE_SUFFIX = ".nouveau"
+
+NETWORKS = ["STRING_humain", "BIOGRID_humain", "STRING_levure", "BIOGRID_levure", "DIP_levure"]
+
+# Sources de scores de paire : canal -> motif du fichier
+PAIR_SCORES = {
+    'FS': "FS_{}.txt",
+    'SL': "SL_{}.txt",
+    'CO': "coexpression_{}.txt",
+}
+HCN_FILE = "HCN_scores_{}.txt"
+
+INTERACTION_OPTIONS = {'header': None, 'usecols': [0, 1], 'dtype': str}
+
+
+class NetworkDelta(NamedTuple):
+    network: str
+    added: int
+    removed: int
+    changed_proteins: int
+    rescored_edges: int
+    weighted_changed: np.ndarray  # protéines dont les arêtes pondérées ont changé
+
+
+def diff_edges(old: EdgeSet, new: EdgeSet) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clés triées des arêtes ajoutées et retirées entre deux versions d'un
+    réseau codées sur le même vocabulaire d'espèce.
+    """
+    if not (new.vocabulary.extends(old.vocabulary) or old.vocabulary.extends(new.vocabulary)):
+        raise ValueError("Versions codées sur des vocabulaires différents")
+    old_keys, new_keys = np.unique(old.keys()), np.unique(new.keys())
+    return (np.setdiff1d(new_keys, old_keys, assume_unique=True),
+            np.setdiff1d(old_keys, new_keys, assume_unique=True))
+
+
+def on_vocabulary(edges: EdgeSet, vocabulary: ProteinVocabulary) -> EdgeSet:
+    """
+    Jeu d'arêtes codé sur `vocabulary` ou sur un vocabulaire qui le prolonge :
+    rendu tel quel si c'est déjà le cas, sinon recodé par identifiant (version
+    écrite hors du dossier des interactions, sur son propre vocabulaire).
+    """
+    if edges.vocabulary.extends(vocabulary) or vocabulary.extends(edges.vocabulary):
+        return edges
+    return EdgeSet.from_frame(edges.to_frame(), vocabulary)
+
+
+def endpoints(keys: np.ndarray) -> np.ndarray:
+    """Codes des protéines extrémités d'un ensemble de clés"""
+    low, high = unpack_pairs(keys)
+    return np.unique(np.concatenate([low, high]))
+
+
+def unique_edges(edges: EdgeSet) -> EdgeSet:
+    """Une ligne par arête non orientée (première occurrence, ordre du fichier)"""
+    _, first = np.unique(edges.keys(), return_index=True)
+    return edges.select(np.sort(first))
+
+
+def configure_modules():
+    """Aligne les dossiers des scripts d'étape sur ceux de la mise à jour"""
+    weighted = importlib.import_module("Weighted_PPI_Network")
+    weighted.INTERACTIONS_DIR = INTERACTIONS_DIR
+    weighted.SIMILARITY_DIR = SIMILARITY_DIR
+    weighted.OUTPUT_DIR = WEIGHTED_DIR
+    weighted.SCORE_TABLE_DIR = SCORE_TABLE_DIR
+
+
+def fs_scorer(network: str) -> Callable[[pd.DataFrame], Optional[pd.DataFrame]]:
+    """Similarité fonctionnelle de paires (mêmes annotations que Functional_Similarity)"""
+    fs = importlib.import_module("Functional_Similarity")
+    go_file, is_human = fs.NETWORKS[network]
+    mapping_index = None if is_human else fs.load_mapping(fs.MAPPING_FILE)
+    go_annotations = fs.load_go_slim(Path(go_file), is_human=is_human, mapping_index=mapping_index)
+    return lambda pairs: fs.score_interactions(fs.clean_interactions(pairs), go_annotations)
+
+
+def sl_scorer(network: str) -> Callable[[pd.DataFrame], Optional[pd.DataFrame]]:
+    """Similarité de localisation de paires (filtrage_Subcellular_localization_data)"""
+    sl = importlib.import_module("filtrage_Subcellular_localization_data")
+    data = next(data for data in sl.NETWORKS.values() if network in data["ppi_files"])
+    proteins, incidence = sl.load_compartment_data(data["compartment_file"])
+    return lambda pairs: sl.create_sl_edges(pairs, proteins, incidence)
+
+
+def co_scorer(network: str) -> Callable[[pd.DataFrame], Optional[pd.DataFrame]]:
+    """Co-expression de paires (Co-Expression_similarity)"""
+    co = importlib.import_module("Co-Expression_similarity")
+    dataset = co.load_dataset(str(DATA_DIR), 'human' if network.endswith("humain") else 'levure')
+    if dataset is None:
+        raise FileNotFoundError(f"Données de co-expression indisponibles pour {network}")
+    mappings, expr_data = dataset
+    return lambda pairs: co.coexpression_scores(co.select_interactions(pairs, mappings), expr_data)
+
+
+SCORERS = {'FS': fs_scorer, 'SL': sl_scorer, 'CO': co_scorer}
+
+
+def patch_pair_scores(score_file: Path, kept_keys: np.ndarray, added: EdgeSet,
+                      scorer: Callable[[], Callable]) -> Tuple[int, int]:
+    """
+    Met à jour une source de scores de paire : lignes des arêtes conservées
+    reprises, paires nouvelles calculées (scorer n'est construit que s'il y en a).
+
+    Returns:
+        (lignes reprises, lignes calculées)
+    """
+    old = as_edge_set(score_file)
+    keep = np.isin(old.keys(), kept_keys)
+    parts = [old.select(keep)]
+    if len(added):
+        scores = scorer()(added.to_frame())
+        if scores is not None and len(scores):
+            parts.append(EdgeSet.from_frame(scores, ProteinVocabulary.open(old.vocabulary.path),
+                                            columns=list(old.columns)))
+    patched = EdgeSet.concat(parts)
+    save_edges(patched, score_file)
+    return int(keep.sum()), len(patched) - int(keep.sum())
+
+
+def patch_hcn(hcn_file: Path, network: EdgeSet, kept_keys: np.ndarray,
+              changed: np.ndarray) -> int:
+    """
+    Met à jour les scores HCN : recalcul des arêtes du nouveau réseau qui
+    touchent une protéine dont le voisinage a changé, reprise des autres.
+
+    Returns:
+        nombre d'arêtes recalculées
+    """
+    from Common_Neighbor_similarity import hcn_for_edges
+
+    old = as_edge_set(hcn_file)
+    affected = np.isin(network.src, changed) | np.isin(network.dst, changed)
+    rescored = network.select(affected)
+    old_keys = old.keys()
+    keep = np.isin(old_keys, kept_keys) & ~np.isin(old_keys, rescored.keys())
+
+    scores = hcn_for_edges(network.src, network.dst, rescored.src, rescored.dst)
+    fresh = EdgeSet(rescored.vocabulary, rescored.src, rescored.dst, scores)
+    save_edges(EdgeSet.concat([old.select(keep), fresh]), hcn_file)
+    return len(rescored)
+
+
+def weighted_edges(network: str) -> Optional[EdgeSet]:
+    path = WEIGHTED_DIR / f"weighted_{network}.txt"
+    return as_edge_set(path, header=None) if edges_exist(path) else None
+
+
+@traced("mise_a_jour", detail="network")
+def update_network(network: str, new_file: Path) -> Optional[NetworkDelta]:
+    """Applique une nouvelle version filtrée d'un réseau à tous ses fichiers dérivés"""
+    import Weighted_PPI_Network as weighted_ppi
+
+    current = INTERACTIONS_DIR / f"{network}.txt"
+    print(f"\n=== Mise à jour {network} ===")
+    if not edges_exist(current):
+        print(f"Pas de version en place ({current.name}) : lancer le pipeline complet")
+        return None
+
+    # Le nom de la nouvelle version (ex. nouveau.edges) ne dit pas l'espèce : celle du réseau
+    species = network.rsplit("_", 1)[1]
+    old = as_edge_set(current, species=species, **INTERACTION_OPTIONS)
+    new = as_edge_set(new_file, species=species, **INTERACTION_OPTIONS)
+    new = unique_edges(on_vocabulary(new, old.vocabulary))
+    added_keys, removed_keys = diff_edges(old, new)
+    changed = endpoints(np.concatenate([added_keys, removed_keys]))
+    count(rows_in=len(new), rows_out=len(added_keys) + len(removed_keys))
+    print(f"Arêtes: {len(np.unique(old.keys())):,} -> {len(new):,} "
+          f"(+{len(added_keys):,} / -{len(removed_keys):,}), {len(changed):,} protéines touchées")
+
+    new_keys = new.keys()
+    added = new.select(np.isin(new_keys, added_keys))
+    kept_keys = np.setdiff1d(new_keys, added_keys)
+    stale_keys = np.concatenate([removed_keys, new_keys[np.isin(new.src, changed) |
+                                                       np.isin(new.dst, changed)]])
+
+    # Scores de similarité
+    rescored = 0
+    hcn_file = SIMILARITY_DIR / HCN_FILE.format(network)
+    if edges_exist(hcn_file):
+        rescored = patch_hcn(hcn_file, new, kept_keys, changed)
+        print(f"HCN: {rescored:,} arêtes recalculées")
+    for channel, pattern in PAIR_SCORES.items():
+        score_file = SIMILARITY_DIR / pattern.format(network)
+        if not edges_exist(score_file):
+            continue
+        kept, computed = patch_pair_scores(score_file, kept_keys, added,
+                                           lambda: SCORERS[channel](network))
+        print(f"{channel}: {kept:,} lignes reprises, {computed:,} calculées")
+
+    # Nouvelle version en place, puis réseau pondéré
+    save_edges(new, current, header=False)
+    if binary_path(new_file) != binary_path(current):
+        print(f"Version installée: {current.name} (source: {text_path(new_file).name})")
+
+    configure_modules()
+    before = weighted_edges(network)
+    table = weighted_ppi.patch_score_table(network, stale_keys, ProteinVocabulary.open(
+        new.vocabulary.path))
+    weighted_ppi.process_network(network, table=table)
+    after = weighted_edges(network)
+
+    weighted_changed = np.array([], dtype=str)
+    if after is not None:
+        if before is None:
+            weighted_changed = np.asarray(after.vocabulary.ids[after.nodes()], dtype=str)
+        else:
+            gained, lost = diff_edges(before, after)
+            codes = endpoints(np.concatenate([gained, lost]))
+            weighted_changed = np.asarray(after.vocabulary.ids[codes], dtype=str)
+
+    return NetworkDelta(network, len(added_keys), len(removed_keys), len(changed), rescored,
+                        weighted_changed)
+
+
+def update_complexes(deltas: List[NetworkDelta]) -> Dict[str, Dict[str, int]]:
+    """Re-teste les complexes touchés par les changements des réseaux pondérés"""
+    from filtrage_complexes_reseaux import patch_species
+
+    by_species: Dict[str, Dict[str, np.ndarray]] = {}
+    for delta in deltas:
+        name, species = delta.network.rsplit("_", 1)
+        by_species.setdefault(species, {})[name] = delta.weighted_changed
+
+    return {species: patch_species(species, changed, weighted_dir=WEIGHTED_DIR,
+                                   output_dir=COMPLEXES_DIR)
+            for species, changed in by_species.items()}
+
+
+def parse_arguments(arguments: List[str]) -> Dict[str, Path]:
+    """Réseaux à mettre à jour : RÉSEAU ou RÉSEAU=nouveau_fichier (défaut : versions .nouveau présentes)"""
+    releases = {}
+    for argument in arguments:
+        network, _, path = argument.partition("=")
+        releases[network] = Path(path) if path else INTERACTIONS_DIR / f"{network}{NEW_RELEASE_SUFFIX}"
+    if not arguments:
+        for network in NETWORKS:
+            path = INTERACTIONS_DIR / f"{network}{NEW_RELEASE_SUFFIX}"
+            if edges_exist(path):
+                releases[network] = path
+    return releases
+
+
+def main():
+    releases = parse_arguments(sys.argv[1:])
+    if not releases:
+        print(f"Aucune nouvelle version trouvée (interactions/<réseau>{NEW_RELEASE_SUFFIX})")
+        return
+
+    deltas = []
+    for network, new_file in releases.items():
+        if not edges_exist(new_file):
+            print(f"Nouvelle version absente, ignorée: {new_file}")
+            continue
+        delta = update_network(network, new_file)
+        if delta is not None:
+            deltas.append(delta)
+
+    if deltas:
+        update_complexes(deltas)
+        print("\nRésumé:")
+        for delta in deltas:
+            print(f"- {delta.network}: +{delta.added:,} / -{delta.removed:,} arêtes, "
+                  f"{delta.changed_proteins:,} protéines touchées, {delta.rescored_edges:,} HCN "
+                  f"recalculés, {len(delta.weighted_changed):,} protéines à re-tester dans les complexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Lecture des réseaux PPI pondérés produits par l'étape de pondération.
+
+Les fichiers weighted_*.txt existent avec en-tête (protein1, protein2, mean_weight,
+dossier weighted_networks) ou sans en-tête (protein1, protein2, weight, dossier
+weighted_ppi) : les deux formes sont acceptées, ainsi que le jeu binaire
+weighted_*.edges (voir edge_store.py), lu en priorité s'il existe.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from edge_store import load_edges, text_path
+
+
+def read_weighted_network(path: Path) -> pd.DataFrame:
+    """
+    Charge un réseau pondéré.
+
+    Returns:
+        DataFrame (protein1, protein2, weight) ; weight vaut 1.0 si le fichier
+        n'a que deux colonnes
+    """
+    edges = load_edges(path)
+    if edges is not None:
+        protein1, protein2 = edges.proteins()
+        weight = (next(iter(edges.columns.values())) if edges.columns
+                  else np.ones(len(edges), dtype=np.float32))
+        return pd.DataFrame({'protein1': protein1, 'protein2': protein2,
+                             'weight': np.asarray(weight, dtype=np.float32)})
+
+    df = pd.read_csv(text_path(path), sep='\t', header=None, dtype=str)
+    if df.empty:
+        return pd.DataFrame({'protein1': [], 'protein2': [], 'weight': []})
+
+    # En-tête éventuel (protein1 / Protein1)
+    if str(df.iloc[0, 0]).lower() == 'protein1':
+        df = df.iloc[1:]
+
+    protein1 = df.iloc[:, 0].str.strip()
+    protein2 = df.iloc[:, 1].str.strip()
+    if df.shape[1] >= 3:
+        weight = pd.to_numeric(df.iloc[:, 2], errors='coerce').astype(np.float32)
+    else:
+        weight = pd.Series(1.0, index=df.index, dtype=np.float32)
+
+    result = pd.DataFrame({'protein1': protein1.values, 'protein2': protein2.values,
+                           'weight': weight.values})
+    return result.dropna(subset=['protein1', 'protein2']).reset_index(drop=True)
@@ -1,55 +1,49 @@
 import sys
-from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from edge_store import read_edges, write_edges
+from idmapping_index import open_idmapping_index
+from instrumentation import count, traced
 
 def parse_mapping_file(mapping_file):
     """
-    Parse the mapping file to create a dictionary from ENSP to Uniprot IDs.
-    The mapping file is assumed to have lines with format like:
-    P31946 STRING 9606.ENSP00000361930
+    Open the shared idmapping index used to map ENSP to Uniprot IDs.
+    STRING ids (e.g. 9606.ENSP00000361930) are indexed without the taxon prefix,
+    and the first Uniprot ID of the file is kept when several are listed.
     """
-    ensembl_to_uniprot = defaultdict(list)
-    
-    with open(mapping_file, 'r') as f:
-        for line in f:
-            parts = line.strip().split('\t')
-            if len(parts) < 3:
-                continue
-            uniprot_id, db, db_id = parts[:3]
-            if db == "STRING":
-                # Extract ENSP ID from STRING format (e.g., 9606.ENSP00000361930)
-                if '.' in db_id:
-                    ensembl_id = db_id.split('.')[1]
-                    ensembl_to_uniprot[ensembl_id].append(uniprot_id)
-    
-    # Remove duplicates and convert to single value (take first Uniprot ID if multiple)
-    return {ensp: uniprots[0] for ensp, uniprots in ensembl_to_uniprot.items() if uniprots}
+    return open_idmapping_index(Path(mapping_file))
 
-def convert_interactions(input_file, output_file, mapping_dict):
+@traced("conversion")
+def convert_interactions(input_file, output_file, index):
     """
-    Convert interaction file from ENSP IDs to Uniprot IDs using the mapping dictionary.
+    Convert interaction file from ENSP IDs to Uniprot IDs using the idmapping index.
     """
-    with open(input_file, 'r') as infile, open(output_file, 'w') as outfile:
-        for line in infile:
-            parts = line.strip().split('\t')
-            if len(parts) != 2:
-                continue
-            prot1, prot2 = parts
-            uniprot1 = mapping_dict.get(prot1, prot1)  # Keep original if not found
-            uniprot2 = mapping_dict.get(prot2, prot2)
-            outfile.write(f"{uniprot1}\t{uniprot2}\n")
-
-def main():
-    
-    interactions_file = r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\STRING_humain_filtered_interactions.txt"
-    mapping_file = r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\raw data\autres\HUMAN_9606_idmapping.dat"
-    output_file = r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\STRING_humain.txt"
+    ppi = read_edges(input_file, columns=[], header=None, usecols=[0, 1],
+                     names=['protein1', 'protein2'], dtype=str).dropna()
+
+    for col in ['protein1', 'protein2']:
+        original = ppi[col].str.strip().values
+        uniprot, found = index.lookup('STRING', original)
+        ppi[col] = np.where(found, uniprot, original)  # Keep original if not found
+
+    count(rows_in=len(ppi), rows_out=len(ppi))
+    write_edges(ppi, output_file, header=False)
+
+INTERACTIONS_FILE = r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\STRING_humain_filtered_interactions.txt"
+MAPPING_FILE = r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\raw data\autres\HUMAN_9606_idmapping.dat"
+OUTPUT_FILE = r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\STRING_humain.txt"
+
+@traced("normalisation_STRING_humain")
+def main(interactions_file=INTERACTIONS_FILE, mapping_file=MAPPING_FILE, output_file=OUTPUT_FILE):
     
     print("Parsing mapping file...")
-    mapping_dict = parse_mapping_file(mapping_file)
-    print(f"Found {len(mapping_dict)} ENSP to Uniprot mappings")
+    index = parse_mapping_file(mapping_file)
+    print(f"Found {index.count('STRING')} ENSP to Uniprot mappings")
     
     print("Converting interactions...")
-    convert_interactions(interactions_file, output_file, mapping_dict)
+    convert_interactions(interactions_file, output_file, index)
     print(f"Converted interactions written to {output_file}")
 
 if __name__ == "__main__":
@@ -1,5 +1,11 @@
 import os
-from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+
+from edge_store import read_edges, write_edges
+from idmapping_index import open_idmapping_index
+from instrumentation import count, traced
 
 # Chemins des fichiers
 interactions_file = r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\STRING_levure.temp"
@@ -7,63 +13,36 @@ mapping_file = r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\raw data\autres\
 output_file = r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data\interactions\STRING_levure.txt"
 
 def create_mapping_dict(mapping_file):
-    """Crée un dictionnaire de mapping STRING -> UniProt et inversement"""
-    str_to_uniprot = defaultdict(list)
-    uniprot_to_str = defaultdict(list)
-    
-    with open(mapping_file, 'r') as f:
-        for line in f:
-            parts = line.strip().split('\t')
-            if len(parts) >= 3:
-                uniprot_id = parts[0]
-                db_type = parts[1]
-                external_id = parts[2]
-
-                if db_type == "STRING":
-                    # Supprimer le préfixe '4932.' si présent
-                    if external_id.startswith("4932."):
-                        external_id = external_id.replace("4932.", "")
-                    str_to_uniprot[external_id].append(uniprot_id)
-                    uniprot_to_str[uniprot_id].append(external_id)
-    
-    return str_to_uniprot
+    """Ouvre l'index idmapping partagé (STRING -> UniProt, préfixe '4932.' retiré)"""
+    return open_idmapping_index(Path(mapping_file))
 
-def process_interactions(interactions_file, str_to_uniprot):
+def process_interactions(interactions_file, index):
     """Traite le fichier d'interactions"""
-    interactions = []
-    missing_mappings = set()
-    
-    with open(interactions_file, 'r') as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) >= 2:
-                prot1, prot2 = parts[0], parts[1]
-                
-                # Vérifier si les protéines existent dans le mapping
-                mapped1 = str_to_uniprot.get(prot1, [None])[0]
-                mapped2 = str_to_uniprot.get(prot2, [None])[0]
-                
-                if mapped1 and mapped2:
-                    interactions.append((mapped1, mapped2))
-                else:
-                    if not mapped1:
-                        missing_mappings.add(prot1)
-                    if not mapped2:
-                        missing_mappings.add(prot2)
-    
-    return interactions
+    ppi = read_edges(interactions_file, columns=[], sep=r'\s+', header=None, usecols=[0, 1],
+                     names=['protein1', 'protein2'], dtype=str)
+
+    # Conversion vectorisée des deux colonnes
+    mapped1, found1 = index.lookup('STRING', ppi['protein1'].values)
+    mapped2, found2 = index.lookup('STRING', ppi['protein2'].values)
+
+    # Vérifier si les protéines existent dans le mapping
+    keep = found1 & found2
+    count(rows_in=len(ppi), rows_out=int(keep.sum()))
+    missing_mappings = set(ppi['protein1'].values[~found1]) | set(ppi['protein2'].values[~found2])
+
+    return list(zip(mapped1[keep], mapped2[keep]))
 
+@traced("normalisation_STRING_levure")
 def main():
-    # 1. Créer le dictionnaire de mapping
-    str_to_uniprot = create_mapping_dict(mapping_file)
+    # 1. Ouvrir l'index de mapping (compilé au premier passage)
+    index = create_mapping_dict(mapping_file)
     
     # 2. Traiter les interactions
-    filtered_interactions = process_interactions(interactions_file, str_to_uniprot)
+    filtered_interactions = process_interactions(interactions_file, index)
     
     # 3. Sauvegarder les résultats
-    with open(output_file, 'w') as f:
-        for prot1, prot2 in filtered_interactions:
-            f.write(f"{prot1}\t{prot2}\n")
+    write_edges(pd.DataFrame(filtered_interactions, columns=['protein1', 'protein2']),
+                output_file, header=False)
 
     # 4. Calcul des statistiques
     unique_proteins = set()
@@ -0,0 +1,447 @@
+"""
+Exécution parallèle des étapes du pipeline séquentiel décrites dans un fichier JSON.
+
+Chaque étape déclare la fonction à appeler ("module:fonction" et ses arguments),
+ses fichiers d'entrée et de sortie, et ses besoins (cœurs, mémoire en Go). Les
+dépendances se déduisent des fichiers : une étape dépend de celles qui
+produisent ses entrées. Le graphe (DAG) est exécuté sur un pool de processus :
+- une étape est lancée dès que ses dépendances ont réussi, si le budget de
+  cœurs et de mémoire le permet (une étape plus grosse que le budget part seule)
+- parmi les étapes prêtes, la priorité va au plus long chemin restant (durées
+  mesurées au passage précédent, sinon l'estimation "cost" de la configuration)
+- l'échec d'une étape annule ses descendantes, les branches indépendantes continuent
+En fin d'exécution, le chemin critique (plus longue chaîne de dépendances en
+temps mesuré) et le temps total sont affichés.
+
+Chaque étape est instrumentée (module instrumentation) : les processus du pool
+ajoutent leurs mesures, sous-étapes comprises, à une trace JSON-lines commune
+(à côté de la configuration par défaut), résumée en fin d'exécution. --profile
+attache un profileur (cprofile ou sampling) à chaque étape.
+
+Avec --budgeted, la mémoire déclarée d'une étape (memory_gb, bornée par le
+budget global) devient son budget mémoire (memory_budget.py) : les étapes qui
+le permettent passent en calcul par blocs, les autres échouent d'emblée avec
+leur estimation.
+
+Format de la configuration (voir pipeline.json) :
+    "vars"   : variables de chemin, substituées dans les chaînes "{nom}"
+    "sets"   : listes de jeux de variables, pour répéter une étape ("foreach")
+    "budget" : {"cpus": ..., "memory_gb": ...}
+    "stages" : [{"name", "call", "args", "globals", "inputs", "outputs",
+                 "cpus", "memory_gb", "cost", "after", "foreach"}]
+"globals" remplace des constantes de module (dossiers codés en dur dans les
+scripts) dans le processus qui exécute l'étape, le temps de l'étape : les
+valeurs d'origine sont rétablies ensuite, les processus du pool étant
+réutilisés d'une étape à l'autre. Les constantes calculées à l'import à
+partir d'une constante remplacée ne suivent pas : préférer "args" quand la
+fonction prend le chemin en paramètre.
+
+Utilisation :
+    python pipeline.py [pipeline.json] [--cpus N] [--memory-gb M] [--dry-run]
+                       [--trace FICHIER] [--profile {cprofile,sampling}] [--budgeted]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import re
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import instrumentation
+import memory_budget
+
+CONFIG_FILE = Path(__file__).with_name("pipeline.json")
+
+# Constante absente du module avant l'étape
+_MISSING = object()
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_TEMPLATE = re.compile(r"\{\{|\}\}|\{(\w+)\}")
+
+
+class Stage:
+    """Étape du pipeline : appel d'une fonction de script, entrées et sorties déclarées"""
+
+    def __init__(self, name: str, call: str, args: Dict = None, module_globals: Dict = None,
+                 inputs: Sequence[str] = (), outputs: Sequence[str] = (), cpus: int = 1,
+                 memory_gb: float = 1.0, cost: float = 1.0, after: Sequence[str] = ()):
+        self.name = name
+        self.call = call
+        self.args = args or {}
+        self.module_globals = module_globals or {}
+        self.inputs = [os.path.normpath(p) for p in inputs]
+        self.outputs = [os.path.normpath(p) for p in outputs]
+        self.cpus = cpus
+        self.memory_gb = memory_gb
+        self.cost = cost
+        self.after = list(after)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, {self.call!r})"
+
+
+def _replacement(match, variables: Dict) -> str:
+    if match.group(1) is None:
+        return match.group(0)[0]  # "{{" -> "{", "}}" -> "}"
+    return str(variables.get(match.group(1), match.group(0)))
+
+
+def _substitute(value, variables: Dict):
+    """
+    Substitue les variables "{nom}" dans une valeur (chaînes, listes, dictionnaires) ;
+    "{{" et "}}" donnent des accolades littérales
+    """
+    if isinstance(value, str):
+        whole = _PLACEHOLDER.fullmatch(value)
+        if whole and whole.group(1) in variables and not isinstance(variables[whole.group(1)], str):
+            return variables[whole.group(1)]  # valeur non textuelle (booléen, nombre...)
+        return _TEMPLATE.sub(lambda m: _replacement(m, variables), value)
+    if isinstance(value, list):
+        return [_substitute(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: _substitute(v, variables) for k, v in value.items()}
+    return value
+
+
+def load_pipeline(config_file: Path = CONFIG_FILE) -> Tuple[List[Stage], Dict]:
+    """
+    Lit la configuration et développe les étapes répétées.
+
+    Returns:
+        (étapes, budget)
+    """
+    with open(config_file, encoding='utf-8') as f:
+        config = json.load(f)
+
+    # Les variables peuvent se référer aux précédentes
+    variables = {}
+    for name, value in config.get("vars", {}).items():
+        variables[name] = _substitute(value, variables)
+
+    stages = []
+    for spec in config["stages"]:
+        foreach = spec.get("foreach", [{}])
+        if isinstance(foreach, str):
+            foreach = config["sets"][foreach]
+        for item in foreach:
+            local = {**variables, **_substitute(item, variables)}
+            spec_values = _substitute({k: v for k, v in spec.items() if k != "foreach"}, local)
+            stages.append(Stage(
+                name=spec_values["name"],
+                call=spec_values["call"],
+                args=spec_values.get("args"),
+                module_globals=spec_values.get("globals"),
+                inputs=spec_values.get("inputs", ()),
+                outputs=spec_values.get("outputs", ()),
+                cpus=spec_values.get("cpus", 1),
+                memory_gb=spec_values.get("memory_gb", 1.0),
+                cost=spec_values.get("cost", 1.0),
+                after=spec_values.get("after", ()),
+            ))
+    return stages, config.get("budget", {})
+
+
+def build_dependencies(stages: List[Stage]) -> Dict[str, Set[str]]:
+    """
+    Dépendances de chaque étape (producteurs de ses entrées et étapes "after"),
+    avec contrôle des doublons et des cycles.
+    """
+    names = [stage.name for stage in stages]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Étapes en double: {', '.join(sorted(duplicates))}")
+
+    producer = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producer:
+                raise ValueError(f"Sortie produite par deux étapes ({producer[output]}, {stage.name}): {output}")
+            producer[output] = stage.name
+
+    dependencies = {}
+    for stage in stages:
+        unknown = set(stage.after) - set(names)
+        if unknown:
+            raise ValueError(f"{stage.name}: étapes inconnues dans 'after': {', '.join(sorted(unknown))}")
+        deps = {producer[p] for p in stage.inputs if p in producer} | set(stage.after)
+        deps.discard(stage.name)
+        dependencies[stage.name] = deps
+
+    topological_order(dependencies)
+    return dependencies
+
+
+def topological_order(dependencies: Dict[str, Set[str]]) -> List[str]:
+    """Ordre topologique (Kahn) ; ValueError si le graphe contient un cycle"""
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    order = []
+    ready = sorted(name for name, deps in remaining.items() if not deps)
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        del remaining[name]
+        for other, deps in remaining.items():
+            if name in deps:
+                deps.discard(name)
+                if not deps:
+                    ready.append(other)
+        ready.sort()
+    if remaining:
+        raise ValueError(f"Cycle de dépendances entre: {', '.join(sorted(remaining))}")
+    return order
+
+
+def longest_paths(dependencies: Dict[str, Set[str]],
+                  durations: Dict[str, float]) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Plus longs chemins pondérés par les durées.
+
+    Returns:
+        (fin au plus tôt de chaque étape depuis les sources,
+         durée restante de chaque étape jusqu'à la fin du pipeline)
+    """
+    order = topological_order(dependencies)
+    finish = {}
+    for name in order:
+        finish[name] = durations[name] + max((finish[d] for d in dependencies[name]), default=0.0)
+
+    dependents = {name: [] for name in dependencies}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(name)
+    remaining = {}
+    for name in reversed(order):
+        remaining[name] = durations[name] + max((remaining[d] for d in dependents[name]), default=0.0)
+    return finish, remaining
+
+
+def critical_path(dependencies: Dict[str, Set[str]], durations: Dict[str, float]) -> Tuple[List[str], float]:
+    """Chaîne de dépendances la plus longue (en temps) et sa durée"""
+    if not dependencies:
+        return [], 0.0
+    finish, _ = longest_paths(dependencies, durations)
+    name = max(finish, key=finish.get)
+    path = [name]
+    while dependencies[name]:
+        name = max(dependencies[name], key=finish.get)
+        path.append(name)
+    path.reverse()
+    return path, finish[path[-1]]
+
+
+def run_stage(name: str, call: str, args: Dict, module_globals: Dict,
+              budget_bytes: Optional[int] = None) -> Tuple[float, float]:
+    """
+    Exécute une étape dans un processus du pool, sous budget mémoire si
+    budget_bytes est fourni. Returns: (début, fin) en temps epoch
+    """
+    # Le résumé est fait par le processus principal, à partir de la trace
+    instrumentation.PRINT_SUMMARY = False
+    memory_budget.MEMORY_BUDGET = budget_bytes
+    start = time.time()
+    with instrumentation.stage(name):
+        module_name, function_name = call.split(':')
+        module = importlib.import_module(module_name)
+        # Valeurs d'origine, rétablies après l'étape (le processus sert aux étapes suivantes)
+        saved = {key: getattr(module, key, _MISSING) for key in module_globals}
+        try:
+            for key, value in module_globals.items():
+                # Les constantes de chemin des scripts sont des Path
+                current = saved[key]
+                setattr(module, key, Path(value) if isinstance(current, Path) else value)
+            getattr(module, function_name)(**args)
+        finally:
+            for key, value in saved.items():
+                if value is _MISSING:
+                    delattr(module, key)
+                else:
+                    setattr(module, key, value)
+    return start, time.time()
+
+
+def _guarded_run(name: str, call: str, args: Dict, module_globals: Dict,
+                 budget_bytes: Optional[int] = None):
+    try:
+        return run_stage(name, call, args, module_globals, budget_bytes), None
+    except BaseException:
+        return None, traceback.format_exc()
+
+
+def _load_durations(path: Optional[Path]) -> Dict[str, float]:
+    if path is None or not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_pipeline(stages: List[Stage], cpus: Optional[int] = None, memory_gb: Optional[float] = None,
+                 durations_file: Optional[Path] = None,
+                 budgeted: bool = False) -> Tuple[Dict[str, Dict], float]:
+    """
+    Exécute le DAG sous un budget de cœurs et de mémoire. Si budgeted, chaque
+    étape s'exécute sous un budget mémoire égal à sa mémoire déclarée.
+
+    Returns:
+        ({étape: {'status': 'ok' | 'failed' | 'skipped', 'start', 'end', 'error'}},
+         temps total en secondes)
+    """
+    cpus = cpus or os.cpu_count() or 1
+    memory_gb = memory_gb or float('inf')
+    by_name = {stage.name: stage for stage in stages}
+    dependencies = build_dependencies(stages)
+
+    # Priorité : durée restante jusqu'à la fin, d'après le passage précédent si connu
+    previous = _load_durations(durations_file)
+    estimates = {stage.name: previous.get(stage.name, stage.cost) for stage in stages}
+    _, priority = longest_paths(dependencies, estimates)
+
+    results = {}
+    pending = set(by_name)
+    running = {}
+    used_cpus, used_memory = 0, 0.0
+    t0 = time.time()
+
+    with ProcessPoolExecutor(max_workers=cpus) as pool:
+        while pending or running:
+            # Étapes dont une dépendance a échoué : annulées
+            for name in sorted(pending):
+                failed = [d for d in dependencies[name] if results.get(d, {}).get('status') in ('failed', 'skipped')]
+                if failed:
+                    results[name] = {'status': 'skipped', 'error': f"dépendance en échec: {', '.join(failed)}"}
+                    pending.discard(name)
+                    print(f"[{time.time() - t0:8.1f}s] annulée  {name}")
+
+            ready = [name for name in pending
+                     if all(results.get(d, {}).get('status') == 'ok' for d in dependencies[name])]
+            ready.sort(key=lambda name: (-priority[name], name))
+            for name in ready:
+                stage = by_name[name]
+                need_cpus = min(stage.cpus, cpus)
+                need_memory = min(stage.memory_gb, memory_gb)
+                if running and (used_cpus + need_cpus > cpus or used_memory + need_memory > memory_gb):
+                    continue
+                missing = [p for p in stage.inputs if not os.path.exists(p)]
+                if missing:
+                    results[name] = {'status': 'failed', 'error': f"entrée manquante: {missing[0]}"}
+                    pending.discard(name)
+                    print(f"[{time.time() - t0:8.1f}s] échec    {name}: entrée manquante {missing[0]}")
+                    continue
+                for output in stage.outputs:
+                    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+                budget_bytes = int(need_memory * memory_budget.GB) if budgeted else None
+                future = pool.submit(_guarded_run, stage.name, stage.call, stage.args, stage.module_globals,
+                                     budget_bytes)
+                running[future] = name
+                pending.discard(name)
+                used_cpus += need_cpus
+                used_memory += need_memory
+                print(f"[{time.time() - t0:8.1f}s] lancée   {name} ({need_cpus} cœur(s), {need_memory:g} Go)")
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                stage = by_name[name]
+                used_cpus -= min(stage.cpus, cpus)
+                used_memory -= min(stage.memory_gb, memory_gb)
+                times, error = future.result()
+                if error is None:
+                    missing = [p for p in stage.outputs if not os.path.exists(p)]
+                    if missing:
+                        error = f"sortie non produite: {missing[0]}"
+                result = {'status': 'ok' if error is None else 'failed', 'error': error}
+                if times is not None:
+                    result['start'], result['end'] = times[0] - t0, times[1] - t0
+                results[name] = result
+                state = 'terminée' if error is None else 'échec   '
+                print(f"[{time.time() - t0:8.1f}s] {state} {name}")
+                if error is not None:
+                    print(error)
+
+    wall = time.time() - t0
+    if durations_file is not None:
+        measured = {name: r['end'] - r['start'] for name, r in results.items() if r['status'] == 'ok'}
+        with open(durations_file, 'w', encoding='utf-8') as f:
+            json.dump({**previous, **measured}, f, indent=2)
+    return results, wall
+
+
+def print_plan(stages: List[Stage]):
+    """Affiche les étapes par niveau du DAG (étapes d'un même niveau indépendantes)"""
+    dependencies = build_dependencies(stages)
+    level = {}
+    for name in topological_order(dependencies):
+        level[name] = 1 + max((level[d] for d in dependencies[name]), default=-1)
+    for k in range(max(level.values(), default=-1) + 1):
+        names = sorted(name for name, l in level.items() if l == k)
+        print(f"Niveau {k} ({len(names)} étapes): {', '.join(names)}")
+
+
+def print_report(stages: List[Stage], results: Dict[str, Dict], wall: float):
+    """Durées par étape, chemin critique et temps total"""
+    dependencies = build_dependencies(stages)
+    durations = {name: r['end'] - r['start'] if 'start' in r else 0.0 for name, r in results.items()}
+
+    print("\nDurées par étape:")
+    for name in sorted(durations, key=durations.get, reverse=True):
+        print(f"- {name}: {durations[name]:.1f}s ({results[name]['status']})")
+
+    path, length = critical_path(dependencies, durations)
+    print(f"\nChemin critique ({length:.1f}s): {' -> '.join(path)}")
+    total = sum(durations.values())
+    print(f"Temps cumulé des étapes: {total:.1f}s")
+    print(f"Temps total (mur): {wall:.1f}s" + (f" (accélération x{total / wall:.2f})" if wall > 0 else ""))
+
+    failed = [name for name, r in results.items() if r['status'] != 'ok']
+    if failed:
+        print(f"Étapes en échec ou annulées: {', '.join(sorted(failed))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exécution parallèle du pipeline (DAG)")
+    parser.add_argument("config", nargs="?", type=Path, default=CONFIG_FILE)
+    parser.add_argument("--cpus", type=int, default=None, help="budget de cœurs")
+    parser.add_argument("--memory-gb", type=float, default=None, help="budget mémoire (Go)")
+    parser.add_argument("--dry-run", action="store_true", help="affiche le plan sans exécuter")
+    parser.add_argument("--trace", type=Path, default=None,
+                        help="trace JSON-lines des mesures (défaut : <config>.trace.jsonl)")
+    parser.add_argument("--profile", choices=("cprofile", "sampling"), default=None,
+                        help="profileur attaché à chaque étape")
+    parser.add_argument("--budgeted", action="store_true",
+                        help="mémoire déclarée des étapes appliquée comme budget (calcul par blocs)")
+    options = parser.parse_args()
+
+    stages, budget = load_pipeline(options.config)
+    print_plan(stages)
+    if options.dry_run:
+        return
+
+    # Transmis aux processus du pool par l'environnement
+    trace_file = options.trace or options.config.with_suffix(".trace.jsonl")
+    os.environ["PIPELINE_TRACE"] = str(trace_file)
+    os.environ["PIPELINE_RUN_ID"] = instrumentation.RUN_ID
+    if options.profile:
+        os.environ["PIPELINE_PROFILE"] = options.profile
+    instrumentation.TRACE_FILE = str(trace_file)
+    instrumentation.PROFILER = options.profile or instrumentation.PROFILER
+
+    results, wall = run_pipeline(stages,
+                                 cpus=options.cpus or budget.get("cpus"),
+                                 memory_gb=options.memory_gb or budget.get("memory_gb"),
+                                 durations_file=options.config.with_suffix(".durations.json"),
+                                 budgeted=options.budgeted)
+    print_report(stages, results, wall)
+    if os.path.exists(trace_file):
+        instrumentation.print_summary(instrumentation.load_trace(trace_file, instrumentation.RUN_ID),
+                                      max_depth=2)
+        print(f"Trace: {trace_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Profilage des réseaux PPI pondérés.
+
+Pour chaque réseau, calcule à partir du graphe CSR (csr_graph.py) :
+- tailles, densité et poids moyen
+- distributions des degrés et des forces (somme des poids)
+- composantes connexes
+- coefficients de clustering (triangles par produit creux masqué (A·A) ∘ A)
+- nombres de k-core (épluchage par lots vectorisé)
+- histogramme des poids
+et écrit un rapport JSON par réseau (profil_<réseau>.json).
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from csr_graph import CSRGraph, csr_ranges
+from edge_store import network_files
+from instrumentation import count, traced
+
+# Configuration des chemins
+BASE_DIR = Path(r"C:\Users\PC\Documents\M2 HPC\PFE\PFE_CODE\Data\clean data")
+WEIGHTED_DIR = BASE_DIR / "weighted_networks"
+OUTPUT_DIR = WEIGHTED_DIR / "profils"
+
+WEIGHT_BINS = 20
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def summary(values: np.ndarray) -> Dict[str, float]:
+    """Statistiques descriptives d'une distribution"""
+    if len(values) == 0:
+        return {'min': 0.0, 'max': 0.0, 'mean': 0.0, 'median': 0.0, 'std': 0.0}
+    q = np.percentile(values, [25, 50, 75, 90, 99])
+    return {
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'p25': float(q[0]),
+        'median': float(q[1]),
+        'p75': float(q[2]),
+        'p90': float(q[3]),
+        'p99': float(q[4]),
+    }
+
+
+def log_histogram(values: np.ndarray) -> Dict[str, list]:
+    """Histogramme à intervalles logarithmiques (puissances de 2) pour les distributions asymétriques"""
+    if len(values) == 0 or values.max() <= 0:
+        return {'edges': [], 'counts': []}
+    edges = np.unique(np.concatenate([[0], 2.0 ** np.arange(0, np.ceil(np.log2(values.max())) + 2)]))
+    counts, edges = np.histogram(values, bins=edges)
+    return {'edges': edges.tolist(), 'counts': counts.tolist()}
+
+
+def triangle_counts(graph: CSRGraph) -> np.ndarray:
+    """Nombre de triangles passant par chaque nœud : diag(A³)/2 via ((A·A) ∘ A)·1 / 2"""
+    adjacency = graph.adjacency(weighted=False).astype(np.float64)
+    paths = (adjacency @ adjacency).multiply(adjacency)
+    return np.asarray(paths.sum(axis=1)).ravel() / 2.0
+
+
+def clustering_coefficients(graph: CSRGraph) -> Dict:
+    """Coefficients de clustering locaux (moyenne) et transitivité globale"""
+    triangles = triangle_counts(graph)
+    degree = graph.degree().astype(np.float64)
+    pairs = degree * (degree - 1) / 2.0
+    local = np.divide(triangles, pairs, out=np.zeros_like(triangles), where=pairs > 0)
+    active = degree > 0
+    return {
+        'triangles': int(round(triangles.sum() / 3)),
+        'average_clustering': float(local[active].mean()) if active.any() else 0.0,
+        'transitivity': float(triangles.sum() / pairs.sum()) if pairs.sum() > 0 else 0.0,
+        'local_clustering': summary(local[active]),
+    }
+
+
+def core_numbers(graph: CSRGraph) -> np.ndarray:
+    """
+    Nombre de k-core de chaque nœud par épluchage : à chaque tour, tous les nœuds
+    de degré résiduel <= k sont retirés ensemble et les degrés de leurs voisins
+    sont mis à jour par un bincount.
+    """
+    degree = graph.degree().astype(np.int64)
+    core = np.zeros(graph.n_nodes, dtype=np.int64)
+    removed = np.zeros(graph.n_nodes, dtype=bool)
+    k = 0
+    while not removed.all():
+        peel = np.flatnonzero(~removed & (degree <= k))
+        if len(peel) == 0:
+            k = int(degree[~removed].min())
+            continue
+        core[peel] = k
+        removed[peel] = True
+        # Voisins encore présents des nœuds retirés (arcs CSR des nœuds épluchés)
+        neighbors = graph.indices[csr_ranges(graph.indptr, peel)]
+        neighbors = neighbors[~removed[neighbors]]
+        degree -= np.bincount(neighbors, minlength=graph.n_nodes)
+    return core
+
+
+def profile_network(graph: CSRGraph, name: str) -> Dict:
+    """Rapport complet d'un réseau"""
+    degree = graph.degree()
+    active = degree > 0
+    n_nodes = int(active.sum())
+    n_edges = graph.n_edges
+    max_edges = n_nodes * (n_nodes - 1) / 2
+
+    n_components, labels = connected_components(graph.adjacency(weighted=False), directed=False)
+    component_sizes = np.bincount(labels[active]) if n_nodes else np.array([], dtype=np.int64)
+    component_sizes = np.sort(component_sizes[component_sizes > 0])[::-1]
+
+    core = core_numbers(graph)
+    weight_counts, weight_edges = np.histogram(graph.weight, bins=WEIGHT_BINS, range=(0.0, 1.0))
+
+    return {
+        'network': name,
+        'nodes': n_nodes,
+        'edges': n_edges,
+        'density': float(n_edges / max_edges) if max_edges else 0.0,
+        'mean_weight': float(graph.weight.mean()) if n_edges else 0.0,
+        'degree': {**summary(degree[active]), 'histogram': log_histogram(degree[active])},
+        'strength': {**summary(graph.strength()[active]),
+                     'histogram': log_histogram(graph.strength()[active])},
+        'components': {
+            'count': int(len(component_sizes)),
+            'largest': int(component_sizes[0]) if len(component_sizes) else 0,
+            'largest_fraction': float(component_sizes[0] / n_nodes) if n_nodes else 0.0,
+            'size_histogram': log_histogram(component_sizes),
+        },
+        'clustering': clustering_coefficients(graph),
+        'k_core': {
+            'max_core': int(core.max()) if len(core) else 0,
+            'nodes_per_core': np.bincount(core[active]).tolist() if n_nodes else [],
+        },
+        'weights': {
+            **summary(graph.weight),
+            'histogram': {'edges': weight_edges.tolist(), 'counts': weight_counts.tolist()},
+        },
+    }
+
+
+@traced("profilage", detail="network_file")
+def process_network(network_file: Path, output_dir: Path = OUTPUT_DIR) -> Dict:
+    """Profile un réseau pondéré et écrit son rapport JSON"""
+    name = network_file.stem.replace("weighted_", "")
+    report = profile_network(CSRGraph.from_file(network_file), name)
+    count(rows_in=report['edges'])
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / f"profil_{name}.json"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(f"{name}: {report['nodes']} protéines, {report['edges']} interactions, "
+                f"densité {report['density']:.6f}, {report['components']['count']} composantes, "
+                f"clustering moyen {report['clustering']['average_clustering']:.4f}, "
+                f"k-core max {report['k_core']['max_core']} -> {output_file}")
+    return report
+
+
+def main():
+    for network_file in network_files(WEIGHTED_DIR, "weighted_*"):
+        process_network(network_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Lecture en flux des interactions PSI-MI (MITAB 2.5/2.7, PSI-MI XML 2.5/3.0).
+
+Chaque format est lu par lots au format colonne (InteractionBatch) et filtré
+par des masques vectorisés (filters.py) ; les scripts filtrage_*.py ne
+décrivent plus que leurs critères.
+"""
+
+from .records import FIELDS, InteractionBatch
+from .reader import FORMATS, collect, detect_format, read_interactions
+from .mitab import UNIPROT_PATTERNS, iter_mitab
+from .mif import UNIPROT_DBS, iter_complexes, iter_mif
+from .filters import (confidence_mask, descending_order, distinct_mask, resolved_mask,
+                      taxon_mask, term_scores, threshold_count, unique_pairs)
+
+__all__ = [
+    'FIELDS', 'InteractionBatch',
+    'FORMATS', 'collect', 'detect_format', 'read_interactions',
+    'UNIPROT_PATTERNS', 'iter_mitab',
+    'UNIPROT_DBS', 'iter_complexes', 'iter_mif',
+    'confidence_mask', 'descending_order', 'distinct_mask', 'resolved_mask',
+    'taxon_mask', 'term_scores', 'threshold_count', 'unique_pairs',
+]
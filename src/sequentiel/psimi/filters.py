@@ -0,0 +1,106 @@
+"""
+Filtres et scores vectorisés sur les lots d'interactions (InteractionBatch).
+
+Les masques se combinent avec & / | et s'appliquent par batch.select(mask)
+pendant la lecture en flux ; la déduplication et le seuillage final portent
+sur le lot concaténé des interactions retenues.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from edge_keys import build_vocabulary, encode, pack_pairs
+
+from .records import InteractionBatch
+
+
+def taxon_mask(batch: InteractionBatch, taxid: str) -> np.ndarray:
+    """Interactions dont les deux partenaires appartiennent à l'organisme"""
+    return (batch['taxid_a'] == str(taxid)) & (batch['taxid_b'] == str(taxid))
+
+
+def resolved_mask(batch: InteractionBatch) -> np.ndarray:
+    """Interactions dont les deux identifiants protéiques sont connus"""
+    return pd.notna(batch['protein_a']) & pd.notna(batch['protein_b'])
+
+
+def distinct_mask(batch: InteractionBatch) -> np.ndarray:
+    """Interactions entre deux protéines différentes"""
+    return batch['protein_a'] != batch['protein_b']
+
+
+def confidence_mask(batch: InteractionBatch, threshold: float, strict: bool = True,
+                    keep_missing: bool = True) -> np.ndarray:
+    """
+    Interactions au-dessus du seuil de confiance (> ou >= selon strict).
+    Un score absent (NaN) est accepté si keep_missing ; un score illisible
+    (-inf) est toujours rejeté.
+    """
+    confidence = batch['confidence']
+    with np.errstate(invalid='ignore'):
+        above = confidence > threshold if strict else confidence >= threshold
+    return above | (np.isnan(confidence) & keep_missing)
+
+
+def term_scores(values: np.ndarray, scores: Dict[str, int], default: int = 1,
+                skip_psi_mi: bool = False) -> np.ndarray:
+    """
+    Score maximal des termes d'un champ multi-valué ('|'), calculé une seule
+    fois par valeur distincte de la colonne (codes catégoriels).
+    """
+    categories = pd.Categorical(values)
+
+    def score(field):
+        terms = [term.lower() for term in str(field).split('|')]
+        if skip_psi_mi:
+            terms = [term for term in terms if 'psi-mi' not in term]
+        return max([scores.get(term, default) for term in terms], default=default)
+
+    per_category = np.array([score(field) for field in categories.categories] + [score(np.nan)])
+    # Code -1 (valeur manquante) -> dernière case
+    return per_category[categories.codes]
+
+
+def unique_pairs(protein_a: np.ndarray, protein_b: np.ndarray,
+                 order: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Indices des premières occurrences de chaque paire non orientée {a, b} dans
+    l'ordre donné (ordre des lignes par défaut), par clés uint64 (edge_keys.py).
+    """
+    vocabulary = pd.Index(build_vocabulary(protein_a, protein_b))
+    keys = pack_pairs(encode(protein_a, vocabulary), encode(protein_b, vocabulary))
+    if order is None:
+        order = np.arange(len(keys))
+    _, first = np.unique(keys[order], return_index=True)
+    return order[np.sort(first)]
+
+
+def descending_order(scores: np.ndarray) -> np.ndarray:
+    """Ordre des lignes par score décroissant (tri stable)"""
+    return np.argsort(-np.asarray(scores), kind='stable')
+
+
+def threshold_count(sorted_scores: np.ndarray, target_count: int) -> Tuple[int, float]:
+    """
+    Seuil de score le plus bas qui retient au plus target_count interactions.
+
+    Args:
+        sorted_scores: scores triés par ordre décroissant
+
+    Returns:
+        (nombre d'interactions retenues, seuil) ; (0, inf) si même le score
+        maximal en retient trop
+    """
+    n = len(sorted_scores)
+    if n == 0:
+        return 0, float('inf')
+    # Fin de chaque groupe de scores égaux : nombre d'interactions >= ce score
+    ends = np.flatnonzero(np.append(sorted_scores[1:] != sorted_scores[:-1], True))
+    counts = ends + 1
+    valid = counts <= target_count
+    if not valid.any():
+        return 0, float('inf')
+    i = np.flatnonzero(valid)[-1]
+    return int(counts[i]), float(sorted_scores[ends[i]])
@@ -0,0 +1,265 @@
+"""
+Lecture en flux des fichiers PSI-MI XML 2.5 et 3.0 (DIP, IntAct, Complex Portal...).
+
+Le fichier est parcouru avec iterparse :
+- chaque interacteur est résolu (identifiant protéique, taxon, type) dès sa
+  balise fermante et gardé dans un petit dictionnaire id -> Interactor
+- chaque interaction (ou abstractInteraction en 3.0) est traitée à sa fermeture
+  en ne cherchant que dans son propre sous-arbre
+- les éléments traités sont vidés et détachés de leur liste parente, la
+  mémoire reste constante quelle que soit la taille du fichier
+Les interactions qui référencent un interacteur déclaré plus loin sont
+résolues en fin de lecture. L'espace de noms (2.5 ou 3.0) est lu sur la racine.
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from compressed_input import input_stream
+
+from .records import InteractionBatch
+
+NAMESPACES = {
+    '2.5': 'http://psi.hupo.org/mi/mif',
+    '3.0': 'http://psi.hupo.org/mi/mif300',
+}
+
+UNIPROT_DBS = ('uniprotkb', 'uniprot knowledge base', 'uniprot', 'swiss-prot')
+
+BATCH_SIZE = 100_000
+
+
+class Interactor(NamedTuple):
+    protein: Optional[str]
+    taxid: Optional[str]
+    type: Optional[str]
+
+
+class _Tags:
+    """Balises et chemins ElementPath complets pour un espace de noms"""
+
+    def __init__(self, namespace: str):
+        q = (lambda name: f'{{{namespace}}}{name}') if namespace else (lambda name: name)
+        self.interactor = q('interactor')
+        self.interactions = (q('interaction'), q('abstractInteraction'))
+        self.containers = (q('interactorList'), q('interactionList'), q('abstractInteractionList'))
+        self.refs = (q('primaryRef'), q('secondaryRef'))
+        self.short_label = q('shortLabel')
+        self.organism = q('organism')
+        self.interactor_type = f"{q('interactorType')}/{q('names')}/{q('shortLabel')}"
+        self.interactor_ref = q('interactorRef')
+        self.method = q('interactionDetectionMethod')
+        self.interaction_type = q('interactionType')
+        self.label = f"{q('names')}/{q('shortLabel')}"
+        self.confidence = q('confidence')
+        self.value = q('value')
+        self.bibref = q('bibref')
+
+
+def _namespace(tag: str) -> str:
+    return tag[1:].split('}', 1)[0] if tag.startswith('{') else ''
+
+
+def resolve_interactor(elem, tags: _Tags, id_dbs: Sequence[str] = UNIPROT_DBS,
+                       label_fallback: bool = False) -> Interactor:
+    """
+    Identifiant protéique d'un interacteur : première référence (primaryRef ou
+    secondaryRef) dont la base figure dans id_dbs, par ordre de priorité des
+    bases, sinon son shortLabel si label_fallback.
+    """
+    refs = {}
+    label = None
+    # Un seul parcours du sous-arbre au lieu de plusieurs recherches ElementPath
+    for node in elem.iter():
+        tag = node.tag
+        if tag in tags.refs:
+            db = (node.get('db') or '').lower()
+            if db not in refs and node.get('id'):
+                refs[db] = node.get('id')
+        elif tag == tags.short_label and label is None:
+            label = node.text
+    protein = next((refs[db] for db in id_dbs if db in refs), None)
+    if protein is None and label_fallback:
+        protein = label
+
+    organism = elem.find(tags.organism)
+    interactor_type = elem.find(tags.interactor_type)
+    return Interactor(protein or None,
+                      organism.get('ncbiTaxId') if organism is not None else None,
+                      interactor_type.text if interactor_type is not None else None)
+
+
+def _confidence(node, tags: _Tags) -> float:
+    """Score de confiance : NaN si absent, -inf si illisible (rejeté par tout seuil)"""
+    value = node.find(tags.value) if node is not None else None
+    if value is None:
+        return np.nan
+    try:
+        return float(value.text)
+    except (ValueError, TypeError):
+        return -np.inf
+
+
+def _label(node, tags: _Tags) -> Optional[str]:
+    label = node.find(tags.label) if node is not None else None
+    return label.text if label is not None else None
+
+
+def scan_interaction(elem, tags: _Tags) -> Tuple[List[str], object, object, object, int]:
+    """
+    Parcours unique du sous-arbre d'une interaction.
+
+    Returns:
+        (identifiants des interacteurs des participants (référence ou interacteur
+        en ligne), nœud méthode, nœud type, nœud confiance, nombre de bibref)
+    """
+    refs = []
+    method = interaction_type = confidence = None
+    n_bibref = 0
+    for node in elem.iter():
+        tag = node.tag
+        if tag == tags.interactor_ref:
+            refs.append(node.text)
+        elif tag == tags.interactor:
+            if node.get('id'):
+                refs.append(node.get('id'))
+        elif tag == tags.method:
+            method = method if method is not None else node
+        elif tag == tags.interaction_type:
+            interaction_type = interaction_type if interaction_type is not None else node
+        elif tag == tags.confidence:
+            confidence = confidence if confidence is not None else node
+        elif tag == tags.bibref:
+            n_bibref += 1
+    return refs, method, interaction_type, confidence, n_bibref
+
+
+_INTERACTOR, _INTERACTION, _CONTAINER = 1, 2, 3
+
+
+def _iter_elements(source, id_dbs: Sequence[str], label_fallback: bool,
+                   interactors: Dict[str, Interactor]) -> Iterator[Tuple[object, _Tags]]:
+    """
+    Parcours iterparse commun : remplit `interactors` et produit chaque élément
+    d'interaction fermé (vidé et détaché après usage par l'appelant).
+    """
+    tags = None
+    kinds = {}
+    container = None
+    in_interaction = 0
+
+    with input_stream(source) as stream:
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if tags is None:
+                tags = _Tags(_namespace(elem.tag))
+                kinds = {tags.interactor: _INTERACTOR}
+                kinds.update(dict.fromkeys(tags.interactions, _INTERACTION))
+                kinds.update(dict.fromkeys(tags.containers, _CONTAINER))
+            # Une seule recherche par événement : la plupart des balises ne nous intéressent pas
+            kind = kinds.get(elem.tag)
+            if kind is None:
+                continue
+
+            if event == 'start':
+                if kind == _INTERACTION:
+                    in_interaction += 1
+                elif kind == _CONTAINER:
+                    container = elem
+            elif kind == _INTERACTOR:
+                interactor_id = elem.get('id')
+                if interactor_id and interactor_id not in interactors:
+                    interactors[interactor_id] = resolve_interactor(elem, tags, id_dbs, label_fallback)
+                # Les interacteurs déclarés dans une interaction sont libérés avec elle
+                if not in_interaction:
+                    _release(elem, container)
+            elif kind == _INTERACTION:
+                in_interaction -= 1
+                yield elem, tags
+                _release(elem, container)
+
+
+def _release(elem, container):
+    """Vide un élément traité et le détache de sa liste (interactorList / interactionList...)"""
+    elem.clear()
+    if container is not None:
+        try:
+            container.remove(elem)
+        except ValueError:
+            pass
+
+
+def iter_mif(source, batch_size: int = BATCH_SIZE, id_dbs: Sequence[str] = UNIPROT_DBS,
+             label_fallback: bool = False) -> Iterator[InteractionBatch]:
+    """
+    Lit les interactions binaires (exactement deux participants) d'un fichier
+    PSI-MI XML 2.5/3.0 par lots.
+
+    Args:
+        source: chemin (XML, .gz, .zip...) ou fichier ouvert (binaire)
+        id_dbs: bases acceptées pour l'identifiant protéique, par priorité
+        label_fallback: à défaut, utiliser le shortLabel de l'interacteur
+    """
+    interactors: Dict[str, Interactor] = {}
+    records, deferred = [], []
+    unknown = Interactor(None, None, None)
+
+    def record(ref_a, ref_b, method, interaction_type, confidence, n_publications):
+        a = interactors.get(ref_a, unknown)
+        b = interactors.get(ref_b, unknown)
+        return (ref_a, ref_b, a.protein, b.protein, a.taxid, b.taxid,
+                method, interaction_type, confidence, n_publications)
+
+    for elem, tags in _iter_elements(source, id_dbs, label_fallback, interactors):
+        refs, method, interaction_type, confidence, n_bibref = scan_interaction(elem, tags)
+        if len(refs) != 2:
+            continue
+        fields = (refs[0], refs[1], _label(method, tags), _label(interaction_type, tags),
+                  _confidence(confidence, tags), max(1, n_bibref))
+        if refs[0] in interactors and refs[1] in interactors:
+            records.append(record(*fields))
+        else:
+            deferred.append(fields)
+        if len(records) >= batch_size:
+            yield InteractionBatch.from_records(records)
+            records = []
+
+    records.extend(record(*fields) for fields in deferred)
+    if records:
+        yield InteractionBatch.from_records(records)
+
+
+def iter_complexes(source, id_dbs: Sequence[str] = UNIPROT_DBS,
+                   interactor_types: Optional[Sequence[str]] = ('protein',)) -> Iterator[List[str]]:
+    """
+    Complexes d'un fichier PSI-MI XML : pour chaque interaction (abstractInteraction
+    en 3.0), liste triée des identifiants protéiques de ses participants dont le
+    type figure dans interactor_types (None = tous). Les complexes vides sont ignorés.
+    """
+    interactors: Dict[str, Interactor] = {}
+    deferred = []
+
+    def proteins_of(refs):
+        proteins = set()
+        for ref in refs:
+            interactor = interactors.get(ref)
+            if interactor is None or interactor.protein is None:
+                continue
+            if interactor_types is None or interactor.type in interactor_types:
+                proteins.add(interactor.protein)
+        return sorted(proteins)
+
+    for elem, tags in _iter_elements(source, id_dbs, False, interactors):
+        refs = scan_interaction(elem, tags)[0]
+        if all(ref in interactors for ref in refs):
+            proteins = proteins_of(refs)
+            if proteins:
+                yield proteins
+        else:
+            deferred.append(refs)
+
+    for refs in deferred:
+        proteins = proteins_of(refs)
+        if proteins:
+            yield proteins
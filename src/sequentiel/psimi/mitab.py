@@ -0,0 +1,122 @@
+"""
+Lecture en flux des fichiers PSI-MITAB 2.5 / 2.7 (BioGRID, IntAct...).
+
+Le fichier est lu par blocs pandas (15 premières colonnes, communes aux deux
+versions ; les colonnes 2.7 supplémentaires sont ignorées) et chaque bloc est
+converti en InteractionBatch par des opérations str vectorisées :
+- identifiant protéique : un seul str.extract dont les motifs sont combinés en
+  une alternance ancrée (^(?:.*?motif1|.*?motif2|...)), ce qui garde la priorité
+  des motifs (le premier motif présent dans la chaîne l'emporte)
+- taxon, score de confiance et nombre de publications par expressions régulières
+Les extractions ne portent que sur les valeurs distinctes de chaque colonne
+(pd.factorize) : une protéine ou un taxon revient dans de nombreuses lignes.
+"""
+
+import re
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+
+from compressed_input import input_stream
+
+from .records import InteractionBatch
+
+MITAB_COLUMNS = [
+    'ID_A', 'ID_B', 'Alt_IDs_A', 'Alt_IDs_B',
+    'Aliases_A', 'Aliases_B', 'Method', 'Author',
+    'PubIDs', 'TaxID_A', 'TaxID_B', 'IntType',
+    'SourceDB', 'IntIDs', 'Confidence'
+]
+
+UNIPROT_PATTERNS = [
+    r'uniprot/swiss[\W-]?prot:([A-Z0-9]{6,10})',
+    r'uniprot:([A-Z0-9]{6,10})',
+    r'swiss[\W-]?prot:([A-Z0-9]{6,10})',
+    r'([A-Z0-9]{6,10})\.\d'
+]
+
+BATCH_SIZE = 500_000
+
+
+def combined_pattern(patterns: Iterable[str]) -> str:
+    """Alternance ancrée : le premier motif (dans l'ordre) trouvé dans la chaîne l'emporte"""
+    return '^(?:' + '|'.join(f'.*?{pattern}' for pattern in patterns) + ')'
+
+
+def _extract_distinct(values: pd.Series, pattern: str, flags: int = 0) -> pd.DataFrame:
+    """str.extract calculé sur les valeurs distinctes puis propagé aux lignes"""
+    codes, uniques = pd.factorize(values)
+    groups = pd.Series(uniques, dtype=object).str.extract(pattern, flags=flags)
+    # Code -1 (valeur manquante) -> ligne vide ajoutée en fin de table
+    groups = pd.concat([groups, pd.DataFrame([[np.nan] * groups.shape[1]], columns=groups.columns)],
+                       ignore_index=True)
+    return groups.iloc[codes].reset_index(drop=True).set_axis(values.index)
+
+
+def extract_first(values: pd.Series, patterns: Sequence[str], upper: bool = False) -> pd.Series:
+    """Premier motif trouvé dans chaque valeur (NaN si aucun)"""
+    groups = _extract_distinct(values, combined_pattern(patterns), flags=re.IGNORECASE)
+    result = groups[0]
+    for column in groups.columns[1:]:
+        result = result.fillna(groups[column])
+    return result.str.upper() if upper else result
+
+
+def _protein_ids(chunk: pd.DataFrame, side: str, id_columns: Sequence[str],
+                 patterns: Sequence[str], upper: bool) -> np.ndarray:
+    """Identifiant protéique d'un côté (A/B), en cherchant dans les colonnes dans l'ordre"""
+    result = None
+    for column in id_columns:
+        found = extract_first(chunk[f'{column}_{side}'], patterns, upper)
+        result = found if result is None else result.fillna(found)
+    return _as_object(result)
+
+
+def _as_object(series: pd.Series) -> np.ndarray:
+    """Colonne texte en tableau object, None pour les valeurs manquantes"""
+    values = np.array(series.astype(object), dtype=object)
+    values[pd.isna(values)] = None
+    return values
+
+
+def to_batch(chunk: pd.DataFrame, id_columns: Sequence[str] = ('Alt_IDs',),
+             patterns: Sequence[str] = UNIPROT_PATTERNS, upper: bool = False) -> InteractionBatch:
+    """Convertit un bloc MITAB (colonnes MITAB_COLUMNS) en lot d'interactions"""
+    confidence = pd.to_numeric(_extract_distinct(chunk['Confidence'], r'(-?\d+(?:\.\d+)?)')[0],
+                               errors='coerce')
+    publications = chunk['PubIDs'].str.count(r'\|').add(1).fillna(1)
+
+    return InteractionBatch({
+        'id_a': _as_object(chunk['ID_A']),
+        'id_b': _as_object(chunk['ID_B']),
+        'protein_a': _protein_ids(chunk, 'A', id_columns, patterns, upper),
+        'protein_b': _protein_ids(chunk, 'B', id_columns, patterns, upper),
+        'taxid_a': _as_object(_extract_distinct(chunk['TaxID_A'], r'taxid:(-?\d+)')[0]),
+        'taxid_b': _as_object(_extract_distinct(chunk['TaxID_B'], r'taxid:(-?\d+)')[0]),
+        'method': _as_object(chunk['Method']),
+        'type': _as_object(chunk['IntType']),
+        'confidence': confidence.values.astype(np.float64),
+        'n_publications': publications.values.astype(np.int32),
+    })
+
+
+def iter_mitab(source, batch_size: int = BATCH_SIZE, id_columns: Sequence[str] = ('Alt_IDs',),
+               patterns: Sequence[str] = UNIPROT_PATTERNS,
+               upper: bool = False) -> Iterator[InteractionBatch]:
+    """
+    Lit un fichier MITAB 2.5/2.7 par lots.
+
+    Args:
+        source: chemin (texte, .gz, .zip...) ou fichier ouvert
+        id_columns: colonnes (sans suffixe _A/_B) où chercher l'identifiant protéique,
+            dans l'ordre de priorité ('ID', 'Alt_IDs', 'Aliases')
+        patterns: motifs de l'identifiant (un groupe capturant chacun), par priorité
+        upper: identifiants mis en majuscules
+    """
+    with input_stream(source) as stream:
+        reader = pd.read_csv(stream, sep='\t', comment='#', header=None, dtype=str,
+                             usecols=range(len(MITAB_COLUMNS)), chunksize=batch_size)
+        for chunk in reader:
+            chunk.columns = MITAB_COLUMNS
+            yield to_batch(chunk, id_columns, patterns, upper)
@@ -0,0 +1,59 @@
+"""
+Point d'entrée commun : détection du format et lecture en flux filtrée.
+"""
+
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+from compressed_input import open_input
+
+from .mif import NAMESPACES, iter_mif
+from .mitab import MITAB_COLUMNS, iter_mitab
+from .records import InteractionBatch
+
+FORMATS = ('mitab25', 'mitab27', 'mif25', 'mif30')
+
+_SNIFF_BYTES = 64 * 1024
+
+
+def detect_format(path: Path) -> str:
+    """
+    Format d'un fichier d'interactions d'après son début :
+    XML (espace de noms 2.5 ou 3.0) ou MITAB (nombre de colonnes de la première ligne de données),
+    lu après décompression éventuelle
+    """
+    with open_input(path, threaded_read=False) as f:
+        head = f.read(_SNIFF_BYTES).decode('utf-8', errors='replace')
+    if head.lstrip().startswith('<'):
+        return 'mif30' if NAMESPACES['3.0'] in head else 'mif25'
+    for line in head.splitlines():
+        if line and not line.startswith('#'):
+            return 'mitab27' if len(line.split('\t')) > len(MITAB_COLUMNS) else 'mitab25'
+    return 'mitab25'
+
+
+def read_interactions(source, fmt: Optional[str] = None, **options) -> Iterator[InteractionBatch]:
+    """
+    Lit un fichier d'interactions PSI-MI par lots, quel que soit son format.
+
+    Args:
+        fmt: un des FORMATS, détecté si None (source doit alors être un chemin)
+        options: options du lecteur (iter_mitab ou iter_mif)
+    """
+    fmt = fmt or detect_format(source)
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu: {fmt} (disponibles: {', '.join(FORMATS)})")
+    if fmt.startswith('mitab'):
+        return iter_mitab(source, **options)
+    return iter_mif(source, **options)
+
+
+def collect(batches: Iterable[InteractionBatch],
+            predicate: Optional[Callable[[InteractionBatch], np.ndarray]] = None) -> InteractionBatch:
+    """Applique un filtre vectorisé à chaque lot et concatène les interactions retenues"""
+    kept = []
+    for batch in batches:
+        kept.append(batch if predicate is None else batch.select(predicate(batch)))
+    return InteractionBatch.concat(kept)
@@ -0,0 +1,68 @@
+"""
+Lots d'interactions au format colonne.
+
+Chaque lecteur (MITAB, PSI-MI XML) produit des InteractionBatch : un tableau
+numpy par champ, une ligne par interaction binaire. Les filtres vectorisés
+(filters.py) travaillent sur ces colonnes et les lots filtrés, beaucoup plus
+petits, sont concaténés en fin de lecture.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+# Champs communs à tous les formats
+#   id_a / id_b           : identifiants des interacteurs dans la source
+#   protein_a / protein_b : identifiant protéique résolu (UniProt...), None si absent
+#   taxid_a / taxid_b     : taxon NCBI (texte), None si absent
+#   method / type         : méthode de détection et type d'interaction (texte brut)
+#   confidence            : score de confiance (NaN si absent, -inf si illisible)
+#   n_publications        : nombre de publications citées
+FIELDS = ('id_a', 'id_b', 'protein_a', 'protein_b', 'taxid_a', 'taxid_b',
+          'method', 'type', 'confidence', 'n_publications')
+
+_DTYPES = {'confidence': np.float64, 'n_publications': np.int32}
+
+
+class InteractionBatch:
+    """Lot d'interactions binaires stocké par colonnes"""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        missing = set(FIELDS) - set(columns)
+        if missing:
+            raise KeyError(f"Champs manquants: {', '.join(sorted(missing))}")
+        self.columns = {field: np.asarray(columns[field], dtype=_DTYPES.get(field, object))
+                        for field in FIELDS}
+
+    @classmethod
+    def from_records(cls, records: List[tuple]) -> 'InteractionBatch':
+        """Construit un lot à partir de tuples ordonnés comme FIELDS"""
+        if not records:
+            return cls.empty()
+        transposed = list(zip(*records))
+        return cls({field: transposed[i] for i, field in enumerate(FIELDS)})
+
+    @classmethod
+    def empty(cls) -> 'InteractionBatch':
+        return cls({field: np.zeros(0, dtype=_DTYPES.get(field, object)) for field in FIELDS})
+
+    @classmethod
+    def concat(cls, batches: Iterable['InteractionBatch']) -> 'InteractionBatch':
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        return cls({field: np.concatenate([batch[field] for batch in batches]) for field in FIELDS})
+
+    def __len__(self) -> int:
+        return len(self.columns['id_a'])
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+    def select(self, mask: np.ndarray) -> 'InteractionBatch':
+        """Sous-lot des lignes sélectionnées (masque booléen ou indices)"""
+        return InteractionBatch({field: values[mask] for field, values in self.columns.items()})
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
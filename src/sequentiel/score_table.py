@@ -0,0 +1,94 @@
+"""
+Table de scores colonnaire d'un réseau PPI.
+
+Une ligne par arête (clé uint64 triée, voir edge_keys.py) et une colonne float32
+par canal de similarité (HCN, PCC, Func, SL), NaN quand le canal n'a pas de score
+pour l'arête. La table est construite une seule fois à partir des fichiers de
+scores puis sauvegardée : les politiques d'agrégation (aggregation.py) travaillent
+directement dessus sans relire ni re-joindre les sources.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from edge_keys import align_values, decode_edges
+
+
+class ScoreTable:
+    """Scores de similarité alignés sur les arêtes d'un réseau"""
+
+    def __init__(self, vocabulary: np.ndarray, keys: np.ndarray,
+                 columns: Optional[Dict[str, np.ndarray]] = None):
+        self.vocabulary = np.asarray(vocabulary)
+        self.keys = np.asarray(keys, dtype=np.uint64)
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, values in (columns or {}).items():
+            self.add_channel(name, values)
+
+    @classmethod
+    def from_sources(cls, vocabulary: np.ndarray, edge_keys: np.ndarray,
+                     sources: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> 'ScoreTable':
+        """
+        Construit la table en alignant chaque source (clés triées, valeurs)
+        sur les arêtes du réseau.
+        """
+        table = cls(vocabulary, edge_keys)
+        for name, (keys, values) in sources.items():
+            table.add_channel(name, align_values(edge_keys, keys, values))
+        return table
+
+    def add_channel(self, name: str, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float32)
+        if len(values) != len(self.keys):
+            raise ValueError(f"Canal {name}: {len(values)} valeurs pour {len(self.keys)} arêtes")
+        self.columns[name] = values
+
+    @property
+    def channels(self) -> List[str]:
+        return list(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def matrix(self, channels: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Matrice (arêtes x canaux) float32, dans l'ordre des canaux demandés"""
+        channels = list(channels) if channels is not None else self.channels
+        missing = [c for c in channels if c not in self.columns]
+        if missing:
+            raise KeyError(f"Canaux absents de la table: {', '.join(missing)}")
+        if not channels:
+            return np.empty((len(self.keys), 0), dtype=np.float32)
+        return np.column_stack([self.columns[c] for c in channels])
+
+    def coverage(self) -> Dict[str, int]:
+        """Nombre d'arêtes ayant un score, par canal"""
+        return {name: int(np.count_nonzero(~np.isnan(values)))
+                for name, values in self.columns.items()}
+
+    def to_frame(self, weights: np.ndarray, keep: Optional[np.ndarray] = None,
+                 weight_column: str = 'weight') -> pd.DataFrame:
+        """Réseau pondéré (protein1, protein2, poids) pour les arêtes conservées"""
+        weights = np.asarray(weights)
+        if keep is None:
+            keep = ~np.isnan(weights)
+        protein1, protein2 = decode_edges(self.keys[keep], self.vocabulary)
+        return pd.DataFrame({
+            'protein1': protein1,
+            'protein2': protein2,
+            weight_column: weights[keep]
+        })
+
+    def save(self, path: Path):
+        """Sauvegarde la table au format .npz (non compressé)"""
+        arrays = {f"channel_{name}": values for name, values in self.columns.items()}
+        np.savez(path, vocabulary=self.vocabulary.astype(str), keys=self.keys,
+                 channels=np.array(self.channels, dtype=str), **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> 'ScoreTable':
+        with np.load(path) as npz:
+            columns = {name: npz[f"channel_{name}"] for name in npz['channels']}
+            return cls(npz['vocabulary'], npz['keys'], columns)
@@ -0,0 +1,156 @@
+"""
+Graphe CSR en mémoire partagée pour les processus fils (multiprocessing).
+
+Le processus principal publie une fois les tableaux d'un CSRGraph (et, en
+option, le vocabulaire des protéines) dans des blocs
+multiprocessing.shared_memory :
+
+    with SharedGraphStore(graph) as store:
+        handle = store.handle          # quelques noms et formes : léger à sérialiser
+        ParallelGeneticAlgorithm(..., shared={'graph': handle}).run()
+
+Un processus fils appelle handle.attach() : les tableaux sont des vues numpy
+sur les blocs, sans copie, et le graphe attaché est gardé pour le processus
+(attacher plusieurs fois coûte une recherche dans un dictionnaire). Les blocs
+sont libérés à la fermeture du store, à la fin du `with`, ou à défaut quand le
+store est ramassé ou à la sortie de l'interpréteur.
+
+Les métriques de evaluation.py acceptent directement le handle.
+"""
+
+import weakref
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from csr_graph import ARRAYS, CSRGraph
+
+VOCABULARY = 'vocabulary'
+
+
+class SharedBlock(NamedTuple):
+    field: str         # attribut du CSRGraph
+    name: str          # nom du bloc shared_memory
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedGraphHandle(NamedTuple):
+    """Référence sérialisable à un graphe publié par SharedGraphStore"""
+    blocks: Tuple[SharedBlock, ...]
+    n_nodes: int
+
+    @property
+    def key(self) -> Tuple[str, ...]:
+        return tuple(block.name for block in self.blocks)
+
+    def attach(self) -> CSRGraph:
+        return attach(self)
+
+
+class _Attached(NamedTuple):
+    graph: CSRGraph
+    segments: List[shared_memory.SharedMemory]
+
+
+# Graphes attachés par le processus courant, par noms de blocs
+_ATTACHED: Dict[Tuple[str, ...], _Attached] = {}
+
+
+def attach(handle: SharedGraphHandle) -> CSRGraph:
+    """
+    Graphe d'un handle, en vues sur les blocs partagés (sans copie). Sans
+    vocabulaire partagé, les nœuds sont désignés par leurs codes (0..n-1).
+    """
+    attached = _ATTACHED.get(handle.key)
+    if attached is not None:
+        return attached.graph
+
+    segments, arrays = [], {}
+    for block in handle.blocks:
+        segment = shared_memory.SharedMemory(name=block.name)
+        segments.append(segment)
+        array = np.ndarray(block.shape, dtype=np.dtype(block.dtype), buffer=segment.buf)
+        array.flags.writeable = False
+        arrays[block.field] = array
+    vocabulary = arrays.pop(VOCABULARY, None)
+    if vocabulary is None:
+        vocabulary = np.arange(handle.n_nodes, dtype=np.int32)
+    graph = CSRGraph.from_arrays(vocabulary, arrays)
+    _ATTACHED[handle.key] = _Attached(graph, segments)
+    return graph
+
+
+def detach(handle: SharedGraphHandle):
+    """Oublie le graphe attaché par ce processus (les vues encore référencées gardent leur bloc ouvert)"""
+    attached = _ATTACHED.pop(handle.key, None)
+    if attached is None:
+        return
+    for segment in attached.segments:
+        _close(segment)
+
+
+def _close(segment: shared_memory.SharedMemory):
+    try:
+        segment.close()
+    except BufferError:
+        # Des vues numpy existent encore : le bloc reste projeté jusqu'à leur disparition
+        pass
+
+
+def _release(segments: List[shared_memory.SharedMemory]):
+    """Ferme et supprime les blocs du store (appelé une seule fois, par close ou weakref.finalize)"""
+    for segment in segments:
+        _close(segment)
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedGraphStore:
+    """
+    Publie un CSRGraph en mémoire partagée ; propriétaire des blocs.
+
+    Args:
+        graph: Graphe à publier (copié une fois dans les blocs)
+        vocabulary: Publier aussi le vocabulaire des protéines (chaînes de
+            largeur fixe) ; sinon les processus fils voient des codes
+    """
+
+    def __init__(self, graph: CSRGraph, vocabulary: bool = True):
+        arrays = {name: getattr(graph, name) for name in ARRAYS}
+        if vocabulary:
+            arrays[VOCABULARY] = np.asarray(graph.vocabulary).astype(str)
+
+        self._segments: List[shared_memory.SharedMemory] = []
+        # Libération garantie même sans close() explicite (ramassage, sortie)
+        self._finalizer = weakref.finalize(self, _release, self._segments)
+        blocks = []
+        for field, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._segments.append(segment)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+            blocks.append(SharedBlock(field, segment.name, array.shape, array.dtype.str))
+        self.handle = SharedGraphHandle(tuple(blocks), graph.n_nodes)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(segment.size for segment in self._segments)
+
+    def close(self):
+        """Libère les blocs ; les processus fils doivent avoir terminé"""
+        detach(self.handle)
+        self._finalizer()
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def __enter__(self) -> 'SharedGraphStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
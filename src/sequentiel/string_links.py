@@ -0,0 +1,126 @@
+"""
+Filtrage en flux des fichiers STRING protein.links.detailed.
+
+Le fichier est lu par blocs (colonnes utiles seulement, scores en int16) et le
+masque de scores est appliqué à chaque bloc. Les identifiants des interactions
+retenues sont factorisés sur un vocabulaire global croissant, puis chaque arête
+est réduite à une clé uint64 canonique (min, max) (voir edge_keys.py) : la
+déduplication A–B / B–A se fait par un seul tri des clés en fin de lecture, la
+mémoire ne dépend que du nombre d'interactions retenues.
+"""
+
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from compressed_input import input_stream
+from edge_keys import pack_pairs
+from edge_store import write_edges
+from instrumentation import count, traced
+
+CHANNELS = ["experimental", "coexpression", "database", "textmining"]
+CHUNK_SIZE = 1_000_000
+
+
+class _Vocabulary:
+    """Vocabulaire de protéines construit au fil des blocs (codes dans l'ordre d'apparition)"""
+
+    def __init__(self):
+        self.index = pd.Index([], dtype=object)
+
+    def add(self, ids: np.ndarray) -> np.ndarray:
+        """Codes globaux des identifiants d'un bloc, en ajoutant les nouveaux"""
+        codes, uniques = pd.factorize(ids)
+        uniques = np.asarray(uniques, dtype=object)
+        global_codes = self.index.get_indexer(uniques)
+        new = global_codes < 0
+        if new.any():
+            global_codes[new] = len(self.index) + np.arange(new.sum())
+            self.index = self.index.append(pd.Index(uniques[new], dtype=object))
+        return global_codes[codes].astype(np.int32)
+
+    def values(self) -> np.ndarray:
+        return np.asarray(self.index, dtype=object)
+
+
+def filter_string_links(input_path: Path, taxon: str, min_combined_score: int,
+                        min_channel_score: int = 90, chunk_size: int = CHUNK_SIZE,
+                        best_score: bool = False) -> Tuple[pd.DataFrame, int]:
+    """
+    Filtre un fichier STRING en flux (texte, .gz ou .zip, voir compressed_input.py).
+
+    Une interaction est gardée si combined_score >= min_combined_score et si au
+    moins un des canaux experimental/coexpression/database/textmining dépasse
+    strictement min_channel_score. Le préfixe "<taxon>." est retiré des
+    identifiants et les doublons A–B / B–A sont supprimés (première occurrence
+    conservée, dans l'ordre et l'orientation du fichier ; occurrence de meilleur
+    combined_score si best_score, pour un balayage de seuils).
+
+    Returns:
+        (interactions uniques (protein1, protein2, combined_score), nombre de lignes lues)
+    """
+    usecols = ["protein1", "protein2", "combined_score"] + CHANNELS
+    dtypes = {col: np.int16 for col in usecols[2:]}
+    dtypes.update({"protein1": object, "protein2": object})
+
+    vocabulary = _Vocabulary()
+    keys, forward, scores = [], [], []
+    n_rows = 0
+    with input_stream(input_path) as source:
+        reader = pd.read_csv(source, sep=" ", usecols=usecols, dtype=dtypes,
+                             chunksize=chunk_size)
+        for chunk in reader:
+            n_rows += len(chunk)
+            mask = ((chunk["combined_score"].values >= min_combined_score)
+                    & (chunk[CHANNELS].values.max(axis=1) > min_channel_score))
+            if not mask.any():
+                continue
+            ids = np.concatenate([chunk["protein1"].values[mask], chunk["protein2"].values[mask]])
+            codes = vocabulary.add(ids)
+            a, b = codes[:mask.sum()], codes[mask.sum():]
+            keys.append(pack_pairs(a, b))
+            forward.append(a <= b)
+            scores.append(chunk["combined_score"].values[mask])
+
+    if not keys:
+        return pd.DataFrame({"protein1": [], "protein2": [], "combined_score": []}), n_rows
+
+    keys = np.concatenate(keys)
+    forward = np.concatenate(forward)
+    scores = np.concatenate(scores)
+    # Première occurrence de chaque arête (par score décroissant si best_score),
+    # remise dans l'ordre du fichier
+    order = np.argsort(-scores, kind="stable") if best_score else np.arange(len(keys))
+    _, first = np.unique(keys[order], return_index=True)
+    first = np.sort(order[first])
+    low = (keys[first] >> np.uint64(32)).astype(np.int64)
+    high = (keys[first] & np.uint64(0xFFFFFFFF)).astype(np.int64)
+    src = np.where(forward[first], low, high)
+    dst = np.where(forward[first], high, low)
+
+    # Retrait du préfixe taxonomique sur le vocabulaire seulement
+    names = pd.Series(vocabulary.values(), dtype=object).str.removeprefix(f"{taxon}.").values
+    interactions = pd.DataFrame({"protein1": names[src], "protein2": names[dst],
+                                 "combined_score": scores[first]})
+    return interactions, n_rows
+
+
+@traced("filtrage_STRING", detail="label")
+def run(input_path: Path, output_path: Path, taxon: str, min_combined_score: int,
+        label: str) -> pd.DataFrame:
+    """Filtre, sauvegarde et affiche les statistiques d'un fichier STRING"""
+    interactions, n_rows = filter_string_links(input_path, taxon, min_combined_score)
+    count(rows_in=n_rows, rows_out=len(interactions))
+    # Identifiants STRING (ENSP) : vocabulaire distinct de celui des UniProt de l'espèce
+    write_edges(interactions[["protein1", "protein2"]], output_path, species=f"STRING_{label}",
+                header=False)
+
+    unique_proteins = pd.unique(interactions[["protein1", "protein2"]].values.ravel("K"))
+    print(f"\n STRING ----- {label}")
+    print("Traitement terminé avec succès.")
+    print(f"Lignes lues : {n_rows}")
+    print(f"Nombre de protéines uniques : {len(unique_proteins)}")
+    print(f"Nombre d'interactions uniques : {len(interactions)}")
+    return interactions
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Les scripts de src/sequentiel s'importent par leur nom de module
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backbone
+
+
+@pytest.fixture
+def network_file(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 300
+    frame = pd.DataFrame({
+        'protein1': [f"P{i}" for i in rng.integers(0, 40, n)],
+        'protein2': [f"P{i}" for i in rng.integers(40, 80, n)],
+        'mean_weight': rng.random(n),
+    })
+    path = tmp_path / "weighted_test.txt"
+    frame.to_csv(path, sep='\t', index=False)
+    return path
+
+
+@pytest.mark.parametrize("method", sorted(backbone.BACKBONE_METHODS))
+def test_process_network_default_params(network_file, tmp_path, method):
+    report = backbone.process_network(network_file, tmp_path / "out", method=method, max_removed=1.0)
+
+    assert report['method'] == method
+    assert report['params'] == backbone.DEFAULT_PARAMS[method]
+    assert report['edges_after'] <= report['edges_before']
+    assert (tmp_path / "out" / network_file.name).exists()
+
+
+def test_process_network_refuses_extreme_reduction(network_file, tmp_path):
+    report = backbone.process_network(network_file, tmp_path / "out", method='threshold',
+                                      threshold=2.0)
+
+    assert report is None
+    assert not (tmp_path / "out").exists()